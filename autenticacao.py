@@ -1,15 +1,30 @@
-import requests
+import os
+import json
+import time
+import base64
+import threading
+import cliente_http
 
 # --- VARIÁVEIS DE CONFIGURAÇÃO (PREENCHA AQUI) ---
 # Embora as credenciais estejam hardcoded abaixo para o teste, o ideal é que elas
 # sejam carregadas de variáveis de ambiente ou de um arquivo de configuração seguro.
 
+# Cache do token entre execuções: fica no perfil do usuário (fora da pasta do projeto
+# e do compartilhamento de rede), gravado com permissão restrita ao dono do arquivo.
+CAMINHO_CACHE_TOKEN = os.path.join(os.path.expanduser("~"), ".cailun", "token.json")
+MARGEM_RENOVACAO_TOKEN = 300  # Segundos antes do 'exp' em que o token já é renovado
+VALIDADE_PADRAO_TOKEN = 3600  # Validade (s) assumida, a partir do login, para token sem 'exp' legível
+
+_token_atual = None
+_emitido_em = None  # Momento do login do _token_atual (epoch)
+_lock_token = threading.Lock()
+
 def login_cailun():
     """ 
     Tenta logar na API Cailun e retorna o token JWT Bearer.
     Endpoint: POST https://api.cailun.com.br/login
     """
-    url_login = "https://api.cailun.com.br/login"
+    url_login = "/login"
     
     # Payload com as credenciais (que vieram da sua variável global no contexto original)
     payload = {
@@ -19,7 +34,8 @@ def login_cailun():
     }
 
     try:
-        response = requests.post(url_login, json=payload)
+        # Login é idempotente: pode ser repetido com segurança em caso de falha
+        response = cliente_http.post(url_login, json=payload, idempotente=True)
         
         if response.status_code == 200:
             dados = response.json()
@@ -39,5 +55,72 @@ def login_cailun():
         print(f"❌ Erro de conexão no Login: {e}")
         return None
 
-# Nota: O bloco de teste (if __name__ == "__main__":) foi omitido para manter este
-# módulo focado estritamente na função de exportação do login.
\ No newline at end of file
+def _expiracao_jwt(token: str):
+    """ Lê o campo 'exp' (epoch) do payload do JWT, sem validar a assinatura. """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+def _token_valido(token: str, emitido_em: float = None) -> bool:
+    """ Sem 'exp' no token, vale VALIDADE_PADRAO_TOKEN a partir do login (emitido_em). """
+    if not token:
+        return False
+    expiracao = _expiracao_jwt(token)
+    if expiracao is None and emitido_em:
+        expiracao = emitido_em + VALIDADE_PADRAO_TOKEN
+    return bool(expiracao) and expiracao - MARGEM_RENOVACAO_TOKEN > time.time()
+
+def _ler_token_cache():
+    """ (token, emitido_em) do cache em disco, ou (None, None). """
+    try:
+        with open(CAMINHO_CACHE_TOKEN, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        return dados.get("token"), dados.get("emitido_em")
+    except Exception:
+        return None, None
+
+def _gravar_token_cache(token: str, emitido_em: float):
+    try:
+        os.makedirs(os.path.dirname(CAMINHO_CACHE_TOKEN), exist_ok=True)
+        descritor = os.open(CAMINHO_CACHE_TOKEN, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descritor, "w", encoding="utf-8") as f:
+            json.dump({"token": token, "emitido_em": emitido_em}, f)
+    except Exception as e:
+        print(f"⚠️ Não foi possível salvar o token em cache: {e}")
+
+def obter_token(forcar_login: bool = False, token_rejeitado: str = None):
+    """
+    Retorna um token JWT válido. Reaproveita o token em memória ou o do cache em
+    disco enquanto faltar mais que MARGEM_RENOVACAO_TOKEN para expirar; caso
+    contrário (ou com forcar_login=True), faz um novo login.
+    """
+    global _token_atual, _emitido_em
+    with _lock_token:
+        # Outra thread já trocou o token rejeitado enquanto esta esperava o lock
+        if (forcar_login and token_rejeitado and _token_atual != token_rejeitado
+                and _token_valido(_token_atual, _emitido_em)):
+            return _token_atual
+        if not forcar_login:
+            if _token_valido(_token_atual, _emitido_em):
+                return _token_atual
+            token_cache, emitido_cache = _ler_token_cache()
+            if _token_valido(token_cache, emitido_cache):
+                _token_atual, _emitido_em = token_cache, emitido_cache
+                return _token_atual
+
+        emitido_em = time.time()
+        token = login_cailun()
+        if token:
+            _token_atual, _emitido_em = token, emitido_em
+            _gravar_token_cache(token, emitido_em)
+        return token
+
+def renovar_token(token_rejeitado: str = None):
+    """ Chamado quando a API responde 401: força um novo login (uma vez só entre threads). """
+    return obter_token(forcar_login=True, token_rejeitado=token_rejeitado)
+
+# Toda chamada autenticada do cliente_http passa a usar (e renovar) este token
+cliente_http.registrar_provedor_token(obter_token, renovar_token)
\ No newline at end of file
@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import builtins
+import tempfile
+import subprocess
+from datetime import datetime
+
+DIRETORIO_BENCHMARK = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_PROJETO = os.path.dirname(DIRETORIO_BENCHMARK)
+
+# --- CONFIGURAÇÕES DO BENCHMARK ---
+DIRETORIO_RESULTADOS = os.path.join(DIRETORIO_BENCHMARK, "resultados")
+FLUXOS = {
+    # fluxo: perfis de motor_assinaturas.PERFIS processados numa única execução
+    "contra_cheque": ["contra_cheque"],
+    "ferias": ["ferias"],
+    "unificado": ["contra_cheque", "cartao_ponto", "ferias"],
+}
+SUFIXOS_PDF = {"ferias": "_RECIBO"}   # Nome dos PDFs gerados por perfil (nome curto + sufixo)
+# -----------------------------------
+
+
+def _pico_memoria_mb() -> float:
+    """ Pico de memória residente do processo (Linux/macOS); no Windows, pico do tracemalloc. """
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 1024 / 1024 if sys.platform == "darwin" else pico / 1024
+    except ImportError:
+        import tracemalloc
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+
+
+def _executar_fluxo(fluxo: str, args, temporario: str) -> dict:
+    """ Roda um fluxo inteiro neste processo (chamado pelo processo filho), com os dados em temporario. """
+    os.environ["CAILUN_DIRETORIO_CACHE"] = os.path.join(temporario, "cache")
+    if sys.platform == "win32":
+        import tracemalloc  # Sem o módulo resource: mede o pico pelas alocações do Python
+        tracemalloc.start()
+    sys.path.insert(0, DIRETORIO_PROJETO)
+
+    import gerar_dados
+    from servidor_mock import ServidorCailunSimulado
+
+    perfis = FLUXOS[fluxo]
+    try:
+        import cliente_http
+        import autenticacao
+        import busca_ids_pastas
+        import indice_nomes
+        import metricas
+        import motor_assinaturas
+    except ImportError as e:
+        return {"erro": f"motor_assinaturas não pôde ser importado: {e}"}
+
+    # Dados sintéticos: setores na rede e no Cailun com os mesmos nomes
+    nomes = gerar_dados.gerar_nomes(args.funcionarios * args.setores)
+    setores = {f"SETOR {i + 1:02d}": nomes[i::args.setores] for i in range(args.setores)}
+    caminho_planilha = os.path.join(temporario, "rel_funcionarios.xlsx")
+    gerar_dados.gerar_planilha(caminho_planilha, nomes)
+    raizes_rede = {perfil: [] for perfil in perfis}
+    for perfil in perfis:
+        for nome_setor, nomes_setor in setores.items():
+            raiz = os.path.join(temporario, "rede", perfil, nome_setor)
+            gerar_dados.gerar_pdfs(raiz, nomes_setor, args.tamanho_pdf, sufixo=SUFIXOS_PDF.get(perfil, ""))
+            raizes_rede[perfil].append(raiz)
+    arvore = gerar_dados.gerar_arvore_cailun(busca_ids_pastas.ID_PASTA_RAIZ_SISTEMA, setores, args.sem_recibos)
+
+    servidor = ServidorCailunSimulado(
+        arvore, latencia_pastas=args.latencia_pastas / 1000, latencia_envio=args.latencia_envio / 1000,
+        taxa_erro=args.taxa_erro, taxa_limite=args.taxa_limite,
+    ).iniciar()
+
+    # Aponta o projeto para o ambiente simulado
+    cliente_http.URL_BASE_API = servidor.url
+    autenticacao.CAMINHO_CACHE_TOKEN = os.path.join(temporario, "token.json")
+    indice_nomes.CAMINHO_FILA_REVISAO = os.path.join(temporario, "revisao_manual.csv")
+    metricas.DIRETORIO_RELATORIOS = os.path.join(temporario, "relatorios")
+    metricas.DIRETORIO_PROMETHEUS = None
+    motor_assinaturas.CAMINHO_PLANILHA = caminho_planilha
+    for perfil, raizes in raizes_rede.items():
+        motor_assinaturas.PERFIS[perfil]["pastas_rede"] = raizes
+    builtins.input = lambda *a: ""
+
+    inicio = time.perf_counter()
+    motor_assinaturas.orquestrar(args.workers, perfis)
+    duracao = time.perf_counter() - inicio
+    servidor.parar()
+    medidas = metricas.resumo()  # Etapas medidas pela própria instrumentação do projeto
+
+    enviados = sum(
+        len(os.listdir(os.path.join(raiz, pasta, "ENVIADOS")))
+        for raiz, pastas, _ in os.walk(os.path.join(temporario, "rede"))
+        for pasta in pastas if os.path.isdir(os.path.join(raiz, pasta, "ENVIADOS"))
+    )
+    chamadas = sum(servidor.chamadas.values())
+    return {
+        "arquivos": len(nomes) * len(perfis),
+        "enviados": enviados,
+        "duracao_s": round(duracao, 3),
+        "arquivos_por_minuto": round(enviados / duracao * 60, 1) if duracao else 0,
+        "chamadas_api": servidor.chamadas,
+        "chamadas_por_arquivo": round(chamadas / enviados, 2) if enviados else None,
+        "status_http": {str(k): v for k, v in sorted(servidor.status.items())},
+        "bytes_enviados": servidor.bytes_recebidos,
+        "pico_memoria_mb": round(_pico_memoria_mb(), 1),
+        "etapas_ms": {
+            etapa: {"n": m["n"], "p50": m["p50_ms"], "p95": m["p95_ms"], "total": m["total_ms"]}
+            for etapa, m in medidas["etapas"].items()
+        },
+    }
+
+
+def _argumentos_cenario(args) -> list:
+    return [
+        "--funcionarios", str(args.funcionarios), "--setores", str(args.setores),
+        "--workers", str(args.workers), "--tamanho-pdf", str(args.tamanho_pdf),
+        "--latencia-pastas", str(args.latencia_pastas), "--latencia-envio", str(args.latencia_envio),
+        "--taxa-erro", str(args.taxa_erro), "--taxa-limite", str(args.taxa_limite),
+        "--sem-recibos", str(args.sem_recibos),
+    ]
+
+
+def _commit_atual() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DIRETORIO_PROJETO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def _imprimir(resultados: dict, anterior: dict = None):
+    for fluxo, r in resultados.items():
+        print(f"\n📊 {fluxo.upper()}")
+        if "erro" in r:
+            print(f"   ❌ {r['erro']}")
+            continue
+        linha = f"   ↳ {r['enviados']}/{r['arquivos']} enviados em {r['duracao_s']}s: {r['arquivos_por_minuto']} arquivos/min"
+        base = (anterior or {}).get(fluxo)
+        if base and "erro" not in base and base["arquivos_por_minuto"]:
+            linha += f" ({(r['arquivos_por_minuto'] / base['arquivos_por_minuto'] - 1):+.1%} vs {anterior['_commit']})"
+        print(linha)
+        print(f"   ↳ Chamadas à API por arquivo: {r['chamadas_por_arquivo']} {r['chamadas_api']}")
+        print(f"   ↳ Status HTTP: {r['status_http']}   Pico de memória: {r['pico_memoria_mb']} MB")
+        for etapa, m in r["etapas_ms"].items():
+            print(f"   ↳ {etapa:<14} n={m['n']:<5} p50={m['p50']:>9.2f} ms  p95={m['p95']:>9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline contra um Cailun simulado.")
+    parser.add_argument("--fluxo", choices=[*FLUXOS, "todos"], default="todos")
+    parser.add_argument("--funcionarios", type=int, default=100, help="Funcionários (PDFs) por setor")
+    parser.add_argument("--setores", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=8, help="Teto de envios simultâneos")
+    parser.add_argument("--tamanho-pdf", type=int, default=100, help="KB por PDF")
+    parser.add_argument("--latencia-pastas", type=float, default=30, help="ms por GET de pastas")
+    parser.add_argument("--latencia-envio", type=float, default=150, help="ms por POST /subscriptionFlow")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument("--taxa-limite", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--sem-recibos", type=float, default=0.0, help="Fração de funcionários sem pasta RECIBOS")
+    parser.add_argument("--saida", help="Arquivo JSON do resultado (padrão: benchmark/resultados/)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior, para comparar")
+    parser.add_argument("--verboso", action="store_true", help="Mostra a saída dos orquestradores")
+    parser.add_argument("--interno", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        fluxo, caminho_resultado = args.interno.split(":", 1)
+        temporario = tempfile.mkdtemp(prefix="benchmark_cailun_")
+        try:
+            resultado = _executar_fluxo(fluxo, args, temporario)
+        finally:
+            shutil.rmtree(temporario, ignore_errors=True)
+        with open(caminho_resultado, "w", encoding="utf-8") as f:
+            json.dump(resultado, f)
+        return
+
+    fluxos = list(FLUXOS) if args.fluxo == "todos" else [args.fluxo]
+    resultados = {}
+    for fluxo in fluxos:
+        print(f"⏱️  Executando {fluxo} ({args.funcionarios * args.setores * len(FLUXOS[fluxo])} PDFs)...")
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as arquivo:
+            caminho_resultado = arquivo.name
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--interno", f"{fluxo}:{caminho_resultado}", *_argumentos_cenario(args)],
+            stdout=None if args.verboso else subprocess.DEVNULL,
+        )
+        try:
+            with open(caminho_resultado, encoding="utf-8") as f:
+                resultados[fluxo] = json.load(f)
+        except (OSError, ValueError):
+            resultados[fluxo] = {"erro": "o processo do benchmark terminou sem resultado (use --verboso)"}
+        finally:
+            os.remove(caminho_resultado)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+        anterior = {**anterior["resultados"], "_commit": anterior["commit"]}
+    _imprimir(resultados, anterior)
+
+    commit = _commit_atual()
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump({"commit": commit, "data": datetime.now().isoformat(timespec="seconds"),
+                   "parametros": vars(args), "resultados": resultados}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultado salvo em: {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import random
+import itertools
+import pandas as pd
+
+# --- CONFIGURAÇÕES DOS DADOS SINTÉTICOS ---
+PRIMEIROS_NOMES = ["ANA", "BRUNO", "CARLA", "DANIEL", "EDUARDA", "FABIO", "GABRIELA", "HEITOR",
+                   "ISABELA", "JOAO", "KARINA", "LUCAS", "MARIANA", "NICOLAS", "OTAVIO", "PAULA",
+                   "RAFAEL", "SABRINA", "TIAGO", "VANESSA"]
+NOMES_MEIO = ["ALVES", "BARBOSA", "CARDOSO", "DIAS", "FERREIRA", "GOMES", "LIMA", "MARTINS",
+              "NUNES", "OLIVEIRA", "PEREIRA", "RIBEIRO", "ROCHA", "SANTOS", "TEIXEIRA", "VIEIRA"]
+SOBRENOMES = ["ARAUJO", "CASTRO", "CAVALCANTI", "DUARTE", "FARIAS", "FONSECA", "MACHADO", "MENDES",
+              "MOREIRA", "PINTO", "REIS", "SOARES", "SOUZA", "TAVARES"]
+ULTIMOS_NOMES = ["AZEVEDO", "BRAGA", "CUNHA", "ESTEVES", "FREITAS", "GUEDES", "LOPES", "MOURA", "PRADO", "QUEIROZ"]
+ID_PRIMEIRA_PASTA = 10000   # IDs das pastas simuladas começam aqui (longe dos IDs reais)
+# ------------------------------------------
+
+
+def gerar_nomes(quantidade: int, semente: int = 42) -> list:
+    """
+    Nomes completos únicos (4 palavras), cujas 3 primeiras palavras já os identificam
+    (a quarta vem de outra lista, para o nome curto nunca ser ambíguo).
+    """
+    combinacoes = list(itertools.product(PRIMEIROS_NOMES, NOMES_MEIO, SOBRENOMES))
+    if quantidade > len(combinacoes):
+        raise ValueError(f"No máximo {len(combinacoes)} funcionários sintéticos")
+    aleatorio = random.Random(semente)
+    aleatorio.shuffle(combinacoes)
+    return [f"{a} {b} {c} {aleatorio.choice(ULTIMOS_NOMES)}" for a, b, c in combinacoes[:quantidade]]
+
+
+def gerar_planilha(caminho: str, nomes: list):
+    """ rel_funcionarios.xlsx com as colunas NOME, CPF, TELEFONE e EMAIL. """
+    pd.DataFrame({
+        "NOME": nomes,
+        "CPF": [f"{i:011d}" for i in range(1, len(nomes) + 1)],
+        "TELEFONE": [f"519{i:08d}" for i in range(1, len(nomes) + 1)],
+        "EMAIL": [f"funcionario{i}@exemplo.com" for i in range(1, len(nomes) + 1)],
+    }).to_excel(caminho, index=False)
+
+
+def gerar_arvore_cailun(id_raiz: int, setores: dict, fracao_sem_recibos: float = 0.0, semente: int = 42) -> dict:
+    """
+    Árvore Raiz -> Setor -> Funcionário -> RECIBOS no formato do ServidorCailunSimulado.
+    setores = {NOME_SETOR: [NOMES dos funcionários]}.
+    """
+    aleatorio = random.Random(semente)
+    ids = itertools.count(ID_PRIMEIRA_PASTA)
+    arvore = {id_raiz: []}
+    for nome_setor, nomes in setores.items():
+        id_setor = next(ids)
+        arvore[id_raiz].append((id_setor, nome_setor))
+        arvore[id_setor] = []
+        for nome in nomes:
+            id_func = next(ids)
+            arvore[id_setor].append((id_func, nome))
+            arvore[id_func] = [] if aleatorio.random() < fracao_sem_recibos else [(next(ids), "RECIBOS")]
+    return arvore
+
+
+def gerar_pdfs(raiz_rede: str, nomes: list, tamanho_kb: int = 100, ano: int = 2025, mes: int = 12,
+               sufixo: str = "", com_pasta_mes: bool = True) -> str:
+    """
+    Cria os PDFs de um setor na estrutura da rede (Ano/MM-AAAA), um por funcionário,
+    com o nome curto (3 primeiras palavras) como nome do arquivo. Retorna a pasta alvo.
+    """
+    pasta = os.path.join(raiz_rede, str(ano), f"{mes:02d}-{ano}") if com_pasta_mes else raiz_rede
+    os.makedirs(pasta, exist_ok=True)
+    conteudo = b"%PDF-1.4\n" + os.urandom(max(0, tamanho_kb * 1024 - 9))
+    for nome in nomes:
+        nome_arquivo = " ".join(nome.split()[:3]) + sufixo + ".pdf"
+        with open(os.path.join(pasta, nome_arquivo), "wb") as f:
+            f.write(conteudo + nome.encode("utf-8"))
+    return pasta
@@ -0,0 +1,132 @@
+import re
+import json
+import time
+import base64
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CONFIGURAÇÕES PADRÃO DO SERVIDOR SIMULADO ---
+LATENCIA_LOGIN = 0.05     # Segundos de resposta do POST /login
+LATENCIA_PASTAS = 0.03    # Segundos de resposta do GET /storage/folder/{id}/folders
+LATENCIA_ENVIO = 0.15     # Segundos de resposta do POST /subscriptionFlow
+TAXA_ERRO = 0.0           # Fração das respostas que viram 503
+TAXA_LIMITE = 0.0         # Fração das respostas que viram 429 (com Retry-After)
+RETRY_AFTER = 1           # Segundos informados no Retry-After dos 429
+STATUS_FLUXOS = ["pending", "pending", "finished", "expired"]   # Sorteados no GET /subscriptionFlow/{id}
+# --------------------------------------------------
+
+
+def _jwt_falso(expira_em: float) -> str:
+    carga = base64.urlsafe_b64encode(json.dumps({"exp": int(expira_em)}).encode()).decode().rstrip("=")
+    return f"cabecalho.{carga}.assinatura"
+
+
+class ServidorCailunSimulado:
+    """
+    Imitação local da API Cailun (/login, /storage/folder/{id}/folders,
+    /subscriptionFlow e GET /subscriptionFlow/{id}), com latência, taxa de erro e
+    árvore de pastas configuráveis.
+    A árvore é {id_pasta: [(id_filha, nome_filha), ...]}. Conta as chamadas por rota
+    e registra a latência vista pelo servidor.
+    """
+
+    def __init__(self, arvore: dict, porta: int = 0, latencia_login: float = LATENCIA_LOGIN,
+                 latencia_pastas: float = LATENCIA_PASTAS, latencia_envio: float = LATENCIA_ENVIO,
+                 taxa_erro: float = TAXA_ERRO, taxa_limite: float = TAXA_LIMITE, semente: int = 42):
+        self.arvore = arvore
+        self.latencias = {"login": latencia_login, "pastas": latencia_pastas, "envio": latencia_envio}
+        self.taxa_erro, self.taxa_limite = taxa_erro, taxa_limite
+        self.chamadas = {"login": 0, "pastas": 0, "envio": 0, "consulta": 0}
+        self.status = {}
+        self.bytes_recebidos = 0
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), self._criar_handler())
+        self._servidor.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}"
+
+    def iniciar(self):
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def _sortear_falha(self):
+        with self._lock:
+            sorteio = self._aleatorio.random()
+        if sorteio < self.taxa_limite:
+            return 429
+        if sorteio < self.taxa_limite + self.taxa_erro:
+            return 503
+        return None
+
+    def _contar(self, rota: str, status: int, tamanho: int = 0):
+        with self._lock:
+            self.chamadas[rota] += 1
+            self.status[status] = self.status.get(status, 0) + 1
+            self.bytes_recebidos += tamanho
+
+    def _criar_handler(self):
+        servidor = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _responder(self, rota, status, corpo, tamanho=0):
+                servidor._contar(rota, status, tamanho)
+                dados = json.dumps(corpo).encode("utf-8")
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", str(RETRY_AFTER))
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def _ler_corpo(self) -> int:
+                restante = tamanho = int(self.headers.get("Content-Length") or 0)
+                while restante:
+                    restante -= len(self.rfile.read(min(restante, 1024 * 1024)))
+                return tamanho
+
+            def do_POST(self):
+                tamanho = self._ler_corpo()
+                rota = "login" if self.path.startswith("/login") else "envio"
+                time.sleep(servidor.latencias[rota])
+                falha = servidor._sortear_falha() if rota == "envio" else None
+                if falha:
+                    return self._responder(rota, falha, {"message": "simulado"}, tamanho)
+                if rota == "login":
+                    return self._responder(rota, 200, {"accessToken": {"token": _jwt_falso(time.time() + 3600)}})
+                return self._responder(rota, 201, {"data": {"id": servidor.chamadas["envio"] + 1}}, tamanho)
+
+            def do_GET(self):
+                fluxo = re.match(r"/subscriptionFlow/(\d+)$", self.path)
+                if fluxo:
+                    time.sleep(servidor.latencias["pastas"])
+                    falha = servidor._sortear_falha()
+                    if falha:
+                        return self._responder("consulta", falha, {"message": "simulado"})
+                    with servidor._lock:
+                        status = servidor._aleatorio.choice(STATUS_FLUXOS)
+                    return self._responder("consulta", 200, {"data": {"id": int(fluxo.group(1)), "status": status}})
+                encontrado = re.match(r"/storage/folder/(\d+)/folders", self.path)
+                time.sleep(servidor.latencias["pastas"])
+                if not encontrado:
+                    return self._responder("pastas", 404, {"message": "rota desconhecida"})
+                falha = servidor._sortear_falha()
+                if falha:
+                    return self._responder("pastas", falha, {"message": "simulado"})
+                filhas = servidor.arvore.get(int(encontrado.group(1)), [])
+                return self._responder("pastas", 200, {"data": [{"id": i, "label": nome} for i, nome in filhas]})
+
+        return _Handler
@@ -1,22 +1,45 @@
-import requests
+import cliente_http
+import metricas
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cache_pastas import CachePastas, STALE_WHILE_REVALIDATE
 
 # --- CONFIGURAÇÕES DE PARTIDA ---
 ID_PASTA_RAIZ_SISTEMA = 3073  # ID que contém as pastas MATRIZ, FILIAL, TELE
 NOME_PASTA_TERCEIRO_NIVEL = "RECIBOS" 
+USAR_CACHE_PASTAS = True      # Desative para sempre consultar a API
+MAX_WORKERS_MAPEAMENTO = 16   # Teto de threads no pré-carregamento (ritmo ajustado por controle_concorrencia)
 # -----------------------------------
 
-def mapear_pastas_cailun(token: str, id_raiz: int) -> dict:
+_cache_pastas = None                # Aberto no primeiro uso (importar não cria a pasta cache/)
+_revalidacoes_em_andamento = set()
+_pastas_confirmadas_na_api = set()  # Pastas já relidas da API nesta execução
+_indice_funcionarios = None         # {NOME: [{setor, id_setor, id_pasta, id_recibos}]}
+_lock_revalidacoes = threading.Lock()
+
+def _obter_cache_pastas():
+    """ Cache de pastas do processo (None com USAR_CACHE_PASTAS desligado). """
+    global _cache_pastas
+    if _cache_pastas is None and USAR_CACHE_PASTAS:
+        with _lock_revalidacoes:
+            if _cache_pastas is None:
+                _cache_pastas = CachePastas()
+    return _cache_pastas
+
+def _consultar_pastas_api(token: str, id_raiz: int):
     """ 
-    Busca as subpastas em um ID específico, retornando um dicionário {NOME_PASTA: ID}.
+    Consulta a API e retorna {NOME_PASTA: ID}, ou None se a chamada falhar
+    (para não confundir erro de rede com pasta vazia ao gravar no cache).
     """
-    endpoint = f"https://api.cailun.com.br/storage/folder/{id_raiz}/folders" 
+    endpoint = f"/storage/folder/{id_raiz}/folders" 
     headers = {"Authorization": f"Bearer {token}"}
     mapa_pastas = {}
 
     try:
-        response = requests.get(endpoint, headers=headers)
+        response = cliente_http.get(endpoint, headers=headers)
         if response.status_code == 200:
             lista_itens = response.json().get('data')
             if not lista_itens or not isinstance(lista_itens, list):
@@ -26,17 +49,134 @@ def mapear_pastas_cailun(token: str, id_raiz: int) -> dict:
                     nome = item.get('label', '').strip().upper() 
                     mapa_pastas[nome] = item.get('id')
             return mapa_pastas
-        return {}
+        return None
     except Exception as e:
         print(f"❌ Erro de conexão ao buscar pastas (ID: {id_raiz}): {e}")
+        return None
+
+def _revalidar_em_segundo_plano(token: str, id_raiz: int):
+    """ Atualiza uma entrada vencida do cache sem bloquear quem pediu. """
+    with _lock_revalidacoes:
+        if id_raiz in _revalidacoes_em_andamento:
+            return
+        _revalidacoes_em_andamento.add(id_raiz)
+
+    def _revalidar():
+        try:
+            mapa = _consultar_pastas_api(token, id_raiz)
+            if mapa is not None:
+                _obter_cache_pastas().gravar(id_raiz, mapa)
+        finally:
+            with _lock_revalidacoes:
+                _revalidacoes_em_andamento.discard(id_raiz)
+
+    threading.Thread(target=_revalidar, daemon=True).start()
+
+def mapear_pastas_cailun(token: str, id_raiz: int, usar_cache: bool = True) -> dict:
+    """ 
+    Busca as subpastas em um ID específico, retornando um dicionário {NOME_PASTA: ID}.
+    Usa o cache local quando disponível; entradas vencidas são devolvidas na hora
+    e revalidadas em segundo plano (STALE_WHILE_REVALIDATE) ou recarregadas da API.
+    """
+    cache = _obter_cache_pastas()
+    if usar_cache and cache:
+        mapa, vencido = cache.obter(id_raiz)
+        if mapa is not None:
+            if not vencido:
+                return mapa
+            if STALE_WHILE_REVALIDATE:
+                _revalidar_em_segundo_plano(token, id_raiz)
+                return mapa
+
+    mapa = _consultar_pastas_api(token, id_raiz)
+    if mapa is None:
         return {}
+    if cache:
+        cache.gravar(id_raiz, mapa)
+    return mapa
+
+def invalidar_cache_pastas(id_pasta: int = None):
+    """ Invalida uma pasta específica do cache (ou o cache inteiro, sem argumento). """
+    cache = _obter_cache_pastas()
+    if cache:
+        cache.invalidar(id_pasta)
 
+def reiniciar_confirmacoes_api():
+    """
+    Esquece quais pastas já foram relidas da API. Chamado a cada recarga do contexto
+    (modo vigia): uma subpasta criada depois da última confirmação volta a ser procurada.
+    """
+    with _lock_revalidacoes:
+        _pastas_confirmadas_na_api.clear()
+
+def indexar_arvore_cailun(token: str, id_raiz: int = ID_PASTA_RAIZ_SISTEMA,
+                          max_workers: int = MAX_WORKERS_MAPEAMENTO) -> dict:
+    """
+    Percorre a árvore Setor -> Funcionário -> RECIBOS uma única vez, em largura,
+    com um pool de threads limitado, e monta o índice {NOME: [entradas]}.
+    Depois disso, buscar_id_final_recibos vira uma consulta direta ao dicionário.
+    """
+    global _indice_funcionarios
+
+    setores = mapear_pastas_cailun(token, id_raiz)
+    indice = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Nível 2: todas as pastas de funcionários de todos os setores
+        itens_setor = list(setores.items())
+        mapas_setor = pool.map(lambda item: mapear_pastas_cailun(token, item[1]), itens_setor)
+        pastas_func = [
+            (nome_setor, id_setor, nome_func, id_func)
+            for (nome_setor, id_setor), mapa in zip(itens_setor, mapas_setor)
+            for nome_func, id_func in mapa.items()
+        ]
+
+        # Nível 3: a pasta RECIBOS de cada funcionário
+        mapas_func = pool.map(lambda item: mapear_pastas_cailun(token, item[3]), pastas_func)
+        for (nome_setor, id_setor, nome_func, id_func), mapa in zip(pastas_func, mapas_func):
+            indice.setdefault(nome_func, []).append({
+                "setor": nome_setor,
+                "id_setor": id_setor,
+                "id_pasta": id_func,
+                "id_recibos": mapa.get(NOME_PASTA_TERCEIRO_NIVEL.upper()),
+            })
+
+    _indice_funcionarios = indice
+    return indice
+
+def funcionarios_sem_recibos(indice: dict = None) -> list:
+    """ Lista (NOME, SETOR) dos funcionários que têm pasta no Cailun mas não têm RECIBOS. """
+    indice = indice if indice is not None else (_indice_funcionarios or {})
+    return sorted(
+        (nome, entrada["setor"])
+        for nome, entradas in indice.items()
+        for entrada in entradas
+        if not entrada["id_recibos"]
+    )
+
+def _buscar_no_indice(id_setor_preferido, nome_funcionario):
+    """ Consulta O(1) no índice pré-carregado, priorizando o setor sugerido. """
+    entradas = [e for e in _indice_funcionarios.get(nome_funcionario.upper(), []) if e["id_recibos"]]
+    for entrada in entradas:
+        if entrada["id_setor"] == id_setor_preferido:
+            return entrada["id_recibos"]
+    return entradas[0]["id_recibos"] if entradas else None
+
+@metricas.medir("pasta_recibos")
 def buscar_id_final_recibos(token: str, id_raiz_setor_inicial: int, nome_funcionario: str) -> int or None:
     """
     Tenta encontrar a pasta RECIBOS do funcionário.
     Se não encontrar no setor inicial (ex: vindo da pasta MATRIZ na rede),
     ele faz uma busca global nas outras pastas irmãs (FILIAL, TELE).
+    Com o índice carregado por indexar_arvore_cailun, a busca é direta.
     """
+    if _indice_funcionarios is not None:
+        # Sem busca global: o índice já cobre todos os setores. Só confirma no
+        # setor sugerido, caso a pasta tenha sido criada depois do mapeamento.
+        id_final = _buscar_no_indice(id_raiz_setor_inicial, nome_funcionario)
+        if id_final or not id_raiz_setor_inicial:
+            return id_final
+        return _executar_busca_3_niveis(token, id_raiz_setor_inicial, nome_funcionario, usar_indice=False)
     
     # 1. Primeiro, tenta no setor que o orquestrador sugeriu (Baseado na pasta da Rede)
     id_final = _executar_busca_3_niveis(token, id_raiz_setor_inicial, nome_funcionario)
@@ -61,15 +201,28 @@ def buscar_id_final_recibos(token: str, id_raiz_setor_inicial: int, nome_funcion
 
     return None
 
-def _executar_busca_3_niveis(token, id_setor, nome_funcionario):
+def _buscar_subpasta(token, id_pasta, nome_subpasta):
+    """
+    Procura uma subpasta pelo nome. Se ela não estiver no mapa cacheado (pasta
+    criada depois do último mapeamento), consulta a API uma vez por execução.
+    """
+    id_subpasta = mapear_pastas_cailun(token, id_pasta).get(nome_subpasta)
+    if id_subpasta or not _obter_cache_pastas() or id_pasta in _pastas_confirmadas_na_api:
+        return id_subpasta
+    _pastas_confirmadas_na_api.add(id_pasta)
+    return mapear_pastas_cailun(token, id_pasta, usar_cache=False).get(nome_subpasta)
+
+def _executar_busca_3_niveis(token, id_setor, nome_funcionario, usar_indice=True):
     """ Função interna para evitar repetição de código (DRY) """
+    if usar_indice and _indice_funcionarios is not None:
+        entradas = _indice_funcionarios.get(nome_funcionario.upper(), [])
+        return next((e["id_recibos"] for e in entradas if e["id_setor"] == id_setor), None)
+
     # Nível 2: Buscar a Pasta do Funcionário
-    mapa_funcionarios = mapear_pastas_cailun(token, id_setor)
-    id_func = mapa_funcionarios.get(nome_funcionario.upper())
+    id_func = _buscar_subpasta(token, id_setor, nome_funcionario.upper())
     
     if id_func:
         # Nível 3: Buscar a Pasta RECIBOS
-        mapa_recibos = mapear_pastas_cailun(token, id_func)
-        return mapa_recibos.get(NOME_PASTA_TERCEIRO_NIVEL.upper())
+        return _buscar_subpasta(token, id_func, NOME_PASTA_TERCEIRO_NIVEL.upper())
     
     return None
\ No newline at end of file
@@ -0,0 +1,61 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# --- CONFIGURAÇÕES DO CACHE DE PASTAS ---
+# A árvore de pastas do Cailun quase não muda de um mês para o outro, então o
+# mapeamento {NOME_PASTA: ID} de cada pasta fica guardado localmente em SQLite.
+DIRETORIO_CACHE = os.environ.get("CAILUN_DIRETORIO_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+CAMINHO_CACHE_PASTAS = os.path.join(DIRETORIO_CACHE, "pastas_cailun.sqlite3")
+TTL_CACHE_PASTAS = 7 * 24 * 60 * 60  # Segundos até uma entrada ser considerada velha
+STALE_WHILE_REVALIDATE = True        # Entrega a entrada velha e atualiza em segundo plano
+# -----------------------------------------
+
+
+class CachePastas:
+    """
+    Cache persistente das subpastas do Cailun, indexado pelo ID da pasta pai.
+    Seguro para uso entre threads (uma única conexão protegida por lock).
+    """
+
+    def __init__(self, caminho: str = CAMINHO_CACHE_PASTAS, ttl: int = TTL_CACHE_PASTAS):
+        self.caminho = caminho
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS pastas ("
+                " id_pasta INTEGER PRIMARY KEY,"
+                " subpastas TEXT NOT NULL,"
+                " atualizado_em REAL NOT NULL)"
+            )
+
+    def obter(self, id_pasta: int):
+        """ Retorna (mapa, vencido) ou (None, None) se a pasta nunca foi cacheada. """
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT subpastas, atualizado_em FROM pastas WHERE id_pasta = ?", (id_pasta,)
+            ).fetchone()
+        if not linha:
+            return None, None
+        subpastas, atualizado_em = linha
+        return json.loads(subpastas), (time.time() - atualizado_em) > self.ttl
+
+    def gravar(self, id_pasta: int, mapa: dict):
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO pastas (id_pasta, subpastas, atualizado_em) VALUES (?, ?, ?)",
+                (id_pasta, json.dumps(mapa, ensure_ascii=False), time.time()),
+            )
+
+    def invalidar(self, id_pasta: int = None):
+        """ Remove uma pasta do cache; sem argumento, limpa o cache inteiro. """
+        with self._lock, self._conexao:
+            if id_pasta is None:
+                self._conexao.execute("DELETE FROM pastas")
+            else:
+                self._conexao.execute("DELETE FROM pastas WHERE id_pasta = ?", (id_pasta,))
@@ -0,0 +1,194 @@
+import os
+import time
+import random
+import threading
+import requests
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import metricas
+from controle_concorrencia import obter_limite
+
+# --- CONFIGURAÇÕES DO CLIENTE HTTP (COMPARTILHADO POR TODAS AS CHAMADAS CAILUN) ---
+URL_BASE_API = os.environ.get("CAILUN_API_URL", "https://api.cailun.com.br")
+TIMEOUT_CONEXAO = 10          # Segundos para abrir a conexão TCP/TLS
+TIMEOUT_LEITURA = 120         # Segundos aguardando a resposta (uploads de PDF são lentos)
+MAX_TENTATIVAS = 4            # Total de tentativas por requisição (1 + 3 repetições)
+BACKOFF_BASE = 1.0            # Espera base (s) do backoff exponencial
+BACKOFF_MAXIMO = 30.0         # Teto (s) de espera entre tentativas
+TAMANHO_POOL = 16             # Conexões keep-alive mantidas abertas para a API
+STATUS_REPETIVEIS = {500, 502, 503, 504}
+STATUS_LIMITE_TAXA = 429      # Requisição recusada pela API: sempre seguro repetir (após a pausa)
+CATEGORIAS_ROTAS = {          # Orçamento de concorrência usado por cada rota (controle_concorrencia)
+    "/storage/": "pastas",
+    "/subscriptionFlow": "envio",
+    "/login": "login",        # Sem orçamento próprio; só aparece nas métricas
+}
+METODOS_IDEMPOTENTES = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# -----------------------------------------------------------------------------------
+
+_sessao = None
+_lock_sessao = threading.Lock()
+_provedor_token = None  # (obter_token, renovar_token), registrado pelo módulo autenticacao
+
+
+def obter_sessao() -> requests.Session:
+    """ Retorna a Session única do processo, com pool de conexões keep-alive. """
+    global _sessao
+    with _lock_sessao:
+        if _sessao is None:
+            sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=TAMANHO_POOL, pool_maxsize=TAMANHO_POOL, max_retries=0)
+            sessao.mount("https://", adaptador)
+            sessao.mount("http://", adaptador)
+            _sessao = sessao
+        return _sessao
+
+
+def falhou_antes_de_enviar(erro: Exception) -> bool:
+    """
+    True quando a requisição comprovadamente não chegou ao servidor (sempre seguro
+    repetir): conexão que nem foi aberta, ou erro local (ex.: PDF ilegível) fora do HTTP.
+    """
+    if not isinstance(erro, requests.exceptions.RequestException):
+        return True
+    if isinstance(erro, requests.exceptions.ConnectTimeout):
+        return True
+    causa = erro.args[0] if erro.args else None
+    razao = getattr(causa, "reason", None)
+    return isinstance(causa, NewConnectionError) or isinstance(razao, NewConnectionError)
+
+
+def _espera_backoff(tentativa: int) -> float:
+    """ Backoff exponencial com jitter total: aleatório entre 0 e base * 2^tentativa. """
+    return random.uniform(0, min(BACKOFF_MAXIMO, BACKOFF_BASE * (2 ** tentativa)))
+
+
+def _rebobinar_arquivos(kwargs: dict):
+    """ Volta os arquivos do multipart (ou o corpo em fluxo) para o início antes de uma nova tentativa. """
+    for arquivo in (kwargs.get("files") or {}).values():
+        objeto = arquivo[1] if isinstance(arquivo, tuple) else arquivo
+        if hasattr(objeto, "seek"):
+            objeto.seek(0)
+    if hasattr(kwargs.get("data"), "seek"):
+        kwargs["data"].seek(0)
+
+
+def _retry_after(resposta) -> float:
+    """ Segundos pedidos pela API no header Retry-After (número ou data HTTP), ou 0. """
+    valor = resposta.headers.get("Retry-After")
+    if not valor:
+        return 0.0
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _categoria_da_rota(caminho: str):
+    for trecho, categoria in CATEGORIAS_ROTAS.items():
+        if trecho in caminho:
+            return categoria
+    return None
+
+
+def registrar_provedor_token(obter_token, renovar_token):
+    """
+    Registra quem fornece o token JWT. A partir daí, toda requisição com header
+    Authorization usa o token vigente e, se a API responder 401, o token é
+    renovado e a requisição é reenviada uma única vez.
+    """
+    global _provedor_token
+    _provedor_token = (obter_token, renovar_token)
+
+
+def _com_token(kwargs: dict, token: str) -> dict:
+    kwargs = dict(kwargs)
+    kwargs["headers"] = {**kwargs["headers"], "Authorization": f"Bearer {token}"}
+    return kwargs
+
+
+def requisitar(metodo: str, caminho: str, idempotente: bool = None, categoria: str = None, **kwargs) -> requests.Response:
+    """
+    Executa uma requisição na API Cailun pela Session compartilhada.
+    Regras de repetição:
+      * Falha ao conectar (a requisição nem saiu): sempre repete.
+      * Conexão resetada / timeout de leitura / 5xx: só repete se a chamada for
+        idempotente (GET por padrão, ou idempotente=True explícito, como o login).
+      * 429: sempre repete (a API recusou sem processar), respeitando o Retry-After.
+      * 401 em chamada autenticada: renova o token e reenvia uma vez (a API
+        recusou a requisição, então reenviar é seguro mesmo para POST).
+    Cada tentativa ocupa uma vaga do orçamento da categoria (pastas/envio, deduzida
+    da rota), cujo tamanho se ajusta sozinho (AIMD) conforme as respostas da API.
+    Levanta a última exceção se todas as tentativas falharem.
+    """
+    metodo = metodo.upper()
+    url = caminho if caminho.startswith("http") else f"{URL_BASE_API}{caminho}"
+    if idempotente is None:
+        idempotente = metodo in METODOS_IDEMPOTENTES
+    kwargs.setdefault("timeout", (TIMEOUT_CONEXAO, TIMEOUT_LEITURA))
+    categoria = categoria or _categoria_da_rota(caminho)
+
+    autenticada = _provedor_token is not None and "Authorization" in (kwargs.get("headers") or {})
+    if not autenticada:
+        return _requisitar_com_repeticao(metodo, url, idempotente, kwargs, categoria)
+
+    obter_token, renovar_token = _provedor_token
+    token = obter_token() or kwargs["headers"]["Authorization"].replace("Bearer ", "")
+    resposta = _requisitar_com_repeticao(metodo, url, idempotente, _com_token(kwargs, token), categoria)
+    if resposta.status_code == 401:
+        novo_token = renovar_token(token)
+        if novo_token and novo_token != token:
+            _rebobinar_arquivos(kwargs)
+            resposta = _requisitar_com_repeticao(metodo, url, idempotente, _com_token(kwargs, novo_token), categoria)
+    return resposta
+
+
+def _requisitar_com_repeticao(metodo: str, url: str, idempotente: bool, kwargs: dict, categoria: str = None) -> requests.Response:
+    limite = obter_limite(categoria)
+    corpo = kwargs.get("data")
+    tamanho_corpo = len(corpo) if hasattr(corpo, "read") and hasattr(corpo, "__len__") else 0
+    for tentativa in range(MAX_TENTATIVAS):
+        ultima = tentativa == MAX_TENTATIVAS - 1
+        espera_api = 0.0
+        if tentativa:
+            _rebobinar_arquivos(kwargs)
+        if limite:
+            limite.adquirir()
+        inicio = time.monotonic()
+        try:
+            resposta = obter_sessao().request(metodo, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as erro:
+            if limite:
+                limite.liberar(time.monotonic() - inicio)
+            metricas.registrar_http(categoria, type(erro).__name__, tamanho_corpo)
+            if ultima or not (idempotente or falhou_antes_de_enviar(erro)):
+                raise
+        else:
+            if limite:
+                limite.liberar(time.monotonic() - inicio, resposta.status_code)
+            metricas.registrar_http(categoria, resposta.status_code, tamanho_corpo)
+            espera_api = _retry_after(resposta)
+            if espera_api and limite:
+                limite.pausar(espera_api)
+            repetir = resposta.status_code == STATUS_LIMITE_TAXA or (idempotente and resposta.status_code in STATUS_REPETIVEIS)
+            if ultima or not repetir:
+                return resposta
+        # Com orçamento de categoria, a pausa do Retry-After já é aplicada em adquirir()
+        espera = _espera_backoff(tentativa)
+        if espera_api and not limite:
+            espera = max(espera, min(espera_api, BACKOFF_MAXIMO))
+        time.sleep(espera)
+
+
+def get(caminho: str, **kwargs) -> requests.Response:
+    return requisitar("GET", caminho, **kwargs)
+
+
+def post(caminho: str, **kwargs) -> requests.Response:
+    return requisitar("POST", caminho, **kwargs)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import os
+import csv
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import cliente_http
+import metricas
+import registro_envios
+from autenticacao import obter_token
+from registro_envios import RegistroEnvios
+
+# --- CONFIGURAÇÕES DA CONCILIAÇÃO DE ASSINATURAS ---
+# Consulta no Cailun a situação dos fluxos criados por esta automação que ainda não
+# terminaram (GET /subscriptionFlow/{id}), grava o resultado no registro de envios e
+# gera um CSV com quem está pendente ou expirado, para reenviar lembretes em lote.
+MAX_WORKERS_CONCILIACAO = 8          # Consultas simultâneas (o ritmo real é ajustado por controle_concorrencia)
+INTERVALO_RECONSULTA = 30 * 60       # Segundos: um fluxo consultado há menos que isso fica para a próxima
+SITUACOES_RELATORIO = [registro_envios.PENDENTE, registro_envios.EXPIRADO]
+# Status devolvidos pela API (em minúsculas) -> situação registrada. Desconhecido = PENDENTE.
+MAPA_STATUS_CAILUN = {
+    "finished": registro_envios.ASSINADO, "finalized": registro_envios.ASSINADO,
+    "completed": registro_envios.ASSINADO, "signed": registro_envios.ASSINADO,
+    "concluido": registro_envios.ASSINADO, "concluído": registro_envios.ASSINADO,
+    "finalizado": registro_envios.ASSINADO, "assinado": registro_envios.ASSINADO,
+    "expired": registro_envios.EXPIRADO, "expirado": registro_envios.EXPIRADO,
+    "refused": registro_envios.RECUSADO, "rejected": registro_envios.RECUSADO, "recusado": registro_envios.RECUSADO,
+    "canceled": registro_envios.CANCELADO, "cancelled": registro_envios.CANCELADO, "cancelado": registro_envios.CANCELADO,
+}
+# ----------------------------------------------------
+
+
+def _situacao_da_resposta(dados: dict):
+    """ (situação, status bruto da API) a partir do JSON do fluxo. """
+    if isinstance(dados.get("data"), dict):
+        dados = dados["data"]
+    status = dados.get("status") or dados.get("situation") or dados.get("statusName") or ""
+    if isinstance(status, dict):
+        status = status.get("name") or status.get("label") or status.get("id") or ""
+    status = str(status).strip()
+    return MAPA_STATUS_CAILUN.get(status.lower(), registro_envios.PENDENTE), status
+
+@metricas.medir("consulta_status")
+def consultar_situacao_fluxo(token: str, id_fluxo: str):
+    """ (situação, status bruto) de um fluxo no Cailun, ou None se a consulta falhar. """
+    try:
+        resp = cliente_http.get(f"/subscriptionFlow/{id_fluxo}", headers={"Authorization": f"Bearer {token}"},
+                                categoria="consulta")
+        if resp.status_code == 404:
+            return registro_envios.NAO_ENCONTRADO, "404"
+        if resp.status_code != 200:
+            print(f"   ↳ ❌ Fluxo {id_fluxo}: consulta falhou ({resp.status_code})")
+            return None
+        return _situacao_da_resposta(resp.json())
+    except ValueError:
+        print(f"   ↳ ❌ Fluxo {id_fluxo}: resposta inválida da API")
+        return None
+    except Exception as e:
+        print(f"   ↳ ❌ Fluxo {id_fluxo}: erro de conexão ({e})")
+        return None
+
+def gravar_relatorio_pendencias(registro: RegistroEnvios, caminho: str = None) -> str:
+    """ CSV com os fluxos pendentes e expirados (mais antigos primeiro). Retorna o caminho. """
+    caminho = caminho or os.path.join(
+        metricas.DIRETORIO_RELATORIOS, f"assinaturas_pendentes_{datetime.now():%Y%m%d_%H%M%S}.csv"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    agora = time.time()
+    with open(caminho, "w", newline="", encoding="utf-8-sig") as f:
+        escritor = csv.writer(f, delimiter=";")
+        escritor.writerow(["SITUACAO", "FUNCIONARIO", "ARQUIVO", "ID_FLUXO", "ENVIADO_EM", "DIAS_DESDE_ENVIO", "STATUS_API"])
+        for linha in registro.assinaturas(SITUACOES_RELATORIO):
+            escritor.writerow([
+                linha["situacao"], linha["funcionario"], os.path.basename(linha["caminho"] or ""), linha["id_fluxo"],
+                datetime.fromtimestamp(linha["enviado_em"]).strftime("%Y-%m-%d %H:%M:%S"),
+                int((agora - linha["enviado_em"]) // 86400), linha["status_api"] or "",
+            ])
+    return caminho
+
+def conciliar_assinaturas(max_workers: int = MAX_WORKERS_CONCILIACAO, reconsultar_todos: bool = False,
+                          registro: RegistroEnvios = None):
+    """
+    Atualiza a situação de todos os fluxos ainda não finalizados e gera o relatório
+    de pendências. Cada execução só consulta os pendentes: os fluxos que chegaram a
+    uma situação final (assinado, expirado, recusado, cancelado) não são consultados de novo.
+    """
+    print("\n--- 🔎 CONCILIAÇÃO DE ASSINATURAS CAILUN ---")
+    registro = registro or RegistroEnvios()
+    novos = registro.importar_fluxos_enviados()
+    if novos:
+        print(f"📥 {novos} fluxo(s) novo(s) desde a última conciliação.")
+
+    limite_consulta = None if reconsultar_todos else time.time() - INTERVALO_RECONSULTA
+    pendentes = registro.fluxos_pendentes(limite_consulta)
+    print(f"🔄 Consultando {len(pendentes)} fluxo(s) pendente(s) (até {max_workers} consultas simultâneas)...")
+
+    contagem = {}
+    if pendentes:
+        token = obter_token()
+        if not token:
+            print("🛑 Erro crítico: Falha na autenticação com a API.")
+            return None
+
+        def _consultar(linha):
+            resultado = consultar_situacao_fluxo(token, linha["id_fluxo"])
+            if resultado:
+                registro.atualizar_situacao(linha["id_fluxo"], *resultado)
+            return resultado[0] if resultado else "FALHA_CONSULTA"
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for situacao in pool.map(_consultar, pendentes):
+                contagem[situacao] = contagem.get(situacao, 0) + 1
+                metricas.contar(f"conciliacao_{situacao.lower()}")
+
+    for situacao, quantidade in sorted(contagem.items()):
+        print(f"   ↳ {situacao}: {quantidade}")
+    caminho = gravar_relatorio_pendencias(registro)
+    pendencias = registro.assinaturas(SITUACOES_RELATORIO)
+    print(f"📄 Relatório de pendências ({len(pendencias)} fluxo(s) pendente(s) ou expirado(s)): {caminho}")
+    return caminho
+
+if __name__ == "__main__":
+    #   python conciliacao_assinaturas.py            -> consulta os pendentes e gera o CSV
+    #   python conciliacao_assinaturas.py --todos    -> ignora o INTERVALO_RECONSULTA
+    parser = argparse.ArgumentParser(description="Conciliação da situação das assinaturas enviadas ao Cailun.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS_CONCILIACAO, help="Teto de consultas simultâneas")
+    parser.add_argument("--todos", action="store_true", help="Reconsulta também os pendentes consultados há pouco")
+    args = parser.parse_args()
+
+    metricas.iniciar_execucao()
+    conciliar_assinaturas(args.workers, args.todos)
+    print(f"📈 Métricas da execução: {metricas.finalizar_execucao('conciliacao')}")
@@ -0,0 +1,99 @@
+import time
+import threading
+from collections import deque
+
+# --- CONFIGURAÇÕES DO CONTROLE DE CONCORRÊNCIA (AIMD) ---
+# Cada categoria de chamada tem o seu orçamento de requisições simultâneas. O limite
+# sobe devagar (+1 a cada "janela" de respostas boas) e cai pela metade quando a API
+# dá sinal de sobrecarga: 429, 5xx, queda de conexão/timeout ou latência disparando.
+# No envio a latência acompanha o tamanho do PDF (e não a carga da API): ali só contam
+# 429, 5xx e timeouts ("latencia": False).
+CATEGORIAS_CONCORRENCIA = {
+    "pastas": {"inicial": 4, "minimo": 1, "maximo": 16},                      # GET /storage/folder/{id}/folders
+    "envio": {"inicial": 2, "minimo": 1, "maximo": 8, "latencia": False},     # POST /subscriptionFlow
+    "consulta": {"inicial": 4, "minimo": 1, "maximo": 16},                    # GET /subscriptionFlow/{id} (conciliação)
+}
+FATOR_REDUCAO = 0.5          # Redução multiplicativa do limite a cada sinal de sobrecarga
+FATOR_LATENCIA = 2.0         # Latência média acima de N x a mínima recente conta como sobrecarga
+JANELA_LATENCIA = 50         # Respostas consideradas para a latência mínima (linha de base)
+RETRY_AFTER_MAXIMO = 120.0   # Teto (s) para pausas pedidas pela API via Retry-After
+# ---------------------------------------------------------
+
+
+class LimiteAdaptativo:
+    """
+    Semáforo de tamanho variável: adquirir() espera uma vaga (e o fim de uma pausa
+    pedida pela API); liberar() informa como a chamada terminou e ajusta o limite.
+    """
+
+    def __init__(self, nome: str, inicial: int, minimo: int, maximo: int, latencia: bool = True):
+        self.nome = nome
+        self.latencia = latencia          # False: latência alta não conta como sobrecarga
+        self.minimo, self.maximo = minimo, maximo
+        self.limite = float(inicial)
+        self._em_voo = 0
+        self._pausado_ate = 0.0
+        self._ultima_reducao = 0.0
+        self._latencia_media = None
+        self._latencias = deque(maxlen=JANELA_LATENCIA)
+        self._condicao = threading.Condition()
+
+    def adquirir(self):
+        with self._condicao:
+            while True:
+                pausa = self._pausado_ate - time.monotonic()
+                if pausa > 0:
+                    self._condicao.wait(pausa)
+                elif self._em_voo >= int(self.limite):
+                    self._condicao.wait()
+                else:
+                    self._em_voo += 1
+                    return
+
+    def liberar(self, latencia: float, status: int = None):
+        """ status=None indica falha de conexão ou timeout (sem resposta da API). """
+        sobrecarga = status is None or status == 429 or status >= 500
+        with self._condicao:
+            self._em_voo -= 1
+            if status is not None:
+                self._latencias.append(latencia)
+                self._latencia_media = latencia if self._latencia_media is None else 0.8 * self._latencia_media + 0.2 * latencia
+                if (self.latencia and len(self._latencias) >= 5
+                        and self._latencia_media > FATOR_LATENCIA * min(self._latencias)):
+                    sobrecarga = True
+
+            agora = time.monotonic()
+            if sobrecarga:
+                # No máximo uma redução por "ida e volta": respostas ruins da mesma leva contam uma vez
+                if agora - self._ultima_reducao >= (self._latencia_media or 0):
+                    self.limite = max(self.minimo, self.limite * FATOR_REDUCAO)
+                    self._ultima_reducao = agora
+                    # Nova linha de base depois de reduzir, para não reduzir em cascata
+                    self._latencias.clear()
+            elif status < 400:
+                self.limite = min(self.maximo, self.limite + 1 / self.limite)
+            self._condicao.notify_all()
+
+    def pausar(self, segundos: float):
+        """ Retry-After: ninguém da categoria sai antes do prazo pedido pela API. """
+        segundos = min(segundos, RETRY_AFTER_MAXIMO)
+        with self._condicao:
+            agora = time.monotonic()
+            ja_pausado = self._pausado_ate > agora
+            self._pausado_ate = max(self._pausado_ate, agora + segundos)
+        if not ja_pausado:
+            print(f"   ⏳ API pediu pausa de {segundos:.0f}s ({self.nome}); limite atual: {int(self.limite)} simultâneas")
+
+
+_limites = {}
+_lock_limites = threading.Lock()
+
+
+def obter_limite(categoria: str):
+    """ LimiteAdaptativo da categoria (um por processo), ou None se ela não for controlada. """
+    if categoria not in CATEGORIAS_CONCORRENCIA:
+        return None
+    with _lock_limites:
+        if categoria not in _limites:
+            _limites[categoria] = LimiteAdaptativo(categoria, **CATEGORIAS_CONCORRENCIA[categoria])
+        return _limites[categoria]
@@ -0,0 +1,88 @@
+import os
+import re
+import queue
+import threading
+
+# --- CONFIGURAÇÕES DA DESCOBERTA DE PDFs ---
+MAX_WORKERS_DESCOBERTA = 8  # Raízes de rede varridas ao mesmo tempo
+# --------------------------------------------
+
+_PADRAO_MES = re.compile(r"(\d{2})-(\d{4})")
+
+
+def _subpastas(caminho: str) -> list:
+    """ Nomes das subpastas, usando o tipo já devolvido pelo os.scandir (sem um stat por item). """
+    with os.scandir(caminho) as entradas:
+        return [entrada.name for entrada in entradas if entrada.is_dir()]
+
+def encontrar_pasta_recente(caminho_base):
+    """
+    Encontra o caminho da pasta do mês/ano mais recente na rede (Ano > MM-AAAA).
+    Uma única listagem por nível; a ordenação usa (ano, mês) sem datetime.strptime.
+    """
+    try:
+        anos = [d for d in _subpastas(caminho_base) if d.isdigit() and len(d) == 4]
+        if not anos: return None
+        caminho_ano = os.path.join(caminho_base, max(anos))
+
+        meses = []
+        for d in _subpastas(caminho_ano):
+            encontrado = _PADRAO_MES.match(d)
+            if encontrado and 1 <= int(encontrado.group(1)) <= 12:
+                meses.append(((int(encontrado.group(2)), int(encontrado.group(1))), d))
+        if not meses: return None
+        return os.path.join(caminho_ano, max(meses)[1])
+    except OSError:
+        return None
+
+def listar_pdfs(pasta: str):
+    """ PDFs da pasta (só arquivos), numa única listagem. """
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if entrada.name.lower().endswith(".pdf") and entrada.is_file():
+                yield entrada.path
+
+def descobrir_pdfs(raizes: list, usar_base_sem_mes=False, max_workers: int = MAX_WORKERS_DESCOBERTA):
+    """
+    Varre todas as raízes de rede ao mesmo tempo e entrega os PDFs em fluxo contínuo,
+    à medida que são encontrados, como tuplas (raiz, pasta_alvo, caminho_pdf).
+    Uma raiz sem pasta do mês (ou inacessível) gera uma única tupla (raiz, None, None).
+    Com usar_base_sem_mes=True (ou um conjunto de raízes), a própria raiz é usada
+    quando não há pasta do mês.
+    """
+    fila = queue.Queue()
+    fim = object()
+    pendentes = list(raizes)
+    lock = threading.Lock()
+
+    def _varrer_raizes():
+        while True:
+            with lock:
+                if not pendentes:
+                    break
+                raiz = pendentes.pop(0)
+            pasta_alvo = encontrar_pasta_recente(raiz)
+            usar_base = usar_base_sem_mes if isinstance(usar_base_sem_mes, bool) else raiz in usar_base_sem_mes
+            if not pasta_alvo and usar_base and os.path.isdir(raiz):
+                pasta_alvo = raiz
+            if not pasta_alvo:
+                fila.put((raiz, None, None))
+                continue
+            try:
+                for caminho_pdf in listar_pdfs(pasta_alvo):
+                    fila.put((raiz, pasta_alvo, caminho_pdf))
+            except OSError as e:
+                print(f"⚠️ Falha ao listar {pasta_alvo}: {e}")
+        fila.put(fim)
+
+    quantidade = max(1, min(max_workers, len(raizes)))
+    for _ in range(quantidade):
+        threading.Thread(target=_varrer_raizes, daemon=True).start()
+
+    terminados = 0
+    while terminados < quantidade:
+        item = fila.get()
+        if item is fim:
+            terminados += 1
+        else:
+            yield item
@@ -0,0 +1,107 @@
+import io
+import os
+import re
+
+# --- CONFIGURAÇÕES DA DIVISÃO DE PDF CONSOLIDADO ---
+# Um PDF único exportado pela folha (ou pelo ponto) com as páginas de todos os
+# funcionários em sequência. Cada página é lida uma vez; o nome do funcionário sai
+# do texto da página pelo primeiro padrão que casar (grupo 1 = nome). Páginas sem
+# nome reconhecível continuam o documento do funcionário anterior (ex.: verso).
+PADROES_NOME_FUNCIONARIO = [
+    r"NOME DO FUNCION[AÁ]RIO\s*[:\-]?\s*([A-ZÀ-Ü][A-ZÀ-Ü' ]+)",
+    r"FUNCION[AÁ]RIO\s*[:\-]\s*(?:\d+\s*[-–]?\s*)?([A-ZÀ-Ü][A-ZÀ-Ü' ]+)",
+    r"COLABORADOR\s*[:\-]\s*(?:\d+\s*[-–]?\s*)?([A-ZÀ-Ü][A-ZÀ-Ü' ]+)",
+    r"^\s*NOME\s*[:\-]\s*([A-ZÀ-Ü][A-ZÀ-Ü' ]+)",
+]
+MINIMO_PALAVRAS_NOME = 2     # Menos que isso não é tratado como nome de funcionário
+# ----------------------------------------------------
+
+_padroes = [re.compile(padrao, re.IGNORECASE | re.MULTILINE) for padrao in PADROES_NOME_FUNCIONARIO]
+
+
+def _pypdf():
+    """
+    Pacote pypdf, importado só no primeiro uso (não pesa no início das execuções
+    comuns). É opcional: só o modo "consolidado" precisa dele. None se ausente.
+    """
+    try:
+        import pypdf
+        return pypdf
+    except ImportError:
+        return None
+
+
+def _nome_da_pagina(texto: str):
+    """ Nome do funcionário no texto da página, em maiúsculas, ou None. """
+    for padrao in _padroes:
+        encontrado = padrao.search(texto or "")
+        if not encontrado:
+            continue
+        # O nome termina onde começa outro campo (2+ espaços) ou na quebra de linha
+        nome = re.split(r"\s{2,}", encontrado.group(1).strip())[0].upper()
+        if len(nome.split()) >= MINIMO_PALAVRAS_NOME:
+            return nome
+    return None
+
+
+def _documento_das_paginas(leitor, inicio: int, fim: int, nome_arquivo: str) -> io.BytesIO:
+    """ PDF (em memória) com as páginas [inicio, fim] do leitor, numeradas a partir de 1. """
+    escritor = _pypdf().PdfWriter()
+    for indice in range(inicio - 1, fim):
+        escritor.add_page(leitor.pages[indice])
+    documento = io.BytesIO()
+    escritor.write(documento)
+    documento.seek(0)
+    documento.name = nome_arquivo
+    return documento
+
+
+def nome_da_parte(caminho_consolidado: str, nome_funcionario: str) -> str:
+    """ Nome do PDF de um funcionário no Cailun: '<consolidado> - <NOME>.pdf'. """
+    return f"{os.path.splitext(os.path.basename(caminho_consolidado))[0]} - {nome_funcionario}.pdf"
+
+
+def dividir_pdf_consolidado(caminho_consolidado: str):
+    """
+    Gera, página a página, os documentos de cada funcionário de um PDF consolidado:
+    (nome_funcionario, [pagina_inicial, pagina_final], documento em memória).
+    Só as páginas do funcionário atual ficam em memória; nada é gravado na rede.
+    Páginas antes do primeiro nome reconhecido saem com nome_funcionario None.
+    """
+    pypdf = _pypdf()
+    if pypdf is None:
+        print("❌ Divisão de PDF consolidado requer o pacote pypdf (pip install pypdf).")
+        return
+
+    with open(caminho_consolidado, "rb") as arquivo:
+        leitor = pypdf.PdfReader(arquivo)
+        nome_atual, inicio = None, 1
+        for numero, pagina in enumerate(leitor.pages, start=1):
+            try:
+                nome = _nome_da_pagina(pagina.extract_text())
+            except Exception as e:
+                print(f"   ↳ ⚠️ Página {numero}: texto ilegível ({e}); mantida com o documento anterior.")
+                nome = None
+            if nome and nome != nome_atual:
+                if numero > 1:
+                    yield nome_atual, [inicio, numero - 1], _documento_das_paginas(
+                        leitor, inicio, numero - 1, nome_da_parte(caminho_consolidado, nome_atual or "SEM NOME"))
+                nome_atual, inicio = nome, numero
+        if len(leitor.pages) >= inicio:
+            yield nome_atual, [inicio, len(leitor.pages)], _documento_das_paginas(
+                leitor, inicio, len(leitor.pages), nome_da_parte(caminho_consolidado, nome_atual or "SEM NOME"))
+
+
+def extrair_paginas(caminho_consolidado: str, paginas: list, nome_arquivo: str, leitores: dict = None) -> io.BytesIO:
+    """
+    Refaz em memória o documento das páginas [inicial, final] de um consolidado
+    (execução de um plano salvo). leitores guarda um PdfReader aberto por arquivo,
+    para não reler o consolidado a cada funcionário.
+    """
+    pypdf = _pypdf()
+    if pypdf is None:
+        raise RuntimeError("Divisão de PDF consolidado requer o pacote pypdf (pip install pypdf).")
+    leitores = {} if leitores is None else leitores
+    if caminho_consolidado not in leitores:
+        leitores[caminho_consolidado] = pypdf.PdfReader(caminho_consolidado)
+    return _documento_das_paginas(leitores[caminho_consolidado], paginas[0], paginas[1], nome_arquivo)
@@ -0,0 +1,110 @@
+import io
+import sys
+import queue
+import threading
+
+# --- CONFIGURAÇÕES DA ETAPA DE ENVIO ---
+MAX_WORKERS_ENVIO = 8  # Teto de uploads simultâneos (o ritmo real é ajustado por controle_concorrencia)
+TRABALHOS_POR_WORKER = 4  # Trabalhos prontos na fila por worker: limita o que o gerador adianta (e a memória)
+# ---------------------------------------
+
+
+class _SaidaPorThread(io.TextIOBase):
+    """
+    Substitui o sys.stdout durante a etapa de envio: cada worker escreve no seu
+    próprio buffer, e o console só recebe o texto de um documento quando ele
+    termina, na mesma ordem da fila. Assim os prints existentes continuam valendo.
+    """
+
+    def __init__(self, saida_original):
+        self._original = saida_original
+        self._local = threading.local()
+
+    def iniciar_buffer(self):
+        self._local.buffer = io.StringIO()
+
+    def coletar_buffer(self) -> str:
+        buffer = getattr(self._local, "buffer", None)
+        self._local.buffer = None
+        return buffer.getvalue() if buffer else ""
+
+    def write(self, texto):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._original).write(texto)
+
+    def flush(self):
+        self._original.flush()
+
+
+def executar_envios(trabalhos, funcao_envio, max_workers: int = MAX_WORKERS_ENVIO) -> list:
+    """
+    Executa funcao_envio(trabalho) para cada trabalho com N workers alimentados
+    por uma fila. A saída de cada documento é impressa inteira e na ordem original.
+    trabalhos pode ser uma lista ou um gerador: os envios começam assim que o
+    primeiro trabalho chega, enquanto o gerador ainda produz os seguintes. A fila
+    é limitada, então o gerador nunca fica muito à frente dos envios.
+    Retorna a lista de resultados (True/False), na mesma ordem dos trabalhos.
+    """
+    fila = queue.Queue(maxsize=max_workers * TRABALHOS_POR_WORKER)
+    condicao = threading.Condition()
+    itens = []          # Um dict por trabalho: {"concluido", "saida", "resultado"}
+    estado = {"alimentacao_terminou": False, "erro": None}
+    saida = _SaidaPorThread(sys.stdout)
+
+    def _alimentar():
+        try:
+            for trabalho in trabalhos:
+                item = {"concluido": threading.Event(), "saida": "", "resultado": None}
+                with condicao:
+                    itens.append(item)
+                    condicao.notify_all()
+                fila.put((item, trabalho))
+        except Exception as e:
+            estado["erro"] = e
+        finally:
+            for _ in range(max_workers):
+                fila.put(None)
+            with condicao:
+                estado["alimentacao_terminou"] = True
+                condicao.notify_all()
+
+    def _worker():
+        while True:
+            proximo = fila.get()
+            if proximo is None:
+                return
+            item, trabalho = proximo
+            saida.iniciar_buffer()
+            try:
+                item["resultado"] = bool(funcao_envio(trabalho))
+            except Exception as e:
+                print(f"   ↳ 💥 ERRO inesperado no envio: {e}")
+                item["resultado"] = False
+            finally:
+                item["saida"] = saida.coletar_buffer()
+                item["concluido"].set()
+
+    sys.stdout = saida
+    try:
+        threading.Thread(target=_alimentar, daemon=True).start()
+        for _ in range(max_workers):
+            threading.Thread(target=_worker, daemon=True).start()
+
+        indice = 0
+        while True:
+            with condicao:
+                while indice >= len(itens) and not estado["alimentacao_terminou"]:
+                    condicao.wait()
+                if indice >= len(itens):
+                    break
+                item = itens[indice]
+            item["concluido"].wait()
+            saida._original.write(item["saida"])
+            saida._original.flush()
+            indice += 1
+    finally:
+        sys.stdout = saida._original
+
+    if estado["erro"]:
+        raise estado["erro"]
+    return [item["resultado"] for item in itens]
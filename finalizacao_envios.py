@@ -0,0 +1,146 @@
+import os
+import sys
+import heapq
+import queue
+import itertools
+import threading
+import time
+
+import metricas
+import registro_envios
+
+# --- CONFIGURAÇÕES DA MOVIMENTAÇÃO PARA ENVIADOS ---
+# Depois do envio, o PDF é movido para a subpasta ENVIADOS por uma thread própria:
+# os workers de envio só deixam o arquivo na fila e seguem para o próximo upload.
+# Arquivo em uso (aberto por alguém na rede) é tentado de novo com espera crescente.
+# O registro de envios é o diário: o que está ENVIADO e não MOVIDO é retomado na
+# execução seguinte, sem reenviar.
+TENTATIVAS_MOVIMENTACAO = 5        # Tentativas por arquivo nesta execução
+ESPERA_INICIAL_MOVIMENTACAO = 1.0  # Segundos antes da 2ª tentativa; dobra a cada nova falha
+# ----------------------------------------------------
+
+
+class FinalizadorMovimentos:
+    """
+    Fila de movimentações para ENVIADOS, atendida por uma thread em segundo plano.
+    Cada pasta ENVIADOS é criada uma vez por execução; o estado MOVIDO é gravado no
+    registro assim que o arquivo sai da pasta do mês.
+    """
+
+    def __init__(self, registro):
+        self.registro = registro
+        self.movidos = 0
+        self.falhas = 0
+        self._fila = queue.Queue()            # Sem limite: quem agenda nunca espera
+        self._retentativas = []               # heap (quando, ordem, item)
+        self._ordem = itertools.count()
+        self._agendados = set()               # Caminhos na fila ou aguardando nova tentativa
+        self._lock = threading.Lock()
+        self._pastas_criadas = set()
+        self._encerrando = False
+        self._thread = None
+        # A thread escreve no console de quando foi criada: durante os envios o sys.stdout
+        # é trocado por envio_paralelo (saída por worker), e essa troca não é segura aqui
+        self._saida = sys.stdout
+
+    def agendar(self, hash_doc: str, id_pasta: int, caminho: str, registrar: bool = True):
+        """
+        Põe o arquivo na fila de movimentação (ignorado se já estiver nela). A fila é por
+        caminho: cópias idênticas com a mesma chave no registro (mesmo PDF em duas pastas
+        do mesmo funcionário) são movidas cada uma; registrar=False não grava MOVIDO,
+        para a cópia não tomar a linha do arquivo original.
+        """
+        with self._lock:
+            if caminho in self._agendados:
+                return
+            self._agendados.add(caminho)
+        self._fila.put({"hash": hash_doc, "id_pasta": id_pasta, "caminho": caminho,
+                        "registrar": registrar, "tentativas": 0})
+
+    def retomar_pendentes(self) -> int:
+        """ Agenda os documentos enviados e ainda não movidos (execuções anteriores). """
+        pendentes = self.registro.movimentos_pendentes()
+        for linha in pendentes:
+            self.agendar(linha["hash"], linha["id_pasta"], linha["caminho"])
+        if pendentes:
+            print(f"📦 {len(pendentes)} arquivo(s) enviado(s) em execução anterior aguardando ir para ENVIADOS.")
+        return len(pendentes)
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+        return self
+
+    def aguardar(self) -> bool:
+        """ Espera a fila (e as novas tentativas) terminar. True se tudo foi movido. """
+        self._fila.put(None)
+        self._thread.join()
+        if self.falhas:
+            print(f"⚠️ {self.falhas} arquivo(s) não puderam ir para ENVIADOS; ficam registrados para a próxima execução.")
+        return not self.falhas
+
+    def _executar(self):
+        while True:
+            if self._encerrando and not self._retentativas and self._fila.empty():
+                return
+            espera = max(0.0, self._retentativas[0][0] - time.monotonic()) if self._retentativas else None
+            try:
+                item = self._fila.get(timeout=espera)
+            except queue.Empty:
+                item = heapq.heappop(self._retentativas)[2]
+            if item is None:
+                self._encerrando = True
+                continue
+            try:
+                self._processar(item)
+            except Exception as e:
+                # Fica ENVIADO no registro: a próxima execução tenta de novo
+                print(f"   🛑 Erro ao organizar arquivo {os.path.basename(item['caminho'])}: {e}", file=self._saida, flush=True)
+                self.falhas += 1
+
+    def _processar(self, item):
+        caminho = item["caminho"]
+        pasta_enviados = os.path.join(os.path.dirname(caminho), "ENVIADOS")
+        destino = os.path.join(pasta_enviados, os.path.basename(caminho))
+        try:
+            self._mover(caminho, pasta_enviados, destino)
+        except FileNotFoundError:
+            self._pastas_criadas.discard(pasta_enviados)
+            if os.path.exists(caminho):
+                self._tentar_de_novo(item, "pasta ENVIADOS removida")
+            else:
+                # Já movido (ex.: execução anterior caiu antes de registrar) ou apagado da rede
+                self._concluir(item, None if os.path.exists(destino) else "arquivo não encontrado na origem")
+        except OSError as e:
+            self._tentar_de_novo(item, e)
+        else:
+            self._concluir(item)
+
+    @metricas.medir("mover")
+    def _mover(self, caminho: str, pasta_enviados: str, destino: str):
+        if pasta_enviados not in self._pastas_criadas:
+            os.makedirs(pasta_enviados, exist_ok=True)
+            self._pastas_criadas.add(pasta_enviados)
+        os.replace(caminho, destino)  # Mesma pasta de rede: um único rename
+
+    def _concluir(self, item, detalhe: str = None):
+        if item["registrar"]:
+            self.registro.registrar(item["hash"], item["id_pasta"], registro_envios.MOVIDO, detalhe=detalhe)
+        metricas.contar("movidos")
+        self.movidos += 1
+        with self._lock:
+            self._agendados.discard(item["caminho"])
+
+    def _tentar_de_novo(self, item, erro):
+        item["tentativas"] += 1
+        arquivo = os.path.basename(item["caminho"])
+        if item["tentativas"] >= TENTATIVAS_MOVIMENTACAO:
+            print(f"   🛑 Erro ao organizar arquivo {arquivo}: {erro}", file=self._saida, flush=True)
+            metricas.contar("falhas_movimentacao")
+            self.falhas += 1
+            with self._lock:
+                self._agendados.discard(item["caminho"])
+            return
+        espera = ESPERA_INICIAL_MOVIMENTACAO * 2 ** (item["tentativas"] - 1)
+        print(f"   ⏳ {arquivo} em uso ({erro}); nova tentativa em {espera:.0f}s.", file=self._saida, flush=True)
+        heapq.heappush(self._retentativas, (time.monotonic() + espera, next(self._ordem), item))
@@ -0,0 +1,201 @@
+import os
+import re
+import csv
+import threading
+import unicodedata
+from datetime import datetime
+
+TAMANHO_MINIMO_PALAVRA = 3      # Palavras menores (DA, DE, DOS...) não entram no match
+CAMINHO_FILA_REVISAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "revisao_manual.csv")
+
+_lock_revisao = threading.Lock()
+
+
+def normalizar_nome(texto: str) -> str:
+    """ Remove acentos (Unicode NFKD), pontuação e espaços extras: 'João_Silva' -> 'JOAO SILVA'. """
+    texto = re.sub(r'[ºª°]', ' ', str(texto))
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.sub(r'[^A-Z0-9]+', ' ', texto.upper()).split())
+
+
+def _palavras_chave(nome: str) -> set:
+    return {p for p in normalizar_nome(nome).split() if len(p) >= TAMANHO_MINIMO_PALAVRA}
+
+
+def _bigramas(palavra: str) -> set:
+    palavra = f"#{palavra}#"
+    return {palavra[i:i + 2] for i in range(len(palavra) - 1)}
+
+
+def _distancia_maxima(palavra: str) -> int:
+    """ Orçamento de erros de digitação por palavra, proporcional ao tamanho. """
+    if len(palavra) < 4:
+        return 0
+    return 1 if len(palavra) <= 7 else 2
+
+
+def _distancia_edicao(a: str, b: str, limite: int) -> int:
+    """ Levenshtein com corte: retorna limite + 1 assim que a distância passar do limite. """
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if min(atual) > limite:
+            return limite + 1
+        anterior = atual
+    return anterior[-1]
+
+
+class BaseFuncionarios(dict):
+    """
+    Dicionário {NOME_COMPLETO: dados} com um índice invertido palavra -> funcionários,
+    montado uma única vez no carregamento da planilha. A busca por nome curto vira
+    a interseção das listas de cada palavra, em vez de varrer a base inteira.
+    As palavras são indexadas já normalizadas (sem acento), e um índice de bigramas
+    sobre o vocabulário permite achar palavras com erro de digitação sem varrer a base.
+    """
+
+    def __init__(self, dados: dict = None):
+        super().__init__()
+        self._nomes = []        # id -> NOME_COMPLETO (ordem da planilha)
+        self._normalizados = [] # id -> nome normalizado
+        self._ids = {}          # NOME_COMPLETO -> id
+        self._indice = {}       # PALAVRA -> {ids}
+        self._bigramas = {}     # (TAMANHO, BIGRAMA) -> {PALAVRA} (vocabulário)
+        for nome, dados_func in (dados or {}).items():
+            self[nome] = dados_func
+
+    def __setitem__(self, nome, dados_func):
+        if nome not in self._ids:
+            id_func = self._ids[nome] = len(self._nomes)
+            self._nomes.append(nome)
+            self._normalizados.append(normalizar_nome(nome))
+            for palavra in _palavras_chave(nome):
+                if palavra not in self._indice:
+                    self._indice[palavra] = set()
+                    for bigrama in _bigramas(palavra):
+                        self._bigramas.setdefault((len(palavra), bigrama), set()).add(palavra)
+                self._indice[palavra].add(id_func)
+        super().__setitem__(nome, dados_func)
+
+    def candidatos(self, nome_curto: str) -> list:
+        """ Todos os nomes completos que contêm TODAS as palavras-chave do nome curto. """
+        palavras = _palavras_chave(nome_curto)
+        if not palavras:
+            return []
+        listas = sorted((self._indice.get(p, set()) for p in palavras), key=len)
+        ids = set(listas[0]).intersection(*listas[1:])
+        return [self._nomes[i] for i in sorted(ids)]
+
+    def _palavras_parecidas(self, palavra: str) -> dict:
+        """ {PALAVRA_DO_VOCABULÁRIO: distância} dentro do orçamento de erros. """
+        if palavra in self._indice:
+            return {palavra: 0}
+        limite = _distancia_maxima(palavra)
+        if not limite:
+            return {}
+        # Filtro de bigramas: cada edição destrói no máximo 2 bigramas. A contagem é de
+        # bigramas distintos (palavras como ANANIAS repetem "AN"), então o mínimo também.
+        # O índice é separado por tamanho: só palavras com |diferença de tamanho| <= limite
+        # podem estar dentro do orçamento, então as demais nem são contadas.
+        bigramas = _bigramas(palavra)
+        minimo_comum = len(bigramas) - 2 * limite
+        contagem = {}
+        for tamanho in range(len(palavra) - limite, len(palavra) + limite + 1):
+            for bigrama in bigramas:
+                for vizinha in self._bigramas.get((tamanho, bigrama), ()):
+                    contagem[vizinha] = contagem.get(vizinha, 0) + 1
+        parecidas = {}
+        for vizinha, comuns in contagem.items():
+            if comuns >= minimo_comum:
+                distancia = _distancia_edicao(palavra, vizinha, limite)
+                if distancia <= limite:
+                    parecidas[vizinha] = distancia
+        return parecidas
+
+    def candidatos_aproximados(self, nome_curto: str) -> list:
+        """
+        Candidatos tolerantes a acento e erro de digitação, como [(NOME, pontuação)]
+        em ordem decrescente. Pontuação = 1 - (erros / letras do nome curto).
+        """
+        palavras = _palavras_chave(nome_curto)
+        if not palavras:
+            return []
+        erros_por_id = None
+        for palavra in palavras:
+            erros_palavra = {}
+            for vizinha, distancia in self._palavras_parecidas(palavra).items():
+                for id_func in self._indice[vizinha]:
+                    erros_palavra[id_func] = min(distancia, erros_palavra.get(id_func, distancia))
+            if erros_por_id is None:
+                erros_por_id = erros_palavra
+            else:
+                erros_por_id = {i: e + erros_palavra[i] for i, e in erros_por_id.items() if i in erros_palavra}
+            if not erros_por_id:
+                return []
+        total_letras = sum(len(p) for p in palavras)
+        pontuados = [(self._nomes[i], round(1 - erros / total_letras, 3)) for i, erros in erros_por_id.items()]
+        return sorted(pontuados, key=lambda item: (-item[1], self._ids[item[0]]))
+
+
+def buscar_candidatos(db_funcionarios: dict, nome_curto: str) -> list:
+    """
+    Retorna todos os funcionários compatíveis com o nome curto. Usa o índice quando
+    a base é uma BaseFuncionarios; para um dict comum, cai na varredura linear.
+    """
+    if isinstance(db_funcionarios, BaseFuncionarios):
+        return db_funcionarios.candidatos(nome_curto)
+    palavras = _palavras_chave(nome_curto)
+    if not palavras:
+        return []
+    return [nome for nome in db_funcionarios if palavras.issubset(normalizar_nome(nome).split())]
+
+
+def resolver_nome(db_funcionarios: dict, nome_curto: str):
+    """
+    Decide o funcionário de um arquivo. Retorna (NOME_ESCOLHIDO ou None, [(NOME, pontuação)]).
+    Só escolhe automaticamente um candidato único e exato após a normalização (diferenças
+    apenas de acento ou pontuação). Qualquer erro de digitação (pontuação < 1), mesmo de
+    uma letra, pode ser outro funcionário: volta com NOME_ESCOLHIDO = None para revisão manual.
+    """
+    exatos = buscar_candidatos(db_funcionarios, nome_curto)
+
+    # Nome idêntico ao da planilha desempata (ex: "ANA SILVA" x "ANA SILVA SOUZA")
+    nome_normalizado = normalizar_nome(nome_curto)
+    if isinstance(db_funcionarios, BaseFuncionarios):
+        identicos = [n for n in exatos if db_funcionarios._normalizados[db_funcionarios._ids[n]] == nome_normalizado]
+    else:
+        identicos = [n for n in exatos if normalizar_nome(n) == nome_normalizado]
+    if identicos:
+        exatos = identicos
+
+    if exatos:
+        pontuados = [(nome, 1.0) for nome in exatos]
+    elif isinstance(db_funcionarios, BaseFuncionarios):
+        pontuados = db_funcionarios.candidatos_aproximados(nome_curto)
+    else:
+        pontuados = []
+
+    if not pontuados:
+        return None, []
+    melhor_nome, melhor_pontuacao = pontuados[0]
+    unico = len(pontuados) == 1 or pontuados[1][1] < melhor_pontuacao
+    if unico and melhor_pontuacao == 1.0:
+        return melhor_nome, pontuados
+    return None, pontuados
+
+
+def registrar_para_revisao(arquivo: str, nome_curto: str, pontuados: list, caminho: str = CAMINHO_FILA_REVISAO):
+    """ Acrescenta o arquivo à fila de revisão manual (CSV), com os candidatos e pontuações. """
+    candidatos = "; ".join(f"{nome} ({pontuacao:.2f})" for nome, pontuacao in pontuados[:5])
+    with _lock_revisao:
+        novo = not os.path.exists(caminho)
+        with open(caminho, "a", newline="", encoding="utf-8-sig") as f:
+            escritor = csv.writer(f, delimiter=";")
+            if novo:
+                escritor.writerow(["DATA", "ARQUIVO", "NOME_BUSCADO", "CANDIDATOS"])
+            escritor.writerow([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), arquivo, nome_curto, candidatos])
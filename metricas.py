@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import functools
+import threading
+from datetime import datetime
+
+# --- CONFIGURAÇÕES DAS MÉTRICAS ---
+# Ao fim de cada execução é gravado um relatório JSON em relatorios/. Para alertas,
+# aponte DIRETORIO_PROMETHEUS para o diretório do textfile collector do node_exporter
+# (ex.: /var/lib/node_exporter/textfile); é gravado um cailun_<tipo>.prom. None desativa.
+DIRETORIO_RELATORIOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "relatorios")
+DIRETORIO_PROMETHEUS = os.environ.get("CAILUN_PROMETHEUS_DIR")
+# -----------------------------------
+
+_lock = threading.Lock()
+_estado = {}
+
+
+def iniciar_execucao():
+    """ Zera as métricas: tudo o que for medido a partir daqui entra no próximo relatório. """
+    with _lock:
+        _estado.clear()
+        _estado.update({"inicio": time.time(), "etapas": {}, "http": {}, "bytes_enviados": 0, "contadores": {}})
+
+
+iniciar_execucao()
+
+
+def medir(etapa: str):
+    """ Decorador: registra duração e número de chamadas da função sob o nome da etapa. """
+    def _decorador(funcao):
+        @functools.wraps(funcao)
+        def _medida(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                duracao = time.perf_counter() - inicio
+                with _lock:
+                    _estado["etapas"].setdefault(etapa, []).append(duracao)
+        return _medida
+    return _decorador
+
+
+def registrar_http(categoria: str, status, bytes_enviados: int = 0):
+    """ Uma tentativa de requisição: status HTTP (ou o nome do erro de conexão) por categoria. """
+    with _lock:
+        histograma = _estado["http"].setdefault(categoria or "outros", {})
+        histograma[str(status)] = histograma.get(str(status), 0) + 1
+        _estado["bytes_enviados"] += bytes_enviados
+
+
+def contar(nome: str, quantidade: int = 1):
+    with _lock:
+        _estado["contadores"][nome] = _estado["contadores"].get(nome, 0) + quantidade
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def resumo() -> dict:
+    """ Métricas da execução atual (durações em milissegundos). """
+    with _lock:
+        etapas = {etapa: list(valores) for etapa, valores in _estado["etapas"].items()}
+        resultado = {
+            "duracao_s": round(time.time() - _estado["inicio"], 3),
+            "http": json.loads(json.dumps(_estado["http"])),
+            "bytes_enviados": _estado["bytes_enviados"],
+            "contadores": dict(_estado["contadores"]),
+        }
+    resultado["etapas"] = {
+        etapa: {
+            "n": len(valores),
+            "total_ms": round(sum(valores) * 1000, 1),
+            "p50_ms": round(_percentil(valores, 50) * 1000, 2),
+            "p95_ms": round(_percentil(valores, 95) * 1000, 2),
+            "max_ms": round(max(valores) * 1000, 2),
+        }
+        for etapa, valores in etapas.items()
+    }
+    return resultado
+
+
+def _texto_prometheus(tipo: str, dados: dict) -> str:
+    linhas = [
+        "# HELP cailun_execucao_duracao_segundos Duração da última execução.",
+        "# TYPE cailun_execucao_duracao_segundos gauge",
+        f'cailun_execucao_duracao_segundos{{tipo="{tipo}"}} {dados["duracao_s"]}',
+        "# HELP cailun_execucao_timestamp_segundos Fim da última execução (epoch).",
+        "# TYPE cailun_execucao_timestamp_segundos gauge",
+        f'cailun_execucao_timestamp_segundos{{tipo="{tipo}"}} {int(time.time())}',
+        "# HELP cailun_bytes_enviados Bytes enviados à API na última execução.",
+        "# TYPE cailun_bytes_enviados gauge",
+        f'cailun_bytes_enviados{{tipo="{tipo}"}} {dados["bytes_enviados"]}',
+        "# HELP cailun_etapa_chamadas Chamadas de cada etapa na última execução.",
+        "# TYPE cailun_etapa_chamadas gauge",
+    ]
+    linhas += [f'cailun_etapa_chamadas{{tipo="{tipo}",etapa="{e}"}} {m["n"]}' for e, m in dados["etapas"].items()]
+    linhas += ["# HELP cailun_etapa_p95_segundos Percentil 95 da duração de cada etapa.",
+               "# TYPE cailun_etapa_p95_segundos gauge"]
+    linhas += [f'cailun_etapa_p95_segundos{{tipo="{tipo}",etapa="{e}"}} {round(m["p95_ms"] / 1000, 6)}' for e, m in dados["etapas"].items()]
+    linhas += ["# HELP cailun_http_respostas Respostas da API por categoria e status na última execução.",
+               "# TYPE cailun_http_respostas gauge"]
+    linhas += [
+        f'cailun_http_respostas{{tipo="{tipo}",categoria="{categoria}",status="{status}"}} {n}'
+        for categoria, histograma in dados["http"].items() for status, n in histograma.items()
+    ]
+    linhas += ["# HELP cailun_contador Contadores da última execução (enviados, falhas, problemas).",
+               "# TYPE cailun_contador gauge"]
+    linhas += [f'cailun_contador{{tipo="{tipo}",nome="{nome}"}} {n}' for nome, n in dados["contadores"].items()]
+    return "\n".join(linhas) + "\n"
+
+
+def finalizar_execucao(tipo: str, caminho_relatorio: str = None) -> str:
+    """
+    Grava o relatório JSON da execução (e o textfile do Prometheus, se configurado).
+    Retorna o caminho do relatório, ou None se não foi possível gravá-lo.
+    """
+    dados = {"tipo": tipo, "fim": datetime.now().isoformat(timespec="seconds"), **resumo()}
+    caminho_relatorio = caminho_relatorio or os.path.join(
+        DIRETORIO_RELATORIOS, f"execucao_{tipo}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    try:
+        os.makedirs(os.path.dirname(caminho_relatorio), exist_ok=True)
+        with open(caminho_relatorio, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o relatório de métricas: {e}")
+        caminho_relatorio = None
+
+    if DIRETORIO_PROMETHEUS:
+        caminho_prometheus = os.path.join(DIRETORIO_PROMETHEUS, f"cailun_{tipo}.prom")
+        try:
+            # Grava e troca de uma vez: o node_exporter nunca lê um arquivo pela metade
+            with open(caminho_prometheus + ".tmp", "w", encoding="utf-8") as f:
+                f.write(_texto_prometheus(tipo, dados))
+            os.replace(caminho_prometheus + ".tmp", caminho_prometheus)
+        except OSError as e:
+            print(f"⚠️ Não foi possível gravar as métricas do Prometheus: {e}")
+    return caminho_relatorio
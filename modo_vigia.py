@@ -0,0 +1,176 @@
+import os
+import time
+import threading
+
+# Observador nativo (inotify no Linux) é opcional: sem o pacote watchdog, tudo
+# funciona por varredura periódica.
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# --- CONFIGURAÇÕES DO MODO VIGIA ---
+INTERVALO_VARREDURA = 15          # Segundos entre varreduras das pastas de rede (SMB)
+TEMPO_ESTABILIZACAO = 5           # Segundos com tamanho/data inalterados antes de processar
+INTERVALO_ATUALIZACAO = 30 * 60   # Segundos para recarregar planilha, árvore Cailun e pastas do mês
+ESPERA_NOVA_TENTATIVA = 5 * 60    # Segundos até entregar de novo um PDF cujo processamento falhou
+# -----------------------------------
+
+
+def _eh_caminho_rede(caminho: str) -> bool:
+    """ Compartilhamentos SMB (\\\\servidor\\...) não geram eventos confiáveis: usam varredura. """
+    return caminho.startswith("\\\\") or caminho.startswith("//")
+
+
+class _Estabilizador:
+    """
+    Segura cada PDF até que tamanho e data fiquem estáveis por TEMPO_ESTABILIZACAO
+    (o arquivo pode ainda estar sendo gravado na rede). Um arquivo já entregue só
+    volta a ser entregue se for modificado ou, se o processamento falhou, depois de
+    ESPERA_NOVA_TENTATIVA. Arquivos que saem da pasta (ex.: movidos para ENVIADOS)
+    são esquecidos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._observados = {}   # caminho -> (tamanho, mtime, estavel_desde)
+        self._entregues = {}    # caminho -> (tamanho, mtime, repetir_em ou None)
+
+    def observar(self, caminho: str):
+        try:
+            info = os.stat(caminho)
+        except OSError:
+            return
+        assinatura = (info.st_size, info.st_mtime)
+        with self._lock:
+            entregue = self._entregues.get(caminho)
+            if entregue and entregue[:2] == assinatura and (entregue[2] is None or time.time() < entregue[2]):
+                return
+            anterior = self._observados.get(caminho)
+            if not anterior or anterior[:2] != assinatura:
+                self._observados[caminho] = (*assinatura, time.time())
+
+    def prontos(self) -> list:
+        agora = time.time()
+        with self._lock:
+            caminhos = [c for c, (_, _, desde) in self._observados.items() if agora - desde >= TEMPO_ESTABILIZACAO]
+            for caminho in caminhos:
+                tamanho, mtime, _ = self._observados.pop(caminho)
+                self._entregues[caminho] = (tamanho, mtime, None)
+        # Confirma na hora de entregar: se mudou desde a última observação, volta a esperar
+        prontos = []
+        for caminho in caminhos:
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                with self._lock:
+                    self._entregues.pop(caminho, None)
+                continue
+            if (info.st_size, info.st_mtime) == self._entregues[caminho][:2]:
+                prontos.append(caminho)
+            else:
+                self.observar(caminho)
+        return sorted(prontos)
+
+    def falhou(self, caminhos):
+        """ Processamento falhou: os arquivos voltam a ser entregues depois de ESPERA_NOVA_TENTATIVA. """
+        repetir_em = time.time() + ESPERA_NOVA_TENTATIVA
+        with self._lock:
+            for caminho in caminhos:
+                entregue = self._entregues.get(caminho)
+                if entregue:
+                    self._entregues[caminho] = (*entregue[:2], repetir_em)
+
+    def podar(self):
+        """ Esquece os arquivos entregues que não estão mais na pasta. """
+        with self._lock:
+            caminhos = list(self._entregues)
+        sumidos = [caminho for caminho in caminhos if not os.path.exists(caminho)]
+        with self._lock:
+            for caminho in sumidos:
+                self._entregues.pop(caminho, None)
+
+
+class _EventosPdf(FileSystemEventHandler):
+    def __init__(self, estabilizador):
+        self._estabilizador = estabilizador
+
+    def on_any_event(self, evento):
+        caminho = getattr(evento, "dest_path", None) or evento.src_path
+        if not evento.is_directory and caminho.lower().endswith(".pdf"):
+            self._estabilizador.observar(caminho)
+
+
+def _varrer(pasta: str, estabilizador: _Estabilizador):
+    try:
+        with os.scandir(pasta) as entradas:
+            for entrada in entradas:
+                if entrada.name.lower().endswith(".pdf") and entrada.is_file():
+                    estabilizador.observar(entrada.path)
+    except OSError as e:
+        print(f"⚠️ Pasta inacessível no momento: {pasta} ({e})")
+
+
+def vigiar(pastas_monitoradas, preparar_contexto, processar_arquivos):
+    """
+    Serviço contínuo: mantém o contexto quente (token, planilha, índice de pastas,
+    sessão HTTP) e entrega ao pipeline só os PDFs novos e já estáveis.
+      * pastas_monitoradas() -> lista das pastas do mês a vigiar
+      * preparar_contexto() -> contexto reutilizado entre lotes (ou None se falhar)
+      * processar_arquivos(contexto, caminhos) -> planeja e envia um lote; devolve
+        os caminhos que não terminaram (tentados de novo depois de ESPERA_NOVA_TENTATIVA)
+    Pastas locais usam eventos do sistema (watchdog/inotify), se disponível; pastas
+    de rede, ou sem watchdog, usam varredura a cada INTERVALO_VARREDURA segundos.
+    Encerre com Ctrl+C.
+    """
+    estabilizador = _Estabilizador()
+    observador = None
+    contexto, pastas, atualizado_em, varrido_em = None, [], 0, 0
+
+    print(f"👀 MODO VIGIA ATIVO (varredura a cada {INTERVALO_VARREDURA}s). Ctrl+C para encerrar.")
+    try:
+        while True:
+            agora = time.time()
+
+            # Sem contexto (ex.: API fora do ar), tenta de novo a cada varredura
+            espera = INTERVALO_ATUALIZACAO if contexto else INTERVALO_VARREDURA
+            if agora - atualizado_em >= espera:
+                contexto = preparar_contexto() or contexto
+                pastas = [p for p in pastas_monitoradas() if p]
+                atualizado_em = agora
+                if observador:
+                    observador.stop(); observador.join()
+                    observador = None
+                locais = [p for p in pastas if not _eh_caminho_rede(p)]
+                if Observer and locais:
+                    observador = Observer()
+                    for pasta in locais:
+                        observador.schedule(_EventosPdf(estabilizador), pasta, recursive=False)
+                    observador.start()
+                # Primeira passada: o que já estava na pasta antes do vigia subir
+                for pasta in pastas:
+                    _varrer(pasta, estabilizador)
+                varrido_em = agora
+                for pasta in pastas:
+                    print(f"   ↳ 📂 Vigiando: {pasta}")
+
+            if agora - varrido_em >= INTERVALO_VARREDURA:
+                for pasta in pastas:
+                    if not observador or _eh_caminho_rede(pasta):
+                        _varrer(pasta, estabilizador)
+                estabilizador.podar()
+                varrido_em = agora
+
+            novos = estabilizador.prontos() if contexto else []
+            if novos:
+                print(f"\n🆕 {len(novos)} novo(s) PDF(s) detectado(s).")
+                estabilizador.falhou(processar_arquivos(contexto, novos) or [])
+
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n🛑 Modo vigia encerrado.")
+    finally:
+        if observador:
+            observador.stop(); observador.join()
@@ -0,0 +1,776 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import shutil
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+
+# --- IMPORTAÇÃO DE MÓDULOS ESSENCIAIS ---
+import cliente_http
+import metricas
+import modo_vigia
+import registro_envios
+import reserva_trabalho
+from autenticacao import obter_token
+from busca_ids_pastas import (
+    mapear_pastas_cailun,
+    ID_PASTA_RAIZ_SISTEMA,
+    buscar_id_final_recibos,
+    indexar_arvore_cailun,
+    funcionarios_sem_recibos,
+    reiniciar_confirmacoes_api
+)
+from upload_multipart import CorpoMultipart
+from envio_paralelo import executar_envios, MAX_WORKERS_ENVIO
+from planilha_funcionarios import carregar_dados_excel
+from indice_nomes import normalizar_nome, resolver_nome, registrar_para_revisao
+from registro_envios import RegistroEnvios, extrair_id_fluxo, proxima_etapa
+from descoberta_pdfs import descobrir_pdfs, encontrar_pasta_recente
+from divisao_pdf import dividir_pdf_consolidado, extrair_paginas
+from reserva_trabalho import criar_reservas
+from finalizacao_envios import FinalizadorMovimentos
+from plano_envio import (
+    novo_plano, adicionar_problema, salvar_plano, carregar_plano, imprimir_resumo_plano,
+    FUNCIONARIO_NAO_IDENTIFICADO, RECIBOS_NAO_ENCONTRADA, PASTA_INACESSIVEL, ENVIO_INTERROMPIDO,
+    CONTEUDO_DUPLICADO
+)
+
+# --- CAMINHO ONDE ESTÁ O ARQUIVO EXCEL QUE CONTEM OS DADOS DOS FUNCIONÁRIOS, COMO: NOME, CPF E NÚMERO ---
+# Vale para todos os perfis, inclusive férias (que antes liam uma cópia na Área de Trabalho)
+CAMINHO_PLANILHA = r"\\fs\tlt\ADMINISTRATIVO\RH\DEPTO PESSOAL\FOLHA DE PAGTO\folha Conferencia GZ\rel_funcionarios.xlsx"
+
+# DADOS FIXOS DO DIRETOR (PRIMEIRO SIGNATÁRIO, VIA E-MAIL, NOS PERFIS QUE O EXIGEM)
+DIRETOR_CONFIG = {
+    "name": "nome diretor",
+    "cpf": "cpf diretor",
+    "email": "email diretor"
+}
+
+# --- PERFIS DE DOCUMENTO ---
+# Cada tipo de documento declara onde estão os PDFs na rede, como limpar o nome do
+# arquivo antes do match e quem assina. Uma execução processa vários perfis com um
+# único login, uma única leitura da planilha e um único índice de pastas do Cailun.
+#   * pastas_rede: raízes na rede (com Ano > MM-AAAA dentro)
+#   * usar_base_sem_mes: sem pasta do mês, usa a própria raiz (recibos de férias)
+#   * sufixos_removidos: regex aplicada ao nome do arquivo (em maiúsculas) antes do match
+#   * signatarios: chave de MODELOS_SIGNATARIOS
+#   * mensagem: texto do fluxo no Cailun ({nome} = nome do funcionário)
+PERFIS = {
+    "contra_cheque": {
+        "pastas_rede": [
+            r"\\fs\TLT\ADMINISTRATIVO\RH\DEPTO PESSOAL\FOLHA DE PAGTO\folha Conferencia GZ\TELE FILIAL",
+            r"\\fs\TLT\ADMINISTRATIVO\RH\DEPTO PESSOAL\FOLHA DE PAGTO\folha Conferencia GZ\TELE MATRIZ",
+        ],
+        "usar_base_sem_mes": False,
+        "sufixos_removidos": None,
+        "signatarios": "whatsapp",
+        "mensagem": "Olá {nome}, segue seu documento para assinatura via WhatsApp.",
+    },
+    "cartao_ponto": {
+        "pastas_rede": [
+            r"\\fs\TLT\ADMINISTRATIVO\RH\DEPTO PESSOAL\PONTO BIOMETRIA - I9PONTO\CARTAO PONTO\TELE - FILIAL",
+            r"\\fs\TLT\ADMINISTRATIVO\RH\DEPTO PESSOAL\PONTO BIOMETRIA - I9PONTO\CARTAO PONTO\TELE - MATRIZ",
+        ],
+        "usar_base_sem_mes": False,
+        "sufixos_removidos": None,
+        "signatarios": "whatsapp",
+        "mensagem": "Olá {nome}, segue seu documento para assinatura via WhatsApp.",
+    },
+    "ferias": {
+        "pastas_rede": [
+            r"\\fs\TLT\ADMINISTRATIVO\RH\DEPTO PESSOAL\FERIAS\RECIBOS DE FERIAS\MATRIZ",
+            r"\\fs\TLT\ADMINISTRATIVO\RH\DEPTO PESSOAL\FERIAS\RECIBOS DE FERIAS\FILIAL",
+            r"\\fs\TLT\ADMINISTRATIVO\RH\DEPTO PESSOAL\FERIAS\RECIBOS DE FERIAS\TELE",
+        ],
+        "usar_base_sem_mes": True,
+        "sufixos_removidos": r"(_AVISO|_RECIBO|_13º|_13)",
+        "signatarios": "diretor_email_e_whatsapp",
+        "mensagem": "Documento de Férias de {nome} para assinatura sequencial.",
+    },
+}
+# ----------------------------
+
+
+# --- 1. MODELOS DE SIGNATÁRIOS ---
+
+def _signatario_whatsapp(indice, dados_func):
+    """ Funcionário assina via WhatsApp (requiredAuthenticationType 11). """
+    return {
+        f"signatories[{indice}][name]": dados_func['name'],
+        f"signatories[{indice}][cpf]": dados_func['cpf'],
+        f"signatories[{indice}][phone]": dados_func['phone'],
+        f"signatories[{indice}][email]": dados_func['email'],
+        f"signatories[{indice}][signAsId]": "1",
+        f"signatories[{indice}][requiredAuthenticationType]": "11",
+        f"signatories[{indice}][groupId]": "0",
+    }
+
+def _signatario_diretor_email(indice):
+    """ Diretor assina via E-MAIL (requiredAuthenticationType 1). """
+    return {
+        f"signatories[{indice}][name]": DIRETOR_CONFIG['name'],
+        f"signatories[{indice}][cpf]": DIRETOR_CONFIG['cpf'],
+        f"signatories[{indice}][email]": DIRETOR_CONFIG['email'],
+        f"signatories[{indice}][signAsId]": "1",
+        f"signatories[{indice}][requiredAuthenticationType]": "1",
+        f"signatories[{indice}][groupId]": "0",
+    }
+
+MODELOS_SIGNATARIOS = {
+    # Um único signatário: o funcionário, via WhatsApp
+    "whatsapp": lambda dados_func: _signatario_whatsapp(0, dados_func),
+    # Em ordem: 1. Diretor (E-MAIL); 2. Funcionário (WHATSAPP)
+    "diretor_email_e_whatsapp": lambda dados_func: {**_signatario_diretor_email(0), **_signatario_whatsapp(1, dados_func)},
+}
+
+
+# --- 2. FUNÇÕES DE SUPORTE ---
+
+@metricas.medir("match_nome")
+def buscar_dados_por_nome_curto(db_funcionarios: dict, nome_curto: str, arquivo: str = None):
+    """
+    Função de match: Procura o funcionário verificando se TODAS as palavras-chave
+    do nome curto estão contidas no nome completo (via índice invertido), tolerando
+    acentos e pontuação. Matches ambíguos ou com erro de digitação NÃO são enviados:
+    o arquivo vai para a fila de revisão manual, com os candidatos aproximados.
+    """
+    nome_completo, pontuados = resolver_nome(db_funcionarios, nome_curto)
+
+    if nome_completo:
+        return db_funcionarios[nome_completo], nome_completo
+
+    if pontuados:
+        candidatos = ", ".join(f"{nome} ({pontuacao:.0%})" for nome, pontuacao in pontuados[:5])
+        print(f"   ↳ ⚠️ Match incerto '{nome_curto}': {candidatos}")
+        if arquivo:
+            registrar_para_revisao(arquivo, nome_curto, pontuados)
+
+    return None, None
+
+def nome_para_busca(perfil: dict, arquivo: str) -> str:
+    """ Nome curto usado no match: sem extensão e sufixos do perfil, normalizado, 3 primeiras palavras. """
+    nome_limpo = os.path.splitext(arquivo)[0].strip().upper()
+    if perfil["sufixos_removidos"]:
+        nome_limpo = re.sub(perfil["sufixos_removidos"], '', nome_limpo)
+    return " ".join(normalizar_nome(nome_limpo).split()[:3])
+
+@metricas.medir("mover")
+def mover_para_enviados(caminho_arquivo):
+    """ Cria a subpasta 'ENVIADOS' e move o arquivo após o processamento. """
+    diretorio_enviados = os.path.join(os.path.dirname(caminho_arquivo), "ENVIADOS")
+    try:
+        if not os.path.exists(diretorio_enviados): os.makedirs(diretorio_enviados)
+        shutil.move(caminho_arquivo, os.path.join(diretorio_enviados, os.path.basename(caminho_arquivo)))
+        return True
+    except Exception as e:
+        print(f"   🛑 Erro ao organizar arquivo: {e}"); return False
+
+def _pasta_alvo(perfil: dict, caminho_base_rede: str):
+    """ Pasta do mês mais recente ou, nos perfis que permitem, a própria pasta base. """
+    pasta_alvo = encontrar_pasta_recente(caminho_base_rede)
+    if not pasta_alvo and perfil["usar_base_sem_mes"] and os.path.isdir(caminho_base_rede):
+        pasta_alvo = caminho_base_rede
+    return pasta_alvo
+
+def _id_setor_da_rede(contexto, caminho_base_rede):
+    setor_nome = os.path.basename(caminho_base_rede).upper()
+    setor_cailun = setor_nome.replace("FOLHA ", "").replace("DISK - ", "").strip()
+    return contexto["mapa_pastas_mae"].get(setor_cailun)
+
+def _selecionar_perfis(nomes=None) -> dict:
+    """ {nome: perfil} dos perfis pedidos (todos, sem argumento). """
+    nomes = nomes or list(PERFIS)
+    desconhecidos = [nome for nome in nomes if nome not in PERFIS]
+    if desconhecidos:
+        raise ValueError(f"Perfil(is) desconhecido(s): {', '.join(desconhecidos)}. Disponíveis: {', '.join(PERFIS)}")
+    return {nome: PERFIS[nome] for nome in nomes}
+
+
+# --- 3. LÓGICA DE ENVIO ---
+
+# Resultado de um POST que pode ter chegado ao Cailun (timeout de leitura, conexão
+# caída depois do envio, 5xx): não é falha certa, então o documento não é reenviado.
+ENVIO_INCERTO = "ENVIO_INCERTO"
+
+@metricas.medir("envio")
+def enviar_fluxo_assinatura(token, caminho_arquivo, dados_func, id_pasta_destino, perfil=PERFIS["contra_cheque"],
+                             documento=None, nome_arquivo=None):
+    """
+    POST /subscriptionFlow com os signatários e a mensagem do perfil. documento (buffer
+    em memória, ex.: parte de um PDF consolidado) substitui a leitura de caminho_arquivo.
+    Retorna o dict do fluxo criado, False se a API com certeza não criou o fluxo (nada
+    enviado ou 4xx) ou ENVIO_INCERTO quando não dá para saber (timeout de leitura,
+    conexão caída depois do envio, 5xx).
+    """
+    url = "/subscriptionFlow"
+    nome_arquivo = nome_arquivo or os.path.basename(caminho_arquivo)
+    dt_limite = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+    payload = {
+        "name": nome_arquivo,
+        "folderId": id_pasta_destino,
+        "signatureLimitDate": dt_limite,
+        "reminder": "true", "reminderDays": "2",
+        "message": perfil["mensagem"].format(nome=dados_func['name']),
+        **MODELOS_SIGNATARIOS[perfil["signatarios"]](dados_func),
+    }
+    try:
+        # Corpo em fluxo: o PDF é lido do disco em blocos e o hash sai na mesma leitura
+        with CorpoMultipart(payload, caminho_arquivo if documento is None else documento, nome_arquivo) as corpo:
+            header = {"Authorization": f"Bearer {token}", "Content-Type": corpo.content_type}
+            # Não idempotente: só repete se a conexão nem chegou a ser aberta
+            resp = cliente_http.post(url, headers=header, data=corpo)
+            if resp.status_code in [200, 201]:
+                return {"status": resp.status_code, "id_fluxo": extrair_id_fluxo(resp), "hash": corpo.sha256()}
+            print(f"   ↳ ❌ FALHA NO FLUXO ({resp.status_code}): {resp.text[:200]}")
+            return ENVIO_INCERTO if resp.status_code >= 500 else False
+    except ValueError as e:
+        print(f"   ↳ 🛑 {e}"); return False
+    except Exception as e:
+        if cliente_http.falhou_antes_de_enviar(e):
+            print(f"   ↳ ❌ Erro antes do envio (nada foi enviado): {e}"); return False
+        print(f"   ↳ ❌ Erro de envio depois de enviar o documento: {e}"); return ENVIO_INCERTO
+
+def _enviar_documento(trabalho):
+    """
+    Etapa 4 de um documento já resolvido (executada pelos workers de envio). Só move
+    o arquivo após confirmação (2xx); cada transição fica no registro de envios. A
+    movimentação em si fica com o finalizador, sem segurar o worker no compartilhamento.
+    """
+    print(f"\n{'-'*50}")
+    print(f"📄 DOCUMENTO: {trabalho['arquivo']} ({trabalho['perfil']})")
+    registro, chave = trabalho['registro'], (trabalho['hash'], trabalho['id_recibos'])
+    reservas = trabalho.get('reservas')
+
+    if trabalho['etapa'] == registro_envios.ETAPA_ENVIAR:
+        # A reserva é marcada antes do registro: se o compartilhamento falhar, nada foi enviado
+        if reservas and not reservas.marcar_envio(trabalho['hash']):
+            reservas.liberar(trabalho['hash'])
+            metricas.contar("falhas_envio")
+            print(f"   ↳ 💥 ERRO: Reserva do documento indisponível; fica para a próxima execução... 🛑")
+            return False
+        print(f"   ↳ ✈️  Enviando para a API...")
+        registro.registrar(*chave, registro_envios.ENVIANDO)
+        resultado = enviar_fluxo_assinatura(trabalho['token'], trabalho['caminho'], trabalho['dados_func'],
+                                            trabalho['id_recibos'], PERFIS[trabalho['perfil']],
+                                            trabalho.get('_documento'), trabalho['arquivo'])
+        if resultado == ENVIO_INCERTO:
+            # Fica ENVIANDO (no registro e na reserva): a próxima execução aponta INTERROMPIDO
+            registro.registrar(*chave, registro_envios.ENVIANDO, detalhe="resultado incerto")
+            metricas.contar("envios_incertos")
+            if reservas: reservas.abandonar(trabalho['hash'])
+            print(f"   ↳ ⚠️ Não dá para saber se o Cailun criou o fluxo. Confira no portal antes de reenviar "
+                  f"(python registro_envios.py liberar ...)... 🛑")
+            return False
+        if not resultado:
+            registro.registrar(*chave, registro_envios.RESOLVIDO, detalhe="falha no envio")
+            metricas.contar("falhas_envio")
+            if reservas: reservas.liberar(trabalho['hash'])
+            print(f"   ↳ 💥 ERRO: Falha na comunicação com a API Cailun... 🛑")
+            return False
+        detalhe = None
+        if resultado['hash'] != trabalho['hash']:
+            detalhe = f"conteúdo alterado após o planejamento (enviado {resultado['hash']})"
+            print(f"   ↳ ⚠️ O PDF mudou depois de planejado; foi enviada a versão atual.")
+        registro.registrar(*chave, registro_envios.ENVIADO, id_fluxo=resultado['id_fluxo'], detalhe=detalhe)
+        metricas.contar("enviados")
+        print(f"   ↳ 📲 FINALIZADO: Enviado para o WhatsApp: {trabalho['dados_func']['phone']} 📱")
+    else:
+        print(f"   ↳ ♻️  Já enviado em execução anterior, concluindo a movimentação...")
+
+    _finalizar(trabalho, registro, chave, trabalho['caminho'], trabalho.get('origem'))
+    _concluir_copias(trabalho, registro)
+    if reservas: reservas.concluir(trabalho['hash'])
+    return True
+
+def _finalizar(trabalho, registro, chave, caminho, origem=None, registrar=True):
+    """
+    Agenda a ida para ENVIADOS; parte de um PDF consolidado não tem arquivo próprio para mover.
+    registrar=False move sem gravar MOVIDO (cópia que divide a linha do registro com o original).
+    """
+    if origem:
+        if registrar: registro.registrar(*chave, registro_envios.MOVIDO)
+        metricas.contar("movidos")
+    elif trabalho.get('finalizador'):
+        trabalho['finalizador'].agendar(*chave, caminho, registrar=registrar)
+    elif mover_para_enviados(caminho):
+        if registrar: registro.registrar(*chave, registro_envios.MOVIDO)
+        metricas.contar("movidos")
+
+def _concluir_copias(trabalho, registro):
+    """ Cópias idênticas do documento: mesmo fluxo no registro e agendadas para ENVIADOS, sem upload. """
+    copias = trabalho.get('copias') or []
+    if not copias:
+        return
+    id_fluxo = (registro.consultar(trabalho['hash'], trabalho['id_recibos']) or {}).get('id_fluxo')
+    for copia in copias:
+        chave = (trabalho['hash'], copia['id_recibos'])
+        # Mesma pasta do Cailun que o original: a linha do registro é a dele, a cópia só é movida
+        propria = copia['id_recibos'] != trabalho['id_recibos']
+        if propria:
+            registro.registrar(*chave, registro_envios.ENVIADO, copia['caminho'], trabalho['nome_completo'],
+                               id_fluxo=id_fluxo, detalhe=f"duplicado de {trabalho['caminho']}")
+        _finalizar(trabalho, registro, chave, copia['caminho'], copia.get('origem'), registrar=propria)
+    print(f"   ↳ 🔗 {len(copias)} cópia(s) idêntica(s) vinculada(s) ao mesmo fluxo.")
+
+
+# --- 4. PLANEJAMENTO E EXECUÇÃO ---
+
+def preparar_contexto(registro=None, reservas=None):
+    """
+    Autentica, carrega a planilha e indexa a árvore do Cailun uma única vez para
+    todos os perfis. O contexto é reaproveitado entre lotes (modo vigia); nas
+    recargas, registro e reservas do contexto anterior são passados de volta e
+    só token, planilha e índice são refeitos.
+    """
+    reiniciar_confirmacoes_api()
+    token = obter_token()
+    if not token:
+        print("🛑 Erro crítico: Falha na autenticação com a API.")
+        return None
+
+    db_funcionarios = carregar_dados_excel(CAMINHO_PLANILHA)
+    mapa_pastas_mae = mapear_pastas_cailun(token, ID_PASTA_RAIZ_SISTEMA)
+
+    if not db_funcionarios or not mapa_pastas_mae:
+        print("🛑 Erro crítico: Falha ao carregar base Excel ou estrutura Cailun.")
+        return None
+
+    # Pré-carrega a árvore Setor -> Funcionário -> RECIBOS de uma vez só
+    indice_cailun = indexar_arvore_cailun(token)
+    print(f"🗂️  Árvore Cailun indexada: {len(indice_cailun)} funcionários.")
+    for nome_func, nome_setor in funcionarios_sem_recibos(indice_cailun):
+        print(f"   ↳ ⚠️ Sem pasta 'RECIBOS' no Cailun: {nome_func} ({nome_setor})")
+
+    return {
+        "token": token, "db_funcionarios": db_funcionarios,
+        "mapa_pastas_mae": mapa_pastas_mae, "registro": registro or RegistroEnvios(),
+        "reservas": reservas or criar_reservas(),
+    }
+
+def _planejar_arquivo(contexto, plano, nome_perfil, caminho_arquivo, id_setor_sugerido, parte=None):
+    """
+    Etapas 1 a 3 de um PDF: identifica, localiza no Cailun e acrescenta ao plano.
+    parte (documento em memória de um PDF consolidado) traz o nome lido da página,
+    as páginas de origem e o buffer; caminho_arquivo é então só um identificador.
+    """
+    registro = contexto["registro"]
+    arq = parte["arquivo"] if parte else os.path.basename(caminho_arquivo)
+    print(f"\n{'-'*50}")
+    print(f"📄 DOCUMENTO: {arq} ({nome_perfil})")
+
+    # Etapa 1: Leitura
+    if parte:
+        print(f"   ↳ 📑 Páginas {parte['paginas'][0]}-{parte['paginas'][1]} do consolidado... check ✔️")
+        nome_busca = " ".join(normalizar_nome(parte["nome"]).split()[:3])
+    else:
+        print("   ↳ 📂 Arquivo identificado na rede... check ✔️")
+        nome_busca = nome_para_busca(PERFIS[nome_perfil], arq)
+
+    # Etapa 2: Identificação do Funcionário
+    dados_func, nome_completo = buscar_dados_por_nome_curto(contexto["db_funcionarios"], nome_busca, caminho_arquivo)
+
+    if not dados_func:
+        print(f"   ↳ ⚠️ Funcionário '{nome_busca}' não localizado no Excel... ❌")
+        adicionar_problema(plano, caminho_arquivo, FUNCIONARIO_NAO_IDENTIFICADO, nome_busca)
+        return None
+    print(f"   ↳ 👤 Funcionário: {nome_completo}... check ✔️")
+
+    # Etapa 3: Localização no Cailun
+    id_recibos = buscar_id_final_recibos(contexto["token"], id_setor_sugerido, nome_completo)
+
+    if not id_recibos:
+        print(f"   ↳ 🛑 Pasta 'RECIBOS' não encontrada no Cailun... ❌")
+        adicionar_problema(plano, caminho_arquivo, RECIBOS_NAO_ENCONTRADA, nome_completo)
+        return None
+    print(f"   ↳ 🔍 Localização no Cailun confirmada... check ✔️")
+
+    # Etapa 3.1: Consulta ao registro de envios (evita reenvio após queda)
+    origem = {"caminho": parte["consolidado"], "paginas": parte["paginas"]} if parte else None
+    try:
+        hash_doc = parte["hash"] if parte else registro.hash_do_arquivo(caminho_arquivo)
+    except FileNotFoundError:
+        # Com várias máquinas, outra pode ter enviado e movido o arquivo nesse meio tempo
+        print(f"   ↳ ⏭️  Arquivo não está mais na pasta (movido por outro processo?). Pulando...")
+        return None
+    if _conteudo_repetido_no_plano(plano, caminho_arquivo, hash_doc, nome_completo, id_recibos, origem):
+        return None
+    linha = registro.consultar(hash_doc, id_recibos)
+    if not linha:
+        linha = _vincular_envio_anterior(registro, plano, caminho_arquivo, hash_doc, nome_completo, id_recibos)
+        if linha is False:
+            return None
+    etapa = proxima_etapa(linha)
+    if etapa == registro_envios.ETAPA_CONCLUIDO:
+        if not parte and linha["caminho"] != caminho_arquivo:
+            # Cópia idêntica (mesma pasta do Cailun) que ficou para trás: só falta movê-la
+            # (a movimentação fica com o finalizador da execução, sem gravar MOVIDO na linha do original)
+            print(f"   ↳ 🔗 Cópia de {os.path.basename(linha['caminho'] or '')}, já enviado (fluxo {linha['id_fluxo']}). "
+                  f"Será movida para ENVIADOS...")
+            plano["movimentos"].append({"caminho": caminho_arquivo, "hash": hash_doc, "id_pasta": id_recibos})
+            return None
+        print(f"   ↳ ♻️  Documento já enviado e finalizado (fluxo {linha['id_fluxo']}). Pulando...")
+        return None
+    if etapa == registro_envios.ETAPA_INTERROMPIDO:
+        print(f"   ↳ ⚠️ Envio interrompido em execução anterior. Confira no portal Cailun "
+              f"e libere com 'python registro_envios.py liberar'... ❌")
+        adicionar_problema(plano, caminho_arquivo, ENVIO_INTERROMPIDO, nome_completo)
+        return None
+    if not linha:
+        registro.registrar(hash_doc, id_recibos, registro_envios.COMBINADO, caminho_arquivo, nome_completo)
+        registro.registrar(hash_doc, id_recibos, registro_envios.RESOLVIDO)
+
+    acao = {
+        "perfil": nome_perfil, "arquivo": arq, "caminho": caminho_arquivo, "nome_completo": nome_completo,
+        "dados_func": dados_func, "id_recibos": id_recibos, "hash": hash_doc, "etapa": etapa, "copias": [],
+    }
+    if parte:
+        # "_documento" segue em memória até o envio e não vai para o plano salvo
+        acao.update({"origem": origem, "_documento": parte["documento"]})
+    plano["acoes"].append(acao)
+    plano.setdefault("_conteudos", {})[hash_doc] = acao
+    return acao
+
+def _conteudo_repetido_no_plano(plano, caminho_arquivo, hash_doc, nome_completo, id_recibos, origem=None):
+    """
+    Mesmo conteúdo já planejado nesta execução (ex.: o PDF em TELE FILIAL e TELE MATRIZ):
+    a cópia não é enviada; vira cópia da ação original e vai para ENVIADOS junto com ela.
+    """
+    original = plano.get("_conteudos", {}).get(hash_doc)
+    if not original:
+        return False
+    metricas.contar("duplicados")
+    if original["nome_completo"] != nome_completo:
+        print(f"   ↳ ⚠️ Conteúdo idêntico a {original['arquivo']}, mas de outro funcionário ({original['nome_completo']})... ❌")
+        adicionar_problema(plano, caminho_arquivo, CONTEUDO_DUPLICADO, f"igual a {original['caminho']}")
+        return True
+    print(f"   ↳ 🔗 Conteúdo idêntico a {original['arquivo']}: vinculado ao mesmo envio, sem novo upload.")
+    original.setdefault("copias", []).append({"caminho": caminho_arquivo, "id_recibos": id_recibos, "origem": origem})
+    return True
+
+def _vincular_envio_anterior(registro, plano, caminho_arquivo, hash_doc, nome_completo, id_recibos):
+    """
+    Mesmo conteúdo já enviado em outra execução (para outra pasta ou com outro nome).
+    Para o mesmo funcionário, registra esta cópia no fluxo existente (só falta mover)
+    e devolve a linha; para outro funcionário, vai para os problemas e devolve False.
+    Sem envio anterior, devolve None.
+    """
+    anterior = registro.envio_do_conteudo(hash_doc)
+    if not anterior:
+        return None
+    metricas.contar("duplicados")
+    if anterior["funcionario"] != nome_completo or anterior["estado"] == registro_envios.ENVIANDO:
+        print(f"   ↳ ⚠️ Conteúdo idêntico a {os.path.basename(anterior['caminho'] or '')} "
+              f"({anterior['funcionario']}, {anterior['estado']}). Confira antes de reenviar... ❌")
+        adicionar_problema(plano, caminho_arquivo, CONTEUDO_DUPLICADO, f"igual a {anterior['caminho']} (fluxo {anterior['id_fluxo']})")
+        return False
+    print(f"   ↳ 🔗 Conteúdo já enviado no fluxo {anterior['id_fluxo']}: sem novo upload, só movimentação.")
+    registro.registrar(hash_doc, id_recibos, registro_envios.ENVIADO, caminho_arquivo, nome_completo,
+                       id_fluxo=anterior["id_fluxo"], detalhe=f"duplicado de {anterior['caminho']}")
+    return registro.consultar(hash_doc, id_recibos)
+
+def _acoes_planejadas(contexto, plano, perfis: dict):
+    """
+    Gera as ações do plano à medida que os PDFs são descobertos: as raízes de todos
+    os perfis são varridas em paralelo, e o match de um arquivo não espera a varredura.
+    """
+    perfil_da_raiz = {raiz: nome for nome, perfil in perfis.items() for raiz in perfil["pastas_rede"]}
+    raizes_sem_mes = {raiz for raiz, nome in perfil_da_raiz.items() if perfis[nome]["usar_base_sem_mes"]}
+    pastas_vistas = set()
+
+    for caminho_base_rede, pasta_alvo, caminho_arquivo in descobrir_pdfs(list(perfil_da_raiz), raizes_sem_mes):
+        if not pasta_alvo:
+            # Sem pasta do mês é normal no início do mês; raiz inacessível é problema
+            if not os.path.isdir(caminho_base_rede):
+                print(f"⚠️ PULAR: Caminho de rede inacessível: {caminho_base_rede}")
+                adicionar_problema(plano, caminho_base_rede, PASTA_INACESSIVEL)
+            continue
+        if pasta_alvo not in pastas_vistas:
+            pastas_vistas.add(pasta_alvo)
+            print(f"📂 VARRENDO PASTA ({perfil_da_raiz[caminho_base_rede]}): {pasta_alvo}")
+        acao = _planejar_arquivo(contexto, plano, perfil_da_raiz[caminho_base_rede], caminho_arquivo,
+                                 _id_setor_da_rede(contexto, caminho_base_rede))
+        if acao:
+            yield acao
+
+def _acoes_consolidado(contexto, plano, nome_perfil, caminho_consolidado):
+    """
+    Gera as ações de um PDF consolidado: cada funcionário vira um documento em memória,
+    casado e enviado como se fosse um arquivo da rede, sem gravar nada no compartilhamento.
+    """
+    if not os.path.isfile(caminho_consolidado):
+        print(f"⚠️ PULAR: PDF consolidado inacessível: {caminho_consolidado}")
+        adicionar_problema(plano, caminho_consolidado, PASTA_INACESSIVEL)
+        return
+    print(f"📑 DIVIDINDO PDF CONSOLIDADO ({nome_perfil}): {caminho_consolidado}")
+    for nome, paginas, documento in dividir_pdf_consolidado(caminho_consolidado):
+        identificador = f"{caminho_consolidado}#paginas={paginas[0]}-{paginas[1]}"
+        if not nome:
+            print(f"   ↳ ⚠️ Páginas {paginas[0]}-{paginas[1]} sem nome de funcionário reconhecível... ❌")
+            adicionar_problema(plano, identificador, FUNCIONARIO_NAO_IDENTIFICADO, "páginas sem nome de funcionário")
+            continue
+        parte = {
+            "consolidado": caminho_consolidado, "nome": nome, "paginas": paginas, "documento": documento,
+            "arquivo": documento.name, "hash": hashlib.sha256(documento.getbuffer()).hexdigest(),
+        }
+        acao = _planejar_arquivo(contexto, plano, nome_perfil, identificador, None, parte)
+        if acao:
+            yield acao
+
+def _acoes(contexto, plano, perfis: dict, consolidado=None):
+    """ Ações das pastas de rede dos perfis ou, com consolidado, do PDF único (primeiro perfil). """
+    if consolidado:
+        return _acoes_consolidado(contexto, plano, next(iter(perfis)), consolidado)
+    return _acoes_planejadas(contexto, plano, perfis)
+
+def _trabalhos_do_plano(acoes, token, registro, reservas=None, finalizador=None):
+    """
+    Transforma ações em trabalhos de envio, reconsultando o registro (nunca envia duas vezes).
+    Com reservas (várias máquinas no mesmo compartilhamento), só segue o documento que
+    este processo conseguir reservar; os demais ficam com quem os pegou primeiro.
+    """
+    for acao in acoes:
+        # O buffer de uma parte de consolidado passa para o trabalho: a ação no plano não o retém
+        documento = acao.pop("_documento", None)
+        etapa = proxima_etapa(registro.consultar(acao["hash"], acao["id_recibos"]))
+        if etapa not in (registro_envios.ETAPA_ENVIAR, registro_envios.ETAPA_MOVER):
+            continue
+        if reservas and not _reservar(reservas, acao):
+            continue
+        yield {**acao, "perfil": acao.get("perfil", "contra_cheque"), "token": token, "registro": registro,
+               "etapa": etapa, "_documento": documento, "reservas": reservas, "finalizador": finalizador}
+
+def _reservar(reservas, acao) -> bool:
+    """ Reserva o documento para este processo; avisa quando ele está com outra máquina. """
+    situacao = reservas.reservar(acao["hash"], acao["caminho"])
+    if situacao == reserva_trabalho.RESERVADO:
+        return True
+    metricas.contar(f"reserva_{situacao.lower()}")
+    if situacao == reserva_trabalho.INTERROMPIDO:
+        print(f"⚠️ {acao['arquivo']}: envio interrompido em outra máquina. Confira no portal Cailun "
+              f"e apague a reserva {acao['hash']}.reserva para liberar... ❌")
+    else:
+        print(f"⏭️  {acao['arquivo']}: {'já enviado' if situacao == reserva_trabalho.CONCLUIDO else 'em envio'} por outra máquina. Pulando...")
+    return False
+
+def _com_documentos(trabalhos):
+    """
+    Refaz em memória as partes de consolidados que ainda precisam de upload (plano salvo),
+    uma por vez e na thread que alimenta os envios, com um único leitor por consolidado.
+    """
+    leitores = {}
+    for trabalho in trabalhos:
+        origem = trabalho.get("origem")
+        if origem and trabalho["_documento"] is None and trabalho["etapa"] == registro_envios.ETAPA_ENVIAR:
+            try:
+                trabalho["_documento"] = extrair_paginas(origem["caminho"], origem["paginas"], trabalho["arquivo"], leitores)
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"❌ {trabalho['arquivo']}: não foi possível reler o consolidado ({e})")
+                continue
+        yield trabalho
+
+def _agendar_movimentos(plano, finalizador):
+    """ Agenda as cópias que o planejamento achou já enviadas (planos antigos não têm a lista). """
+    for movimento in plano.get("movimentos") or []:
+        finalizador.agendar(movimento["hash"], movimento["id_pasta"], movimento["caminho"], registrar=False)
+
+def _concluir_consolidado(plano, registro, finalizador, reservas=None) -> bool:
+    """
+    Agenda a ida do PDF consolidado do plano para ENVIADOS quando não houve problema e
+    todas as partes (e cópias) estão concluídas: no registro ou, com várias máquinas, por
+    outro processo (.feito). Quem terminar a última parte move o consolidado.
+    """
+    consolidado = plano.get("consolidado")
+    if not consolidado or plano["problemas"]:
+        return False
+    for acao in plano["acoes"]:
+        for id_recibos in [acao["id_recibos"]] + [copia["id_recibos"] for copia in acao.get("copias") or []]:
+            concluida = proxima_etapa(registro.consultar(acao["hash"], id_recibos)) == registro_envios.ETAPA_CONCLUIDO
+            if not (concluida or (reservas and reservas.concluido(acao["hash"]))):
+                print(f"📑 {os.path.basename(consolidado)} fica na pasta: ainda há partes sem concluir.")
+                return False
+    # O consolidado não tem linha própria no registro: só a movimentação
+    finalizador.agendar(None, None, consolidado, registrar=False)
+    return True
+
+def _tipo_plano(perfis: dict) -> str:
+    return "+".join(perfis)
+
+def planejar(nomes_perfis=None, caminho_plano=None, contexto=None, consolidado=None):
+    """
+    Fase 1 (planejar): varre as pastas dos perfis (ou divide o PDF consolidado),
+    identifica cada funcionário e sua pasta RECIBOS e devolve o plano (ações +
+    problemas), sem enviar nada. Com caminho_plano (ou "" para o nome padrão),
+    grava o plano em disco.
+    """
+    perfis = _selecionar_perfis(nomes_perfis)
+    contexto = contexto or preparar_contexto()
+    if not contexto:
+        return None
+
+    plano = novo_plano(_tipo_plano(perfis))
+    if consolidado:
+        plano["consolidado"] = consolidado
+    for acao in _acoes(contexto, plano, perfis, consolidado):
+        acao.pop("_documento", None)  # A execução do plano refaz as partes a partir do consolidado
+
+    imprimir_resumo_plano(plano)
+    if caminho_plano is not None:
+        print(f"💾 Plano salvo em: {salvar_plano(plano, caminho_plano or None)}")
+    return plano
+
+def executar_plano(plano, max_workers_envio=MAX_WORKERS_ENVIO, registro=None, reservas=None):
+    """
+    Fase 2 (executar): só faz uploads. Nenhum match ou consulta de pastas; o registro
+    de envios (local) é consultado de novo para o mesmo plano nunca enviar duas vezes.
+    """
+    token = obter_token()
+    if not token:
+        print("🛑 Erro crítico: Falha na autenticação com a API.")
+        return []
+
+    registro = registro or RegistroEnvios()
+    reservas = reservas or criar_reservas()
+    finalizador = FinalizadorMovimentos(registro)
+    finalizador.retomar_pendentes()
+    trabalhos = list(_trabalhos_do_plano(plano["acoes"], token, registro, reservas, finalizador.iniciar()))
+
+    # Etapa 4: Envio concorrente dos documentos resolvidos
+    print(f"\n✈️  ENVIANDO {len(trabalhos)} DOCUMENTO(S) (até {max_workers_envio} envios simultâneos)")
+    try:
+        resultados = executar_envios(_com_documentos(trabalhos), _enviar_documento, max_workers_envio)
+        _agendar_movimentos(plano, finalizador)
+        _concluir_consolidado(plano, registro, finalizador, reservas)
+    finally:
+        if reservas: reservas.encerrar()
+        finalizador.aguardar()
+    return resultados
+
+def orquestrar(max_workers_envio=MAX_WORKERS_ENVIO, nomes_perfis=None, consolidado=None):
+    """
+    Descoberta, match e envio de todos os perfis pedidos numa única execução. Com
+    consolidado, processa só esse PDF único (no primeiro perfil pedido) e, se todas
+    as partes terminarem bem, move-o para ENVIADOS.
+    """
+    perfis = _selecionar_perfis(nomes_perfis)
+    print(f"\n{'#'*60}")
+    print(f"{' '*10}🤖 INICIANDO SISTEMA DE ASSINATURAS CAILUN")
+    print(f"{' '*10}   Perfis: {', '.join(perfis)}")
+    print(f"{'#'*60}\n")
+
+    metricas.iniciar_execucao()
+    contexto = preparar_contexto()
+    if not contexto:
+        metricas.finalizar_execucao(_tipo_plano(perfis))
+        return None
+
+    # Descoberta, match e envio em fluxo: o primeiro upload começa assim que o
+    # primeiro PDF é resolvido, sem esperar a varredura de todas as pastas.
+    plano = novo_plano(_tipo_plano(perfis))
+    if consolidado:
+        plano["consolidado"] = consolidado
+    acoes = _acoes(contexto, plano, perfis, consolidado)
+    reservas = contexto["reservas"]
+    finalizador = FinalizadorMovimentos(contexto["registro"])
+    finalizador.retomar_pendentes()
+    finalizador.iniciar()
+    try:
+        executar_envios(_trabalhos_do_plano(acoes, contexto["token"], contexto["registro"], reservas, finalizador),
+                        _enviar_documento, max_workers_envio)
+        _agendar_movimentos(plano, finalizador)
+        _concluir_consolidado(plano, contexto["registro"], finalizador, reservas)
+    finally:
+        if reservas: reservas.encerrar()
+        finalizador.aguardar()
+    imprimir_resumo_plano(plano)
+    print(f"📈 Métricas da execução: {metricas.finalizar_execucao(_tipo_plano(perfis))}")
+
+    print(f"\n{'#'*60}")
+    print(f"{' '*15}✅ PROCESSO FINALIZADO COM SUCESSO")
+    print(f"{'#'*60}\n")
+    return plano
+
+def _caminhos_pendentes(plano, registro) -> list:
+    """ Arquivos do plano que não terminaram: problemas e ações (com cópias) não concluídas no registro. """
+    pendentes = [problema["caminho"] for problema in plano["problemas"]]
+    for acao in plano["acoes"]:
+        if proxima_etapa(registro.consultar(acao["hash"], acao["id_recibos"])) != registro_envios.ETAPA_CONCLUIDO:
+            pendentes += [acao["caminho"]] + [copia["caminho"] for copia in acao.get("copias") or []]
+    return pendentes
+
+def vigiar(max_workers_envio=MAX_WORKERS_ENVIO, nomes_perfis=None):
+    """ Modo serviço: processa cada PDF novo das pastas dos perfis assim que ele chega. """
+    perfis = _selecionar_perfis(nomes_perfis)
+    raizes = [(nome, raiz) for nome, perfil in perfis.items() for raiz in perfil["pastas_rede"]]
+
+    def _pastas_monitoradas():
+        return [_pasta_alvo(perfis[nome], raiz) for nome, raiz in raizes]
+
+    def _processar_arquivos(contexto, caminhos):
+        """ Planeja e envia o lote; devolve os arquivos com problema ou que não chegaram a ENVIADOS. """
+        plano = novo_plano(_tipo_plano(perfis))
+        for nome_perfil, caminho_base_rede in raizes:
+            pasta_alvo = _pasta_alvo(perfis[nome_perfil], caminho_base_rede)
+            id_setor_sugerido = _id_setor_da_rede(contexto, caminho_base_rede)
+            for caminho_arquivo in caminhos:
+                if pasta_alvo and os.path.dirname(caminho_arquivo) == pasta_alvo:
+                    _planejar_arquivo(contexto, plano, nome_perfil, caminho_arquivo, id_setor_sugerido)
+        imprimir_resumo_plano(plano)
+        executar_plano(plano, max_workers_envio, contexto["registro"], contexto["reservas"])
+        # Relatório do lote (inclui o que foi medido entre lotes, ex.: recarga do contexto)
+        # e métricas zeradas: o serviço não acumula durações enquanto estiver no ar
+        tipo = f"{_tipo_plano(perfis)}_vigia"
+        metricas.finalizar_execucao(tipo, os.path.join(metricas.DIRETORIO_RELATORIOS, f"vigia_{_tipo_plano(perfis)}.json"))
+        metricas.iniciar_execucao()
+        return _caminhos_pendentes(plano, contexto["registro"])
+
+    def _preparar_contexto():
+        # Recarga a cada INTERVALO_ATUALIZACAO: mantém a mesma conexão com o registro e as mesmas reservas
+        anterior = contexto_atual.get("contexto") or {}
+        contexto = preparar_contexto(anterior.get("registro"), anterior.get("reservas"))
+        if contexto:
+            contexto_atual["contexto"] = contexto
+        return contexto
+
+    contexto_atual = {}
+    modo_vigia.vigiar(_pastas_monitoradas, _preparar_contexto, _processar_arquivos)
+
+def executar_linha_de_comando(nomes_perfis=None, descricao="Envio de documentos para assinatura no Cailun.", pausar_no_fim=False):
+    """
+    Interface de linha de comando comum ao motor e aos scripts de cada documento.
+      (sem modo)                    -> planeja e envia em sequência
+      planejar [arquivo.json]       -> só gera o plano
+      executar arquivo.json         -> só envia o plano
+      vigiar                        -> serviço contínuo (PDFs novos)
+      --consolidado arquivo.pdf     -> (sem modo ou planejar) divide um PDF único por funcionário
+    """
+    parser = argparse.ArgumentParser(description=descricao)
+    parser.add_argument("modo", nargs="?", choices=["planejar", "executar", "vigiar"])
+    parser.add_argument("plano", nargs="?", help="Arquivo JSON do plano")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS_ENVIO, help="Teto de envios simultâneos")
+    parser.add_argument("--consolidado", help="PDF único com as páginas de todos os funcionários (usa o primeiro perfil)")
+    if nomes_perfis is None:
+        parser.add_argument("--perfis", help=f"Perfis separados por vírgula (padrão: todos: {','.join(PERFIS)})")
+    args = parser.parse_args()
+    if nomes_perfis is None and args.perfis:
+        nomes_perfis = [nome.strip() for nome in args.perfis.split(",") if nome.strip()]
+    tipo = _tipo_plano(_selecionar_perfis(nomes_perfis))
+
+    if args.modo == "planejar":
+        metricas.iniciar_execucao()
+        planejar(nomes_perfis, args.plano or "", consolidado=args.consolidado)
+        print(f"📈 Métricas da execução: {metricas.finalizar_execucao(f'{tipo}_planejar')}")
+    elif args.modo == "executar":
+        if not args.plano: parser.error("informe o arquivo do plano a executar")
+        metricas.iniciar_execucao()
+        executar_plano(carregar_plano(args.plano), args.workers)
+        print(f"📈 Métricas da execução: {metricas.finalizar_execucao(f'{tipo}_executar')}")
+    elif args.modo == "vigiar":
+        vigiar(args.workers, nomes_perfis)
+    else:
+        orquestrar(args.workers, nomes_perfis, args.consolidado)
+        if pausar_no_fim:
+            input("Pressione Enter para fechar...")
+
+if __name__ == "__main__":
+    executar_linha_de_comando(pausar_no_fim=True)
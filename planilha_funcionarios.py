@@ -0,0 +1,175 @@
+import io
+import os
+import re
+import pickle
+import hashlib
+
+import metricas
+from cache_pastas import DIRETORIO_CACHE
+from indice_nomes import BaseFuncionarios
+
+# --- CONFIGURAÇÕES DO SNAPSHOT LOCAL DA PLANILHA ---
+# A planilha fica num compartilhamento de rede lento; a tabela já tratada é guardada
+# localmente e só é relida quando o arquivo de origem muda (data/tamanho/hash).
+USAR_SNAPSHOT_PLANILHA = True
+# "openpyxl": lê a planilha linha a linha (modo read-only), só as colunas abaixo, sem
+# importar o pandas (início mais rápido e menos memória). "pandas": read_excel.
+# Sem o openpyxl instalado, usa o pandas.
+LEITOR_PLANILHA = "openpyxl"
+COLUNAS_PLANILHA = ["NOME", "CPF", "TELEFONE", "EMAIL"]
+# ----------------------------------------------------
+
+
+def limpar_numero(dado):
+    """ Remove tudo que não for número (para CPF e Telefone). """
+    return re.sub(r'[^0-9]', '', _texto_celula(dado))
+
+def _texto_celula(valor) -> str:
+    """ Célula como texto, igual ao read_excel(dtype=str): vazio -> "", 123.0 -> "123". """
+    if valor is None or valor != valor:  # None ou NaN
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+def formatar_telefone_cailun(telefone_limpo: str) -> str:
+    """ Formata o telefone no padrão estrito da API: XX(XX)XXXXX-XXXX. """
+    if not 12 <= len(telefone_limpo) <= 13:
+        return telefone_limpo
+    ddi, ddd, numero = telefone_limpo[:2], telefone_limpo[2:4], telefone_limpo[4:]
+    if len(numero) == 9:
+        return f"{ddi}({ddd}){numero[:5]}-{numero[5:]}"
+    elif len(numero) == 8:
+        return f"{ddi}({ddd}){numero[:4]}-{numero[4:]}"
+    return telefone_limpo
+
+def _tratar_planilha(df) -> dict:
+    """
+    Mesmas regras de limpar_numero / formatar_telefone_cailun, mas aplicadas na
+    coluna inteira com operações vetorizadas do pandas (sem iterrows).
+    """
+    texto = lambda coluna: df[coluna].fillna("").astype(str)
+    nomes = texto('NOME').str.strip().str.upper()
+    cpfs = texto('CPF').str.replace(r'[^0-9]', '', regex=True)
+    telefones = texto('TELEFONE').str.replace(r'[^0-9]', '', regex=True)
+    telefones = telefones.where((telefones == "") | telefones.str.startswith('55'), "55" + telefones)
+    telefones = (telefones
+                 .str.replace(r'^(\d{2})(\d{2})(\d{5})(\d{4})$', r'\1(\2)\3-\4', regex=True)
+                 .str.replace(r'^(\d{2})(\d{2})(\d{4})(\d{4})$', r'\1(\2)\3-\4', regex=True))
+    emails = texto('EMAIL').str.strip()
+
+    return {
+        nome: {"name": nome.title(), "cpf": cpf, "phone": telefone, "email": email}
+        for nome, cpf, telefone, email in zip(nomes, cpfs, telefones, emails)
+        if nome
+    }
+
+def _tratar_linhas(linhas) -> dict:
+    """ Mesmas regras de _tratar_planilha, linha a linha (leitor sem pandas). """
+    registros = {}
+    for nome, cpf, telefone, email in linhas:
+        nome = _texto_celula(nome).strip().upper()
+        if not nome:
+            continue
+        telefone = limpar_numero(telefone)
+        if telefone and not telefone.startswith('55'):
+            telefone = "55" + telefone
+        registros[nome] = {
+            "name": nome.title(), "cpf": limpar_numero(cpf),
+            "phone": formatar_telefone_cailun(telefone), "email": _texto_celula(email).strip(),
+        }
+    return registros
+
+def _ler_com_openpyxl(conteudo: bytes) -> dict:
+    """
+    Lê a primeira aba em modo read-only (as linhas vêm do XML sob demanda) e só o
+    intervalo de colunas que contém COLUNAS_PLANILHA; o resto da linha é ignorado.
+    """
+    from openpyxl import load_workbook
+
+    livro = load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True)
+    try:
+        aba = livro.worksheets[0]
+        cabecalho = [_texto_celula(valor) for valor in next(aba.iter_rows(max_row=1, values_only=True), ())]
+        faltando = [coluna for coluna in COLUNAS_PLANILHA if coluna not in cabecalho]
+        if faltando:
+            raise KeyError(f"coluna(s) ausente(s) na planilha: {', '.join(faltando)}")
+        indices = [cabecalho.index(coluna) for coluna in COLUNAS_PLANILHA]
+        primeira, ultima = min(indices), max(indices)
+        linhas = aba.iter_rows(min_row=2, min_col=primeira + 1, max_col=ultima + 1, values_only=True)
+        return _tratar_linhas(
+            tuple(linha[i - primeira] if i - primeira < len(linha) else None for i in indices) for linha in linhas
+        )
+    finally:
+        livro.close()
+
+def _ler_com_pandas(conteudo: bytes) -> dict:
+    import pandas as pd  # Importado só aqui: custa ~1 s no início de cada execução
+
+    return _tratar_planilha(pd.read_excel(io.BytesIO(conteudo), dtype=str, usecols=COLUNAS_PLANILHA))
+
+def _ler_planilha(conteudo: bytes) -> dict:
+    if LEITOR_PLANILHA == "openpyxl":
+        try:
+            return _ler_com_openpyxl(conteudo)
+        except ImportError:
+            pass
+    return _ler_com_pandas(conteudo)
+
+def _caminho_snapshot(caminho_planilha: str) -> str:
+    chave = hashlib.sha1(os.path.abspath(caminho_planilha).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(DIRETORIO_CACHE, f"funcionarios_{chave}.pkl")
+
+def _ler_snapshot(caminho_planilha: str):
+    try:
+        with open(_caminho_snapshot(caminho_planilha), "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def _gravar_snapshot(caminho_planilha: str, snapshot: dict):
+    """ Grava em arquivo temporário e troca de uma vez, para nunca deixar snapshot pela metade. """
+    destino = _caminho_snapshot(caminho_planilha)
+    try:
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        with open(destino + ".tmp", "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(destino + ".tmp", destino)
+    except Exception as e:
+        print(f"⚠️ Não foi possível salvar o snapshot da planilha: {e}")
+
+@metricas.medir("planilha")
+def carregar_dados_excel(caminho):
+    """
+    LÊ O EXCEL, USANDO NOME COMPLETO COMO CHAVE. Retorna uma BaseFuncionarios.
+    Se a planilha não mudou (data e tamanho, ou o mesmo hash), usa o snapshot local;
+    se o compartilhamento estiver inacessível, cai no último snapshot conhecido.
+    """
+    snapshot = _ler_snapshot(caminho) if USAR_SNAPSHOT_PLANILHA else None
+    try:
+        info = os.stat(caminho)
+        if snapshot and (snapshot["mtime"], snapshot["tamanho"]) == (info.st_mtime, info.st_size):
+            return BaseFuncionarios(snapshot["registros"])
+
+        with open(caminho, "rb") as f:
+            conteudo = f.read()  # Uma única leitura na rede serve para o hash e para o parse
+        hash_planilha = hashlib.sha256(conteudo).hexdigest()
+
+        if snapshot and snapshot["sha256"] == hash_planilha:
+            registros = snapshot["registros"]
+        else:
+            registros = _ler_planilha(conteudo)
+
+        if USAR_SNAPSHOT_PLANILHA:
+            _gravar_snapshot(caminho, {
+                "mtime": info.st_mtime, "tamanho": info.st_size,
+                "sha256": hash_planilha, "registros": registros,
+            })
+        return BaseFuncionarios(registros)
+    except OSError as e:
+        if snapshot:
+            print(f"⚠️ Planilha inacessível ({e}). Usando o último snapshot local.")
+            return BaseFuncionarios(snapshot["registros"])
+        print(f"❌ Erro ao ler Excel: {e}"); return {}
+    except Exception as e:
+        print(f"❌ Erro ao ler Excel: {e}"); return {}
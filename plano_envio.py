@@ -0,0 +1,56 @@
+import os
+import json
+from datetime import datetime
+
+import metricas
+
+# --- CONFIGURAÇÕES DO PLANO DE ENVIO ---
+# Fase "planejar": varre as pastas, identifica funcionários e pastas RECIBOS e grava
+# tudo num arquivo JSON (ações + problemas), sem enviar nada.
+# Fase "executar": lê o plano e só faz uploads, sem nenhuma consulta de match/pastas.
+# Atenção: o plano contém CPF e telefone dos funcionários; não o copie para a rede.
+DIRETORIO_PLANOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "planos")
+# ----------------------------------------
+
+# Motivos de problema registrados no plano
+FUNCIONARIO_NAO_IDENTIFICADO = "FUNCIONARIO_NAO_IDENTIFICADO"
+RECIBOS_NAO_ENCONTRADA = "RECIBOS_NAO_ENCONTRADA"
+SETOR_NAO_MAPEADO = "SETOR_NAO_MAPEADO"
+PASTA_INACESSIVEL = "PASTA_INACESSIVEL"
+ENVIO_INTERROMPIDO = "ENVIO_INTERROMPIDO"
+CONTEUDO_DUPLICADO = "CONTEUDO_DUPLICADO"
+
+
+def novo_plano(tipo: str) -> dict:
+    # "movimentos": cópias já enviadas que só precisam ir para ENVIADOS (na execução).
+    # "_conteudos" (hash -> ação) só vale durante o planejamento e não vai para o arquivo
+    return {"tipo": tipo, "gerado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "acoes": [], "problemas": [],
+            "movimentos": [], "_conteudos": {}}
+
+def adicionar_problema(plano: dict, caminho: str, motivo: str, detalhe: str = ""):
+    metricas.contar(f"problema_{motivo.lower()}")
+    plano["problemas"].append({"caminho": caminho, "arquivo": os.path.basename(caminho), "motivo": motivo, "detalhe": detalhe})
+
+def salvar_plano(plano: dict, caminho: str = None) -> str:
+    """ Grava o plano (escrita atômica) e retorna o caminho do arquivo. """
+    if not caminho:
+        carimbo = datetime.now().strftime("%Y%m%d_%H%M%S")
+        caminho = os.path.join(DIRETORIO_PLANOS, f"plano_{plano['tipo']}_{carimbo}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    # Chaves "_..." (índices e buffers em memória) só valem durante a execução
+    publico = {chave: valor for chave, valor in plano.items() if not chave.startswith("_")}
+    publico["acoes"] = [{chave: valor for chave, valor in acao.items() if not chave.startswith("_")} for acao in plano["acoes"]]
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(publico, f, ensure_ascii=False, indent=2)
+    os.replace(caminho + ".tmp", caminho)
+    return caminho
+
+def carregar_plano(caminho: str) -> dict:
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def imprimir_resumo_plano(plano: dict):
+    print(f"\n📋 PLANO '{plano['tipo']}' ({plano['gerado_em']}): {len(plano['acoes'])} envio(s), {len(plano['problemas'])} problema(s)")
+    for problema in plano["problemas"]:
+        detalhe = f" - {problema['detalhe']}" if problema["detalhe"] else ""
+        print(f"   ↳ ⚠️ {problema['motivo']}: {problema['arquivo']}{detalhe}")
@@ -0,0 +1,318 @@
+import os
+import time
+import argparse
+import sqlite3
+import hashlib
+import threading
+
+from cache_pastas import DIRETORIO_CACHE
+
+# --- CONFIGURAÇÕES DO REGISTRO DE ENVIOS ---
+# Registro transacional (SQLite) de cada documento, chaveado pelo hash do conteúdo
+# e pela pasta de destino no Cailun. É ele, e não a pasta ENVIADOS, que diz se um
+# PDF já foi enviado: uma nova execução pula o que terminou e retoma o que parou.
+CAMINHO_REGISTRO_ENVIOS = os.path.join(DIRETORIO_CACHE, "registro_envios.sqlite3")
+TAMANHO_BLOCO_HASH = 1024 * 1024
+# --------------------------------------------
+
+# Estados, na ordem em que acontecem
+COMBINADO = "COMBINADO"   # Arquivo associado a um funcionário da planilha
+RESOLVIDO = "RESOLVIDO"   # Pasta RECIBOS encontrada no Cailun
+ENVIANDO = "ENVIANDO"     # POST /subscriptionFlow em andamento
+ENVIADO = "ENVIADO"       # API confirmou (2xx) e devolveu o id do fluxo
+MOVIDO = "MOVIDO"         # Arquivo movido para ENVIADOS: ciclo concluído
+
+# Próxima etapa de um documento, conforme o último estado registrado
+ETAPA_ENVIAR = "ENVIAR"
+ETAPA_MOVER = "MOVER"
+ETAPA_CONCLUIDO = "CONCLUIDO"
+ETAPA_INTERROMPIDO = "INTERROMPIDO"
+
+# Situação da assinatura de um fluxo já criado (conciliação com o Cailun)
+PENDENTE = "PENDENTE"
+ASSINADO = "ASSINADO"
+EXPIRADO = "EXPIRADO"
+RECUSADO = "RECUSADO"
+CANCELADO = "CANCELADO"
+NAO_ENCONTRADO = "NAO_ENCONTRADO"
+SITUACOES_FINAIS = {ASSINADO, EXPIRADO, RECUSADO, CANCELADO, NAO_ENCONTRADO}
+
+
+def hash_arquivo(caminho: str) -> str:
+    """ SHA-256 do conteúdo do arquivo, lido em blocos. """
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def extrair_id_fluxo(resposta) -> str:
+    """ Id do fluxo criado, conforme devolvido pelo POST /subscriptionFlow. """
+    try:
+        dados = resposta.json()
+    except ValueError:
+        return None
+    if isinstance(dados.get("data"), dict):
+        dados = dados["data"]
+    id_fluxo = dados.get("id") or dados.get("subscriptionFlowId") or dados.get("uuid")
+    return str(id_fluxo) if id_fluxo is not None else None
+
+
+def proxima_etapa(linha: dict) -> str:
+    """
+    Decide o que fazer com um documento a partir do registro:
+      * nunca visto / só resolvido -> ENVIAR
+      * enviado mas não movido (queda entre o POST e a movimentação) -> só MOVER
+      * movido -> CONCLUIDO (não reenvia)
+      * ENVIANDO (queda durante o POST) -> INTERROMPIDO: não dá para saber se a
+        API recebeu, então não reenvia automaticamente; confira no portal.
+    """
+    estado = linha["estado"] if linha else None
+    if estado in (None, COMBINADO, RESOLVIDO):
+        return ETAPA_ENVIAR
+    if estado == ENVIADO:
+        return ETAPA_MOVER
+    if estado == MOVIDO:
+        return ETAPA_CONCLUIDO
+    return ETAPA_INTERROMPIDO
+
+
+class RegistroEnvios:
+    """ Registro de envios seguro para uso entre threads (uma conexão protegida por lock). """
+
+    def __init__(self, caminho: str = CAMINHO_REGISTRO_ENVIOS):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        with self._lock, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS envios ("
+                " hash TEXT NOT NULL,"
+                " id_pasta INTEGER NOT NULL,"
+                " estado TEXT NOT NULL,"
+                " caminho TEXT,"
+                " funcionario TEXT,"
+                " id_fluxo TEXT,"
+                " atualizado_em REAL NOT NULL,"
+                " PRIMARY KEY (hash, id_pasta))"
+            )
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS transicoes ("
+                " hash TEXT NOT NULL,"
+                " id_pasta INTEGER NOT NULL,"
+                " estado TEXT NOT NULL,"
+                " detalhe TEXT,"
+                " em REAL NOT NULL)"
+            )
+            # Hash já calculado por (caminho, data, tamanho): reler o PDF na rede só se ele mudar
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                " caminho TEXT PRIMARY KEY,"
+                " mtime REAL NOT NULL,"
+                " tamanho INTEGER NOT NULL,"
+                " hash TEXT NOT NULL)"
+            )
+            # Um fluxo por linha; final=0 são os que a conciliação ainda precisa consultar
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS assinaturas ("
+                " id_fluxo TEXT PRIMARY KEY,"
+                " funcionario TEXT,"
+                " caminho TEXT,"
+                " enviado_em REAL NOT NULL,"
+                " situacao TEXT NOT NULL,"
+                " status_api TEXT,"
+                " final INTEGER NOT NULL DEFAULT 0,"
+                " consultado_em REAL)"
+            )
+            self._conexao.execute(
+                "CREATE INDEX IF NOT EXISTS assinaturas_pendentes ON assinaturas (final, consultado_em)"
+            )
+            # Posição (rowid de transicoes) até onde os envios já foram importados para assinaturas
+            self._conexao.execute("CREATE TABLE IF NOT EXISTS cursores (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+
+    def hash_do_arquivo(self, caminho: str) -> str:
+        """ hash_arquivo com memória: só relê o conteúdo se data ou tamanho mudaram. """
+        info = os.stat(caminho)
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT hash FROM hashes WHERE caminho = ? AND mtime = ? AND tamanho = ?",
+                (caminho, info.st_mtime, info.st_size),
+            ).fetchone()
+        if linha:
+            return linha["hash"]
+        hash_doc = hash_arquivo(caminho)
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO hashes (caminho, mtime, tamanho, hash) VALUES (?, ?, ?, ?)",
+                (caminho, info.st_mtime, info.st_size, hash_doc),
+            )
+        return hash_doc
+
+    def consultar(self, hash_doc: str, id_pasta: int):
+        """ Linha do documento (dict) ou None se ele nunca passou por aqui. """
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT * FROM envios WHERE hash = ? AND id_pasta = ?", (hash_doc, id_pasta)
+            ).fetchone()
+        return dict(linha) if linha else None
+
+    def envio_do_conteudo(self, hash_doc: str):
+        """
+        Envio já feito deste mesmo conteúdo, para qualquer pasta (dict) ou None.
+        É o índice de deduplicação: a mesma cópia do PDF em outra pasta da rede, ou
+        gerada de novo pela folha, aponta para o fluxo que já existe no Cailun.
+        """
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT * FROM envios WHERE hash = ? AND estado IN (?, ?, ?)"
+                " ORDER BY id_fluxo IS NULL, atualizado_em LIMIT 1",
+                (hash_doc, ENVIANDO, ENVIADO, MOVIDO),
+            ).fetchone()
+        return dict(linha) if linha else None
+
+    def registrar(self, hash_doc: str, id_pasta: int, estado: str, caminho: str = None,
+                  funcionario: str = None, id_fluxo: str = None, detalhe: str = None):
+        """ Grava a transição de estado (e o histórico) numa única transação. """
+        agora = time.time()
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT INTO envios (hash, id_pasta, estado, caminho, funcionario, id_fluxo, atualizado_em)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (hash, id_pasta) DO UPDATE SET"
+                "  estado = excluded.estado,"
+                "  caminho = COALESCE(excluded.caminho, caminho),"
+                "  funcionario = COALESCE(excluded.funcionario, funcionario),"
+                "  id_fluxo = COALESCE(excluded.id_fluxo, id_fluxo),"
+                "  atualizado_em = excluded.atualizado_em",
+                (hash_doc, id_pasta, estado, caminho, funcionario, id_fluxo, agora),
+            )
+            self._conexao.execute(
+                "INSERT INTO transicoes (hash, id_pasta, estado, detalhe, em) VALUES (?, ?, ?, ?, ?)",
+                (hash_doc, id_pasta, estado, detalhe, agora),
+            )
+
+    def interrompidos(self) -> list:
+        """ Documentos parados em ENVIANDO (POST interrompido ou com resultado incerto). """
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT * FROM envios WHERE estado = ? ORDER BY atualizado_em", (ENVIANDO,)
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def liberar_interrompido(self, hash_doc: str, id_pasta: int, id_fluxo: str = None) -> bool:
+        """
+        Resolve um envio interrompido depois de conferido o portal Cailun: com id_fluxo
+        (o fluxo existe), vira ENVIADO e a próxima execução só move o arquivo; sem ele
+        (o fluxo não foi criado), volta a RESOLVIDO e o documento é enviado de novo.
+        """
+        linha = self.consultar(hash_doc, id_pasta)
+        if not linha or linha["estado"] != ENVIANDO:
+            return False
+        if id_fluxo:
+            self.registrar(hash_doc, id_pasta, ENVIADO, id_fluxo=id_fluxo, detalhe="conferido no portal: fluxo existe")
+        else:
+            self.registrar(hash_doc, id_pasta, RESOLVIDO, detalhe="conferido no portal: fluxo não criado")
+        return True
+
+    def movimentos_pendentes(self) -> list:
+        """ Documentos enviados cujo arquivo ainda não foi para ENVIADOS (diário da movimentação). """
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT hash, id_pasta, caminho FROM envios WHERE estado = ? AND caminho IS NOT NULL ORDER BY atualizado_em",
+                (ENVIADO,),
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    # --- Conciliação das assinaturas ---
+
+    def importar_fluxos_enviados(self) -> int:
+        """
+        Acrescenta às assinaturas (como PENDENTE) os fluxos enviados desde a última
+        importação. Só lê as transições depois do cursor; retorna quantos entraram.
+        """
+        with self._lock, self._conexao:
+            linha = self._conexao.execute("SELECT valor FROM cursores WHERE nome = 'assinaturas'").fetchone()
+            cursor = linha["valor"] if linha else 0
+            novos = self._conexao.execute(
+                "SELECT t.rowid AS posicao, t.em, e.id_fluxo, e.funcionario, e.caminho FROM transicoes t"
+                " JOIN envios e ON e.hash = t.hash AND e.id_pasta = t.id_pasta"
+                " WHERE t.rowid > ? AND t.estado = ? ORDER BY t.rowid",
+                (cursor, ENVIADO),
+            ).fetchall()
+            antes = self._conexao.total_changes
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO assinaturas (id_fluxo, funcionario, caminho, enviado_em, situacao)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(n["id_fluxo"], n["funcionario"], n["caminho"], n["em"], PENDENTE) for n in novos if n["id_fluxo"]],
+            )
+            importados = self._conexao.total_changes - antes
+            if novos:
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO cursores (nome, valor) VALUES ('assinaturas', ?)", (novos[-1]["posicao"],)
+                )
+        return importados
+
+    def fluxos_pendentes(self, consultados_antes_de: float = None) -> list:
+        """ Fluxos ainda sem situação final (opcionalmente, só os não consultados desde então). """
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT * FROM assinaturas WHERE final = 0 AND (? IS NULL OR consultado_em IS NULL OR consultado_em < ?)"
+                " ORDER BY enviado_em",
+                (consultados_antes_de, consultados_antes_de),
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def atualizar_situacao(self, id_fluxo: str, situacao: str, status_api: str = None):
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "UPDATE assinaturas SET situacao = ?, status_api = ?, final = ?, consultado_em = ? WHERE id_fluxo = ?",
+                (situacao, status_api, int(situacao in SITUACOES_FINAIS), time.time(), id_fluxo),
+            )
+
+    def assinaturas(self, situacoes) -> list:
+        """ Fluxos nas situações pedidas, do envio mais antigo para o mais novo. """
+        situacoes = list(situacoes)
+        with self._lock:
+            linhas = self._conexao.execute(
+                f"SELECT * FROM assinaturas WHERE situacao IN ({', '.join('?' * len(situacoes))}) ORDER BY enviado_em",
+                situacoes,
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+
+if __name__ == "__main__":
+    #   python registro_envios.py interrompidos                      -> lista os envios parados em ENVIANDO
+    #   python registro_envios.py liberar <hash|arquivo> --fluxo ID  -> o fluxo existe no portal: só move o PDF
+    #   python registro_envios.py liberar <hash|arquivo>             -> o fluxo não existe: envia de novo
+    parser = argparse.ArgumentParser(description="Envios interrompidos do registro de envios.")
+    parser.add_argument("comando", choices=["interrompidos", "liberar"])
+    parser.add_argument("documento", nargs="?", help="Início do hash ou nome do arquivo (como listado)")
+    parser.add_argument("--fluxo", help="Id do fluxo encontrado no portal Cailun")
+    args = parser.parse_args()
+
+    registro = RegistroEnvios()
+    interrompidos = registro.interrompidos()
+    if args.comando == "interrompidos":
+        for linha in interrompidos:
+            print(f"{linha['hash'][:12]}  {os.path.basename(linha['caminho'] or '')}  ({linha['funcionario']})")
+        print(f"{len(interrompidos)} envio(s) interrompido(s).")
+    else:
+        if not args.documento: parser.error("informe o hash ou o nome do arquivo")
+        encontrados = [linha for linha in interrompidos if linha["hash"].startswith(args.documento)
+                       or os.path.basename(linha["caminho"] or "") == args.documento]
+        if len(encontrados) != 1:
+            print(f"❌ {len(encontrados)} envio(s) interrompido(s) correspondem a '{args.documento}'; informe mais do hash.")
+            raise SystemExit(1)
+        linha = encontrados[0]
+        registro.liberar_interrompido(linha["hash"], linha["id_pasta"], args.fluxo)
+        # Com várias máquinas, a reserva parada em ENVIANDO também precisa ser liberada
+        import reserva_trabalho
+        reservas = reserva_trabalho.criar_reservas()
+        if reservas:
+            reservas.descartar(linha["hash"], enviado=bool(args.fluxo))
+        print(f"✅ {os.path.basename(linha['caminho'] or '')}: "
+              f"{'fluxo ' + args.fluxo + ' registrado; a próxima execução só move o arquivo' if args.fluxo else 'liberado para novo envio'}.")
@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import threading
+
+# --- CONFIGURAÇÕES DAS RESERVAS DE TRABALHO (VÁRIAS MÁQUINAS / PROCESSOS) ---
+# Com um diretório compartilhado (ex.: uma pasta no \\fs), cada documento só é enviado
+# por quem o reservou primeiro: a reserva é um arquivo <hash>.reserva criado de forma
+# exclusiva (O_EXCL), renovado enquanto o envio acontece e trocado por <hash>.feito no
+# fim. Reserva não renovada (máquina caiu) vence e é assumida por outro processo.
+# As máquinas precisam de relógio sincronizado (NTP). None = uma máquina só.
+DIRETORIO_RESERVAS = os.environ.get("CAILUN_DIRETORIO_RESERVAS")
+DURACAO_RESERVA = 120                  # Segundos de validade de uma reserva sem renovação
+INTERVALO_RENOVACAO = 30               # Segundos entre renovações das reservas em uso
+VALIDADE_CONCLUIDOS = 45 * 24 * 3600   # Segundos até apagar os marcadores .feito antigos
+# ---------------------------------------------------------------------------
+
+# Resultado de reservar()
+RESERVADO = "RESERVADO"          # Documento é deste processo: pode enviar
+OCUPADO = "OCUPADO"              # Outro processo está com ele (reserva válida)
+CONCLUIDO = "CONCLUIDO"          # Outro processo já terminou
+INTERROMPIDO = "INTERROMPIDO"    # Reserva vencida no meio de um POST: pode ter chegado à API
+
+_ENVIANDO = "ENVIANDO"
+
+
+def criar_reservas():
+    """ ReservasTrabalho no DIRETORIO_RESERVAS configurado, ou None (uma máquina só). """
+    return ReservasTrabalho(DIRETORIO_RESERVAS) if DIRETORIO_RESERVAS else None
+
+
+class ReservasTrabalho:
+    """
+    Reservas de documentos num diretório compartilhado, seguras entre threads.
+    Uma thread renova as reservas em uso até concluir(), liberar() ou encerrar().
+    """
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self.dono = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.ocupados = 0                 # Documentos pulados por estarem com outro processo
+        self._minhas = {}                 # chave -> {"descricao", "estado"}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._renovador = None
+        self._saida = sys.stdout  # A renovação roda durante os envios, com o sys.stdout trocado
+        os.makedirs(diretorio, exist_ok=True)
+        self._limpar_concluidos()
+
+    def _caminho(self, chave: str, extensao: str = ".reserva") -> str:
+        return os.path.join(self.diretorio, f"{chave}{extensao}")
+
+    def _conteudo(self, chave: str, estado: str) -> bytes:
+        dados = {"dono": self.dono, "estado": estado, "descricao": self._minhas[chave]["descricao"],
+                 "expira_em": time.time() + DURACAO_RESERVA}
+        return json.dumps(dados, ensure_ascii=False).encode("utf-8")
+
+    def _ler(self, caminho: str):
+        """ Conteúdo da reserva; se ilegível (gravação pela metade), vale a data do arquivo. """
+        try:
+            with open(caminho, "rb") as f:
+                return json.loads(f.read().decode("utf-8"))
+        except ValueError:
+            return {"dono": None, "estado": None, "expira_em": os.path.getmtime(caminho) + DURACAO_RESERVA}
+
+    def _gravar(self, chave: str, estado: str):
+        """ Regrava a reserva (renovação/mudança de estado) trocando o arquivo de uma vez. """
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(self._conteudo(chave, estado))
+        os.replace(temporario, caminho)
+
+    def _criar(self, chave: str) -> bool:
+        try:
+            descritor = os.open(self._caminho(chave), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(descritor, "wb") as f:
+            f.write(self._conteudo(chave, RESERVADO))
+        return True
+
+    def reservar(self, chave: str, descricao: str = "") -> str:
+        """ Tenta reservar o documento; retorna RESERVADO, OCUPADO, CONCLUIDO ou INTERROMPIDO. """
+        with self._lock:
+            if chave in self._minhas:
+                return RESERVADO
+            if os.path.exists(self._caminho(chave, ".feito")):
+                return CONCLUIDO
+            self._minhas[chave] = {"descricao": descricao, "estado": RESERVADO}
+            try:
+                if self._criar(chave) or self._assumir_vencida(chave):
+                    # Quem concluiu entre a primeira checagem e a criação já gravou o .feito
+                    if os.path.exists(self._caminho(chave, ".feito")):
+                        del self._minhas[chave]
+                        os.remove(self._caminho(chave))
+                        return CONCLUIDO
+                    self._iniciar_renovador()
+                    return RESERVADO
+                existente = self._ler_se_existir(chave)
+            except OSError as e:
+                print(f"   ↳ ⚠️ Não foi possível reservar {descricao or chave}: {e}")
+                existente = None
+            del self._minhas[chave]
+            if existente and existente.get("estado") == _ENVIANDO and existente["expira_em"] < time.time():
+                return INTERROMPIDO
+            self.ocupados += 1
+            return OCUPADO
+
+    def _ler_se_existir(self, chave: str):
+        try:
+            return self._ler(self._caminho(chave))
+        except FileNotFoundError:
+            return None
+
+    def _assumir_vencida(self, chave: str) -> bool:
+        """
+        Assume uma reserva vencida: renomeia-a (só um processo consegue), confere se é
+        a mesma que estava vencida e cria a nova. Envio interrompido não é assumido.
+        """
+        vencida = self._ler_se_existir(chave)
+        if not vencida or vencida["expira_em"] >= time.time() or vencida.get("estado") == _ENVIANDO:
+            return False
+        caminho = self._caminho(chave)
+        descartada = f"{caminho}.{uuid.uuid4().hex[:8]}.vencida"
+        try:
+            os.rename(caminho, descartada)
+        except OSError:
+            return False  # Outro processo assumiu antes
+        if self._ler(descartada).get("dono") != vencida.get("dono"):
+            # Renomeamos uma reserva nova de outro processo: devolve e desiste
+            try:
+                os.rename(descartada, caminho)
+            except OSError:
+                pass
+            return False
+        os.remove(descartada)
+        print(f"   ↳ ♻️ Reserva vencida de {vencida.get('dono')} assumida: {self._minhas[chave]['descricao'] or chave}")
+        return self._criar(chave)
+
+    def concluido(self, chave: str) -> bool:
+        """ True se algum processo já concluiu o documento (.feito). """
+        return os.path.exists(self._caminho(chave, ".feito"))
+
+    def marcar_envio(self, chave: str) -> bool:
+        """
+        Anota na reserva que o POST vai começar (se ela vencer depois disso, ninguém
+        reenvia sozinho). False se não foi possível gravar: o documento não deve ser enviado.
+        """
+        with self._lock:
+            if chave not in self._minhas:
+                return False
+            try:
+                self._gravar(chave, _ENVIANDO)
+            except OSError as e:
+                print(f"   ↳ ⚠️ Não foi possível marcar o envio na reserva {self._minhas[chave]['descricao'] or chave}: {e}")
+                return False
+            self._minhas[chave]["estado"] = _ENVIANDO
+            return True
+
+    def concluir(self, chave: str):
+        """ Troca a reserva pelo marcador .feito: nenhum outro processo pega o documento. """
+        with self._lock:
+            if self._minhas.pop(chave, None) is None:
+                return
+            try:
+                with open(self._caminho(chave, ".feito"), "wb") as f:
+                    f.write(self.dono.encode("utf-8"))
+                os.remove(self._caminho(chave))
+            except OSError as e:
+                print(f"   ↳ ⚠️ Não foi possível concluir a reserva {chave}: {e}")
+
+    def liberar(self, chave: str):
+        """ Desiste do documento (ex.: falha no envio): outro processo, ou a próxima execução, tenta de novo. """
+        with self._lock:
+            if self._minhas.pop(chave, None) is None:
+                return
+            try:
+                if self._ler(self._caminho(chave)).get("dono") == self.dono:
+                    os.remove(self._caminho(chave))
+            except OSError:
+                pass
+
+    def abandonar(self, chave: str):
+        """
+        Para de renovar a reserva sem apagá-la (POST com resultado incerto): ela vence
+        em ENVIANDO e as outras máquinas a tratam como INTERROMPIDO até alguém conferir.
+        """
+        with self._lock:
+            self._minhas.pop(chave, None)
+
+    def descartar(self, chave: str, enviado: bool = False):
+        """
+        Apaga a reserva deixada por um envio interrompido, de qualquer dono, depois de
+        conferido o portal. enviado=True grava o .feito (o fluxo existe; ninguém reenvia).
+        """
+        with self._lock:
+            self._minhas.pop(chave, None)
+            if enviado:
+                with open(self._caminho(chave, ".feito"), "wb") as f:
+                    f.write(self.dono.encode("utf-8"))
+            try:
+                os.remove(self._caminho(chave))
+            except FileNotFoundError:
+                pass
+
+    def encerrar(self):
+        """
+        Para a renovação e libera o que ainda estiver reservado (fim de lote/execução).
+        Reserva com POST em andamento (erro inesperado no envio) fica para vencer como
+        INTERROMPIDO: outra máquina não pode reenviar sem conferir o portal.
+        """
+        for chave, reserva in list(self._minhas.items()):
+            if reserva["estado"] == _ENVIANDO:
+                with self._lock:
+                    self._minhas.pop(chave, None)
+            else:
+                self.liberar(chave)
+        self._parar.set()
+        if self._renovador:
+            self._renovador.join()
+            self._renovador = None
+
+    def _iniciar_renovador(self):
+        if self._renovador is None:
+            self._parar.clear()
+            self._renovador = threading.Thread(target=self._renovar_periodicamente, daemon=True)
+            self._renovador.start()
+
+    def _renovar_periodicamente(self):
+        while not self._parar.wait(INTERVALO_RENOVACAO):
+            with self._lock:
+                for chave, reserva in list(self._minhas.items()):
+                    try:
+                        atual = self._ler(self._caminho(chave))
+                        if atual.get("dono") != self.dono:
+                            print(f"   ↳ ⚠️ Reserva de {reserva['descricao'] or chave} assumida por {atual.get('dono')}.",
+                                  file=self._saida, flush=True)
+                            del self._minhas[chave]
+                            continue
+                        self._gravar(chave, reserva["estado"])
+                    except OSError as e:
+                        print(f"   ↳ ⚠️ Falha ao renovar a reserva {chave}: {e}", file=self._saida, flush=True)
+
+    def _limpar_concluidos(self):
+        limite = time.time() - VALIDADE_CONCLUIDOS
+        try:
+            with os.scandir(self.diretorio) as entradas:
+                for entrada in entradas:
+                    if entrada.name.endswith(".feito") and entrada.stat().st_mtime < limite:
+                        os.remove(entrada.path)
+        except OSError:
+            pass
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Os módulos do projeto ficam na raiz do repositório (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cache, registro e snapshots dos testes numa pasta temporária, nunca em cache/ do
+# repositório. Definido antes de qualquer import do projeto (cache_pastas lê na carga).
+os.environ.setdefault("CAILUN_DIRETORIO_CACHE", tempfile.mkdtemp(prefix="cailun_testes_"))
@@ -0,0 +1,110 @@
+import json
+import time
+import base64
+
+import pytest
+
+import autenticacao
+import cliente_http
+
+
+def _jwt(expira_em: float) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": expira_em}).encode()).decode().rstrip("=")
+    return f"cabecalho.{payload}.assinatura"
+
+
+class _Resposta:
+    def __init__(self, status_code, dados=None):
+        self.status_code = status_code
+        self.headers = {}
+        self._dados = dados or {}
+
+    def json(self):
+        return self._dados
+
+
+class _SessaoFalsa:
+    """ Responde o login com token_login e as demais rotas com as respostas da fila. """
+
+    def __init__(self, token_login=None, respostas=()):
+        self.token_login = token_login
+        self.respostas = list(respostas)
+        self.chamadas = []
+
+    def request(self, metodo, url, **kwargs):
+        autorizacao = (kwargs.get("headers") or {}).get("Authorization")
+        self.chamadas.append((metodo, url.replace(cliente_http.URL_BASE_API, ""), autorizacao))
+        if url.endswith("/login"):
+            return _Resposta(200, {"accessToken": {"token": self.token_login}})
+        return self.respostas.pop(0)
+
+
+@pytest.fixture
+def sessao(monkeypatch, tmp_path):
+    monkeypatch.setattr(autenticacao, "CAMINHO_CACHE_TOKEN", str(tmp_path / ".cailun" / "token.json"))
+    monkeypatch.setattr(autenticacao, "_token_atual", None)
+    monkeypatch.setattr(autenticacao, "_emitido_em", None)
+    monkeypatch.setattr(cliente_http, "_provedor_token", (autenticacao.obter_token, autenticacao.renovar_token))
+    falsa = _SessaoFalsa()
+    monkeypatch.setattr(cliente_http, "_sessao", falsa)
+    return falsa
+
+
+def _gravar_cache(token, emitido_em=None):
+    autenticacao._gravar_token_cache(token, emitido_em or time.time())
+
+
+def test_token_valido_do_cache_e_reaproveitado(sessao):
+    token = _jwt(time.time() + 3600)
+    _gravar_cache(token)
+    assert autenticacao.obter_token() == token
+    assert autenticacao.obter_token() == token
+    assert sessao.chamadas == []
+
+
+def test_token_vencido_faz_novo_login(sessao):
+    # Dentro da margem de renovação já conta como vencido
+    _gravar_cache(_jwt(time.time() + autenticacao.MARGEM_RENOVACAO_TOKEN - 10))
+    novo = _jwt(time.time() + 3600)
+    sessao.token_login = novo
+    assert autenticacao.obter_token() == novo
+    assert [c[:2] for c in sessao.chamadas] == [("POST", "/login")]
+    assert autenticacao._ler_token_cache()[0] == novo
+
+
+def test_401_renova_o_token_e_reenvia_uma_vez(sessao):
+    antigo, novo = _jwt(time.time() + 3600), _jwt(time.time() + 7200)
+    _gravar_cache(antigo)
+    sessao.token_login = novo
+    sessao.respostas = [_Resposta(401), _Resposta(200)]
+
+    resposta = cliente_http.get("/storage/folder/1/folders", headers={"Authorization": "Bearer x"})
+    assert resposta.status_code == 200
+    assert sessao.chamadas == [
+        ("GET", "/storage/folder/1/folders", f"Bearer {antigo}"),
+        ("POST", "/login", None),
+        ("GET", "/storage/folder/1/folders", f"Bearer {novo}"),
+    ]
+
+
+def test_401_depois_da_renovacao_nao_entra_em_laco(sessao):
+    _gravar_cache(_jwt(time.time() + 3600))
+    sessao.token_login = _jwt(time.time() + 7200)
+    sessao.respostas = [_Resposta(401), _Resposta(401)]
+
+    resposta = cliente_http.post("/subscriptionFlow", headers={"Authorization": "Bearer x"})
+    assert resposta.status_code == 401
+    assert [c[:2] for c in sessao.chamadas] == [("POST", "/subscriptionFlow"), ("POST", "/login"), ("POST", "/subscriptionFlow")]
+
+
+def test_token_sem_exp_vale_a_validade_padrao_desde_o_login(sessao):
+    agora = time.time()
+    assert autenticacao._token_valido("opaco", agora)
+    assert not autenticacao._token_valido("opaco", agora - autenticacao.VALIDADE_PADRAO_TOKEN)
+    assert not autenticacao._token_valido("opaco", None)
+
+    _gravar_cache("opaco", agora - autenticacao.VALIDADE_PADRAO_TOKEN)
+    sessao.token_login = "novo-opaco"
+    assert autenticacao.obter_token() == "novo-opaco"
+    assert autenticacao.obter_token() == "novo-opaco"
+    assert len(sessao.chamadas) == 1
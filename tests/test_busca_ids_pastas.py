@@ -0,0 +1,61 @@
+import importlib
+
+import pytest
+
+import busca_ids_pastas
+import motor_assinaturas
+from cache_pastas import CachePastas
+
+
+@pytest.fixture
+def cache_temporario(monkeypatch, tmp_path):
+    caminho = tmp_path / "cache" / "pastas_cailun.sqlite3"
+    monkeypatch.setattr(busca_ids_pastas, "_cache_pastas", None)
+    monkeypatch.setattr(busca_ids_pastas, "CachePastas", lambda: CachePastas(str(caminho)))
+    return caminho
+
+
+def test_importar_nao_abre_o_cache():
+    modulo = importlib.reload(busca_ids_pastas)
+    assert modulo._cache_pastas is None
+
+
+def test_cache_criado_no_primeiro_uso(cache_temporario):
+    assert not cache_temporario.parent.exists()
+    busca_ids_pastas.invalidar_cache_pastas()
+    assert cache_temporario.exists()
+    assert busca_ids_pastas._obter_cache_pastas() is busca_ids_pastas._obter_cache_pastas()
+
+
+def _api_falsa(monkeypatch):
+    """ Mapa cacheado sem a subpasta; cada consulta direta à API fica registrada. """
+    consultas = []
+
+    def mapear(token, id_pasta, usar_cache=True):
+        if usar_cache:
+            return {}
+        consultas.append(id_pasta)
+        return {"RECIBOS": 99}
+
+    monkeypatch.setattr(busca_ids_pastas, "mapear_pastas_cailun", mapear)
+    monkeypatch.setattr(busca_ids_pastas, "_pastas_confirmadas_na_api", set())
+    return consultas
+
+
+def test_subpasta_relida_da_api_uma_vez_por_contexto(cache_temporario, monkeypatch):
+    consultas = _api_falsa(monkeypatch)
+    assert busca_ids_pastas._buscar_subpasta("tk", 10, "RECIBOS") == 99
+    assert busca_ids_pastas._buscar_subpasta("tk", 10, "RECIBOS") is None
+    assert consultas == [10]
+
+    busca_ids_pastas.reiniciar_confirmacoes_api()
+    assert busca_ids_pastas._buscar_subpasta("tk", 10, "RECIBOS") == 99
+    assert consultas == [10, 10]
+
+
+def test_recarga_do_contexto_esquece_as_confirmacoes(cache_temporario, monkeypatch):
+    _api_falsa(monkeypatch)
+    busca_ids_pastas._buscar_subpasta("tk", 10, "RECIBOS")
+    monkeypatch.setattr(motor_assinaturas, "obter_token", lambda: None)
+    assert motor_assinaturas.preparar_contexto() is None
+    assert busca_ids_pastas._pastas_confirmadas_na_api == set()
@@ -0,0 +1,63 @@
+import pytest
+
+import conciliacao_assinaturas
+import metricas
+import registro_envios
+from registro_envios import RegistroEnvios
+
+
+@pytest.fixture
+def registro(tmp_path):
+    return RegistroEnvios(str(tmp_path / "registro.sqlite3"))
+
+
+def _enviado(registro, hash_doc, id_fluxo):
+    registro.registrar(hash_doc, 10, registro_envios.RESOLVIDO, f"/rede/{hash_doc}.pdf", "JOÃO DA SILVA")
+    registro.registrar(hash_doc, 10, registro_envios.ENVIADO, id_fluxo=id_fluxo)
+
+
+def test_importacao_le_so_o_que_entrou_depois_do_cursor(registro):
+    _enviado(registro, "a", "1")
+    _enviado(registro, "b", "2")
+    assert registro.importar_fluxos_enviados() == 2
+    assert registro.importar_fluxos_enviados() == 0
+
+    registro.registrar("a", 10, registro_envios.MOVIDO)  # Outras transições não contam
+    _enviado(registro, "c", "3")
+    assert registro.importar_fluxos_enviados() == 1
+    assert [linha["id_fluxo"] for linha in registro.fluxos_pendentes()] == ["1", "2", "3"]
+
+
+def test_fluxo_repetido_ou_sem_id_nao_entra_duas_vezes(registro):
+    _enviado(registro, "a", "1")
+    registro.registrar("b", 20, registro_envios.ENVIADO, "/rede/b.pdf", "JOÃO DA SILVA", id_fluxo="1")  # Cópia no mesmo fluxo
+    registro.registrar("c", 10, registro_envios.ENVIADO, "/rede/c.pdf", "JOÃO DA SILVA")  # Sem id de fluxo
+    assert registro.importar_fluxos_enviados() == 1
+    assert registro.importar_fluxos_enviados() == 0
+
+
+def test_situacao_final_nao_e_consultada_de_novo(registro, monkeypatch, tmp_path):
+    monkeypatch.setattr(metricas, "DIRETORIO_RELATORIOS", str(tmp_path / "relatorios"))
+    monkeypatch.setattr(conciliacao_assinaturas, "obter_token", lambda: "token")
+    situacoes = {"1": (registro_envios.ASSINADO, "finished"), "2": (registro_envios.PENDENTE, "waiting")}
+    consultados = []
+
+    def consultar(token, id_fluxo):
+        consultados.append(id_fluxo)
+        return situacoes[id_fluxo]
+
+    monkeypatch.setattr(conciliacao_assinaturas, "consultar_situacao_fluxo", consultar)
+    _enviado(registro, "a", "1")
+    _enviado(registro, "b", "2")
+    conciliacao_assinaturas.conciliar_assinaturas(max_workers=2, registro=registro)
+    assert sorted(consultados) == ["1", "2"]
+
+    # Pendente consultado há pouco fica para depois do INTERVALO_RECONSULTA; assinado, nunca mais
+    consultados.clear()
+    conciliacao_assinaturas.conciliar_assinaturas(max_workers=2, registro=registro)
+    assert consultados == []
+    caminho = conciliacao_assinaturas.conciliar_assinaturas(max_workers=2, reconsultar_todos=True, registro=registro)
+    assert consultados == ["2"]
+    with open(caminho, encoding="utf-8-sig") as f:
+        linhas = f.read().splitlines()
+    assert len(linhas) == 2 and linhas[1].startswith(f"{registro_envios.PENDENTE};JOÃO DA SILVA;b.pdf;2;")
@@ -0,0 +1,78 @@
+import pytest
+
+import controle_concorrencia
+from controle_concorrencia import LimiteAdaptativo, RETRY_AFTER_MAXIMO
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = _Relogio()
+    monkeypatch.setattr(controle_concorrencia, "time", relogio)
+    return relogio
+
+
+def _resposta(limite, status=200, latencia=0.1):
+    limite.adquirir()
+    limite.liberar(latencia, status)
+
+
+def test_aumento_aditivo_ate_o_maximo(relogio):
+    limite = LimiteAdaptativo("teste", inicial=4, minimo=1, maximo=6)
+    _resposta(limite)
+    assert limite.limite == pytest.approx(4.25)
+    # Cerca de +1 a cada "limite" respostas boas
+    for _ in range(3):
+        _resposta(limite)
+    assert 4.9 < limite.limite < 5
+    for _ in range(100):
+        _resposta(limite)
+    assert limite.limite == 6
+
+
+def test_no_maximo_uma_reducao_por_ida_e_volta(relogio):
+    limite = LimiteAdaptativo("teste", inicial=16, minimo=1, maximo=16)
+    _resposta(limite, 503, latencia=1.0)
+    _resposta(limite, 503, latencia=1.0)
+    _resposta(limite, 429, latencia=1.0)
+    assert limite.limite == 8
+
+    relogio.agora += 1.5  # Mais que a latência média: nova leva de respostas
+    _resposta(limite, None, latencia=1.0)
+    assert limite.limite == 4
+
+
+def test_limite_nao_cai_abaixo_do_minimo(relogio):
+    limite = LimiteAdaptativo("teste", inicial=4, minimo=2, maximo=8)
+    for _ in range(5):
+        _resposta(limite, 503)
+        relogio.agora += 10
+    assert limite.limite == 2
+
+
+@pytest.mark.parametrize("latencia, esperado_reduzir", [(True, True), (False, False)])
+def test_latencia_alta_so_conta_quando_ligada(relogio, latencia, esperado_reduzir):
+    limite = LimiteAdaptativo("teste", inicial=4, minimo=1, maximo=8, latencia=latencia)
+    for _ in range(5):
+        _resposta(limite, latencia=0.1)
+    antes = limite.limite
+    for _ in range(5):
+        relogio.agora += 10
+        _resposta(limite, latencia=5.0)
+    assert (limite.limite < antes) == esperado_reduzir
+
+
+def test_retry_after_limitado_ao_teto(relogio):
+    limite = LimiteAdaptativo("teste", inicial=2, minimo=1, maximo=4)
+    limite.pausar(RETRY_AFTER_MAXIMO * 10)
+    assert limite._pausado_ate == relogio.agora + RETRY_AFTER_MAXIMO
+    # Pausa menor não encurta a que já está valendo
+    limite.pausar(5)
+    assert limite._pausado_ate == relogio.agora + RETRY_AFTER_MAXIMO
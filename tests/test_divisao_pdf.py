@@ -0,0 +1,62 @@
+import pytest
+
+import divisao_pdf
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _pdf_com_textos(caminho, textos):
+    """ PDF mínimo (Helvetica, uma linha de texto por '\\n') com uma página por texto. """
+    objetos = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(len(textos)))}] /Count {len(textos)} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, texto in enumerate(textos):
+        fluxo = "BT /F1 12 Tf 50 750 Td " + " ".join(f"({linha}) Tj 0 -20 Td" for linha in texto.split("\n")) + " ET"
+        objetos.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>")
+        objetos.append(f"<< /Length {len(fluxo)} >>\nstream\n{fluxo}\nendstream")
+    conteudo, posicoes = b"%PDF-1.4\n", []
+    for numero, objeto in enumerate(objetos, start=1):
+        posicoes.append(len(conteudo))
+        conteudo += f"{numero} 0 obj\n{objeto}\nendobj\n".encode("latin-1")
+    inicio_xref = len(conteudo)
+    conteudo += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    conteudo += b"".join(f"{posicao:010d} 00000 n \n".encode() for posicao in posicoes)
+    conteudo += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode()
+    caminho.write_bytes(conteudo)
+    return str(caminho)
+
+
+def test_paginas_agrupadas_por_funcionario(tmp_path):
+    consolidado = _pdf_com_textos(tmp_path / "FOLHA 12-2025.pdf", [
+        "CAPA DO RELATORIO",
+        "Empresa X\nFuncionario: 123 - JOAO DA SILVA   Cargo: ANALISTA",
+        "continuacao sem nome",
+        "Funcionario: 124 - MARIA SOUZA",
+        "Funcionario: 124 - MARIA SOUZA\nsegunda via",
+        "Colaborador: 125 - PEDRO ALVES",
+    ])
+    partes = list(divisao_pdf.dividir_pdf_consolidado(consolidado))
+
+    assert [(nome, paginas) for nome, paginas, _ in partes] == [
+        (None, [1, 1]),
+        ("JOAO DA SILVA", [2, 3]),
+        ("MARIA SOUZA", [4, 5]),
+        ("PEDRO ALVES", [6, 6]),
+    ]
+    for nome, (inicial, final), documento in partes:
+        assert len(pypdf.PdfReader(documento).pages) == final - inicial + 1
+    assert partes[1][2].name == "FOLHA 12-2025 - JOAO DA SILVA.pdf"
+
+
+def test_extrair_paginas_refaz_a_mesma_parte(tmp_path):
+    consolidado = _pdf_com_textos(tmp_path / "FOLHA.pdf", [
+        "Funcionario: 1 - JOAO DA SILVA", "verso", "Funcionario: 2 - MARIA SOUZA",
+    ])
+    leitores = {}
+    documento = divisao_pdf.extrair_paginas(consolidado, [1, 2], "JOAO.pdf", leitores)
+    paginas = pypdf.PdfReader(documento).pages
+    assert len(paginas) == 2 and "JOAO DA SILVA" in paginas[0].extract_text()
+    assert list(leitores) == [consolidado]
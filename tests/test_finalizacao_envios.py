@@ -0,0 +1,82 @@
+import os
+
+import motor_assinaturas
+import registro_envios
+from finalizacao_envios import FinalizadorMovimentos
+from registro_envios import RegistroEnvios
+
+DADOS_FUNC = {"name": "JOÃO DA SILVA", "cpf": "12345678900", "phone": "51988887777", "email": "joao@exemplo.com"}
+
+
+def _pdf(pasta, nome):
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, "wb") as f:
+        f.write(b"%PDF-1.4 mesmo conteudo")
+    return caminho
+
+
+def test_finalizador_move_copias_com_a_mesma_chave(tmp_path):
+    registro = RegistroEnvios(str(tmp_path / "registro.sqlite3"))
+    original = _pdf(str(tmp_path / "TELE FILIAL"), "JOAO.pdf")
+    copia = _pdf(str(tmp_path / "TELE MATRIZ"), "JOAO.pdf")
+    registro.registrar("abc", 10, registro_envios.ENVIADO, original, "JOÃO DA SILVA", id_fluxo="1")
+
+    finalizador = FinalizadorMovimentos(registro).iniciar()
+    finalizador.agendar("abc", 10, original)
+    finalizador.agendar("abc", 10, copia, registrar=False)
+    finalizador.agendar("abc", 10, original)  # Repetido: ignorado
+    assert finalizador.aguardar()
+
+    assert finalizador.movidos == 2
+    assert os.path.exists(os.path.join(tmp_path, "TELE FILIAL", "ENVIADOS", "JOAO.pdf"))
+    assert os.path.exists(os.path.join(tmp_path, "TELE MATRIZ", "ENVIADOS", "JOAO.pdf"))
+    linha = registro.consultar("abc", 10)
+    assert (linha["estado"], linha["caminho"]) == (registro_envios.MOVIDO, original)
+
+
+def test_copia_na_mesma_pasta_do_cailun_nao_toma_a_linha_do_original(tmp_path, monkeypatch):
+    registro = RegistroEnvios(str(tmp_path / "registro.sqlite3"))
+    original = _pdf(str(tmp_path / "TELE FILIAL"), "JOAO.pdf")
+    copia = _pdf(str(tmp_path / "TELE MATRIZ"), "JOAO SILVA.pdf")
+    registro.registrar("abc", 10, registro_envios.COMBINADO, original, "JOÃO DA SILVA")
+    registro.registrar("abc", 10, registro_envios.RESOLVIDO)
+    monkeypatch.setattr(motor_assinaturas, "enviar_fluxo_assinatura",
+                        lambda *a: {"status": 201, "id_fluxo": "1", "hash": "abc"})
+
+    finalizador = FinalizadorMovimentos(registro).iniciar()
+    trabalho = {
+        "arquivo": "JOAO.pdf", "caminho": original, "perfil": "contra_cheque", "hash": "abc", "id_recibos": 10,
+        "dados_func": DADOS_FUNC, "nome_completo": "JOÃO DA SILVA", "token": "token",
+        "etapa": registro_envios.ETAPA_ENVIAR, "registro": registro, "reservas": None, "finalizador": finalizador,
+        "copias": [{"caminho": copia, "id_recibos": 10, "origem": None}],
+    }
+    assert motor_assinaturas._enviar_documento(trabalho)
+    assert finalizador.aguardar()
+
+    assert not os.path.exists(original) and not os.path.exists(copia)
+    linha = registro.consultar("abc", 10)
+    assert (linha["estado"], linha["caminho"], linha["id_fluxo"]) == (registro_envios.MOVIDO, original, "1")
+
+
+def test_copia_ja_enviada_e_consolidado_vao_pelo_finalizador(tmp_path):
+    registro = RegistroEnvios(str(tmp_path / "registro.sqlite3"))
+    original = _pdf(str(tmp_path / "TELE FILIAL"), "JOAO.pdf")
+    copia = _pdf(str(tmp_path / "TELE MATRIZ"), "JOAO.pdf")
+    consolidado = _pdf(str(tmp_path / "FOLHA"), "FOLHA 12-2025.pdf")
+    registro.registrar("abc", 10, registro_envios.MOVIDO, original, "JOÃO DA SILVA", id_fluxo="1")
+    plano = {"acoes": [{"hash": "abc", "id_recibos": 10}], "problemas": [], "consolidado": consolidado,
+             "movimentos": [{"caminho": copia, "hash": "abc", "id_pasta": 10}]}
+
+    finalizador = FinalizadorMovimentos(registro)
+    motor_assinaturas._agendar_movimentos(plano, finalizador)
+    assert motor_assinaturas._concluir_consolidado(plano, registro, finalizador)
+    # Nada é movido antes de a thread do finalizador rodar
+    assert os.path.exists(copia) and os.path.exists(consolidado)
+
+    finalizador.iniciar()
+    assert finalizador.aguardar()
+    assert finalizador.movidos == 2
+    assert os.path.exists(os.path.join(tmp_path, "TELE MATRIZ", "ENVIADOS", "JOAO.pdf"))
+    assert os.path.exists(os.path.join(tmp_path, "FOLHA", "ENVIADOS", "FOLHA 12-2025.pdf"))
+    assert registro.consultar("abc", 10)["caminho"] == original
@@ -0,0 +1,64 @@
+from indice_nomes import BaseFuncionarios, resolver_nome
+
+
+def test_palavra_com_bigrama_repetido_aceita_um_erro():
+    # ANANIAS repete "AN": o filtro de bigramas não pode descartar a palavra certa
+    base = BaseFuncionarios({"ANANIAS PEREIRA": {}, "BARBARA LIMA": {}})
+    assert base._palavras_parecidas("ANANIAZ") == {"ANANIAS": 1}
+    assert base._palavras_parecidas("BARBRA") == {"BARBARA": 1}
+    assert base._palavras_parecidas("ANANIAS") == {"ANANIAS": 0}
+    assert base._palavras_parecidas("PEREIRO") == {"PEREIRA": 1}
+    assert base._palavras_parecidas("LIMA") == {"LIMA": 0}
+    assert base._palavras_parecidas("XAVIER") == {}
+
+
+def _base_resolucao():
+    return BaseFuncionarios({
+        "JOÃO DA SILVA": {},
+        "MARIO SOUZA SANTOS": {},
+        "ANA SILVA SOUZA": {},
+        "ANA SILVA LIMA": {},
+    })
+
+
+def test_resolver_nome_exato():
+    assert resolver_nome(_base_resolucao(), "MARIO SOUZA SANTOS") == ("MARIO SOUZA SANTOS", [("MARIO SOUZA SANTOS", 1.0)])
+
+
+def test_resolver_nome_so_com_diferenca_de_acento():
+    nome, _ = resolver_nome(_base_resolucao(), "Joao_da Silva")
+    assert nome == "JOÃO DA SILVA"
+
+
+def test_resolver_nome_ambiguo_vai_para_revisao():
+    nome, pontuados = resolver_nome(_base_resolucao(), "ANA SILVA")
+    assert nome is None
+    assert [n for n, _ in pontuados] == ["ANA SILVA SOUZA", "ANA SILVA LIMA"]
+
+
+def test_resolver_nome_com_erro_de_digitacao_vai_para_revisao():
+    # Uma letra de diferença pode ser outro funcionário (MARIA x MARIO)
+    nome, pontuados = resolver_nome(_base_resolucao(), "MARIA SOUZA SANTOS")
+    assert nome is None
+    assert pontuados == [("MARIO SOUZA SANTOS", 0.938)]
+
+
+def test_candidatos_e_a_intersecao_das_palavras():
+    base = BaseFuncionarios({"ANA SILVA SOUZA": {}, "ANA LIMA SOUZA": {}, "JOSE SILVA SOUZA": {}})
+    assert base.candidatos("ANA SOUZA") == ["ANA SILVA SOUZA", "ANA LIMA SOUZA"]
+    assert base.candidatos("ana  silva") == ["ANA SILVA SOUZA"]
+    assert base.candidatos("ANA XAVIER") == []
+    assert base.candidatos("DA DE") == []
+
+
+def test_palavra_fora_da_faixa_de_tamanho_nao_e_parecida():
+    base = BaseFuncionarios({"ROBERTO LIMA": {}, "ROBERTA LIMA": {}, "ROBERTINHO LIMA": {}})
+    assert base._palavras_parecidas("ROBERTOO") == {"ROBERTO": 1, "ROBERTA": 2}
+    assert base._palavras_parecidas("ROBERTX") == {"ROBERTO": 1, "ROBERTA": 1}
+
+
+def test_candidatos_aproximados_empatados_sao_todos_reportados():
+    base = BaseFuncionarios({"ROBERTO LIMA": {}, "ROBERTA LIMA": {}})
+    pontuados = base.candidatos_aproximados("ROBERTX LIMA")
+    assert pontuados == [("ROBERTO LIMA", 0.909), ("ROBERTA LIMA", 0.909)]
+    assert resolver_nome(base, "ROBERTX LIMA") == (None, pontuados)
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+import modo_vigia
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """ Relógio controlado pelo teste (o estabilizador usa time.time). """
+    agora = [1000.0]
+    monkeypatch.setattr(modo_vigia.time, "time", lambda: agora[0])
+    return agora
+
+
+def _pdf(tmp_path, nome="JOAO.pdf"):
+    caminho = tmp_path / nome
+    caminho.write_bytes(b"%PDF-1.4")
+    return str(caminho)
+
+
+def test_entrega_so_depois_de_estavel_e_uma_vez(tmp_path, relogio):
+    estabilizador = modo_vigia._Estabilizador()
+    caminho = _pdf(tmp_path)
+
+    estabilizador.observar(caminho)
+    assert estabilizador.prontos() == []
+    relogio[0] += modo_vigia.TEMPO_ESTABILIZACAO
+    assert estabilizador.prontos() == [caminho]
+
+    estabilizador.observar(caminho)
+    relogio[0] += modo_vigia.TEMPO_ESTABILIZACAO
+    assert estabilizador.prontos() == []
+
+
+def test_arquivo_com_falha_volta_depois_da_espera(tmp_path, relogio):
+    estabilizador = modo_vigia._Estabilizador()
+    caminho = _pdf(tmp_path)
+    estabilizador.observar(caminho)
+    relogio[0] += modo_vigia.TEMPO_ESTABILIZACAO
+    assert estabilizador.prontos() == [caminho]
+
+    estabilizador.falhou([caminho])
+    estabilizador.observar(caminho)
+    relogio[0] += modo_vigia.TEMPO_ESTABILIZACAO
+    assert estabilizador.prontos() == []
+
+    relogio[0] += modo_vigia.ESPERA_NOVA_TENTATIVA
+    estabilizador.observar(caminho)
+    relogio[0] += modo_vigia.TEMPO_ESTABILIZACAO
+    assert estabilizador.prontos() == [caminho]
+
+
+def test_arquivo_que_saiu_da_pasta_e_esquecido(tmp_path, relogio):
+    estabilizador = modo_vigia._Estabilizador()
+    caminho = _pdf(tmp_path)
+    estabilizador.observar(caminho)
+    relogio[0] += modo_vigia.TEMPO_ESTABILIZACAO
+    assert estabilizador.prontos() == [caminho]
+
+    os.remove(caminho)
+    estabilizador.podar()
+    assert estabilizador._entregues == {}
+
+    # Mesmo nome de novo (ex.: PDF regerado): é entregue outra vez
+    _pdf(tmp_path)
+    estabilizador.observar(caminho)
+    relogio[0] += modo_vigia.TEMPO_ESTABILIZACAO
+    assert estabilizador.prontos() == [caminho]
@@ -0,0 +1,32 @@
+import io
+
+import pytest
+
+import planilha_funcionarios
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+
+
+def _planilha_xlsx() -> bytes:
+    """ Planilha com os formatos que aparecem no rel_funcionarios.xlsx (números, máscaras, vazios, colunas extras). """
+    df = pd.DataFrame({
+        "MATRICULA": [1, 2, 3, 4, 5, 6],
+        "NOME": [" joão da silva ", "MARIA SOUZA", None, "Pedro Alves", "ANA LIMA", "JOSÉ SANTOS"],
+        "CPF": [12345678901, "123.456.789-01", 1234567890.0, None, "98765432100", 11122233344],
+        "SETOR": ["TELE FILIAL"] * 6,
+        "TELEFONE": [51988887777, "(51) 98888-7777", "5551988887777", 5133334444.0, None, "abc"],
+        "EMAIL": [" joao@exemplo.com ", None, "x@y", "pedro@exemplo.com", None, "jose@exemplo.com"],
+    })
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def test_leitores_openpyxl_e_pandas_dao_os_mesmos_registros():
+    conteudo = _planilha_xlsx()
+    registros = planilha_funcionarios._ler_com_openpyxl(conteudo)
+    assert registros == planilha_funcionarios._ler_com_pandas(conteudo)
+    assert len(registros) == 5  # Linha sem nome fica de fora
+    assert registros["MARIA SOUZA"]["cpf"] == "12345678901"
+    assert registros["PEDRO ALVES"]["phone"] == "55(51)3333-4444"
@@ -0,0 +1,51 @@
+import io
+import os
+
+import motor_assinaturas
+import registro_envios
+from plano_envio import novo_plano, adicionar_problema, salvar_plano, carregar_plano, FUNCIONARIO_NAO_IDENTIFICADO
+from registro_envios import RegistroEnvios
+
+DADOS_FUNC = {"name": "JOÃO DA SILVA", "cpf": "12345678900", "phone": "51988887777", "email": "joao@exemplo.com"}
+
+
+def _acao(hash_doc, id_recibos, caminho, **extra):
+    return {"perfil": "contra_cheque", "arquivo": os.path.basename(caminho), "caminho": caminho,
+            "nome_completo": "JOÃO DA SILVA", "dados_func": DADOS_FUNC, "id_recibos": id_recibos,
+            "hash": hash_doc, "etapa": registro_envios.ETAPA_ENVIAR, "copias": [], **extra}
+
+
+def test_plano_salvo_e_relido_igual_sem_as_chaves_internas(tmp_path):
+    plano = novo_plano("contra_cheque")
+    plano["acoes"].append(_acao("abc", 10, "/rede/JOAO.pdf"))
+    plano["acoes"].append(_acao("def", 10, "/rede/FOLHA.pdf#paginas=1-2", _documento=io.BytesIO(b"%PDF"),
+                                origem={"caminho": "/rede/FOLHA.pdf", "paginas": [1, 2]}))
+    plano["_conteudos"]["abc"] = plano["acoes"][0]
+    plano["movimentos"].append({"caminho": "/rede/COPIA.pdf", "hash": "abc", "id_pasta": 10})
+    adicionar_problema(plano, "/rede/FULANO.pdf", FUNCIONARIO_NAO_IDENTIFICADO, "FULANO")
+
+    caminho = salvar_plano(plano, str(tmp_path / "planos" / "plano.json"))
+    relido = carregar_plano(caminho)
+
+    assert os.listdir(tmp_path / "planos") == ["plano.json"]  # Sem o .tmp da escrita atômica
+    assert "_conteudos" not in relido
+    assert "_documento" not in relido["acoes"][1]
+    assert relido["acoes"][1]["origem"] == {"caminho": "/rede/FOLHA.pdf", "paginas": [1, 2]}
+    assert relido["acoes"][0] == plano["acoes"][0]
+    assert relido["problemas"] == plano["problemas"]
+    assert relido["movimentos"] == plano["movimentos"]
+    assert (relido["tipo"], relido["gerado_em"]) == (plano["tipo"], plano["gerado_em"])
+
+
+def test_plano_relido_so_gera_trabalho_do_que_falta(tmp_path):
+    registro = RegistroEnvios(str(tmp_path / "registro.sqlite3"))
+    plano = novo_plano("contra_cheque")
+    for hash_doc, estado in [("a", registro_envios.RESOLVIDO), ("b", registro_envios.ENVIADO), ("c", registro_envios.MOVIDO)]:
+        registro.registrar(hash_doc, 10, estado, f"/rede/{hash_doc}.pdf", "JOÃO DA SILVA")
+        plano["acoes"].append(_acao(hash_doc, 10, f"/rede/{hash_doc}.pdf"))
+    relido = carregar_plano(salvar_plano(plano, str(tmp_path / "plano.json")))
+
+    trabalhos = list(motor_assinaturas._trabalhos_do_plano(relido["acoes"], "token", registro))
+    assert [(t["hash"], t["etapa"]) for t in trabalhos] == [
+        ("a", registro_envios.ETAPA_ENVIAR), ("b", registro_envios.ETAPA_MOVER)]
+    assert trabalhos[0]["dados_func"] == DADOS_FUNC
@@ -0,0 +1,188 @@
+import io
+import os
+
+import pytest
+import requests
+
+import cliente_http
+import motor_assinaturas
+import registro_envios
+from registro_envios import RegistroEnvios, proxima_etapa
+from reserva_trabalho import ReservasTrabalho
+
+DADOS_FUNC = {"name": "JOÃO DA SILVA", "cpf": "12345678900", "phone": "51988887777", "email": "joao@exemplo.com"}
+
+
+@pytest.fixture
+def registro(tmp_path):
+    return RegistroEnvios(str(tmp_path / "registro.sqlite3"))
+
+
+@pytest.mark.parametrize("estado, etapa", [
+    (None, registro_envios.ETAPA_ENVIAR),
+    (registro_envios.COMBINADO, registro_envios.ETAPA_ENVIAR),
+    (registro_envios.RESOLVIDO, registro_envios.ETAPA_ENVIAR),
+    (registro_envios.ENVIANDO, registro_envios.ETAPA_INTERROMPIDO),
+    (registro_envios.ENVIADO, registro_envios.ETAPA_MOVER),
+    (registro_envios.MOVIDO, registro_envios.ETAPA_CONCLUIDO),
+])
+def test_proxima_etapa(estado, etapa):
+    assert proxima_etapa({"estado": estado} if estado else None) == etapa
+
+
+def test_transicoes_mantem_caminho_e_fluxo(registro):
+    registro.registrar("abc", 10, registro_envios.COMBINADO, "/rede/JOAO.pdf", "JOÃO DA SILVA")
+    registro.registrar("abc", 10, registro_envios.RESOLVIDO)
+    registro.registrar("abc", 10, registro_envios.ENVIANDO)
+    registro.registrar("abc", 10, registro_envios.ENVIADO, id_fluxo="77")
+
+    linha = registro.consultar("abc", 10)
+    assert (linha["estado"], linha["caminho"], linha["id_fluxo"]) == (registro_envios.ENVIADO, "/rede/JOAO.pdf", "77")
+    assert [l["hash"] for l in registro.movimentos_pendentes()] == ["abc"]
+
+    registro.registrar("abc", 10, registro_envios.MOVIDO)
+    assert proxima_etapa(registro.consultar("abc", 10)) == registro_envios.ETAPA_CONCLUIDO
+    assert registro.movimentos_pendentes() == []
+    # Mesma pasta, outro conteúdo: linha independente
+    assert registro.consultar("def", 10) is None
+
+
+def test_liberar_interrompido(registro):
+    for hash_doc in ("com_fluxo", "sem_fluxo"):
+        registro.registrar(hash_doc, 10, registro_envios.COMBINADO, f"/rede/{hash_doc}.pdf", "JOÃO DA SILVA")
+        registro.registrar(hash_doc, 10, registro_envios.ENVIANDO)
+    assert {l["hash"] for l in registro.interrompidos()} == {"com_fluxo", "sem_fluxo"}
+
+    assert registro.liberar_interrompido("com_fluxo", 10, "99")
+    assert registro.liberar_interrompido("sem_fluxo", 10)
+    assert proxima_etapa(registro.consultar("com_fluxo", 10)) == registro_envios.ETAPA_MOVER
+    assert registro.consultar("com_fluxo", 10)["id_fluxo"] == "99"
+    assert proxima_etapa(registro.consultar("sem_fluxo", 10)) == registro_envios.ETAPA_ENVIAR
+    assert registro.interrompidos() == []
+    # Só linhas em ENVIANDO podem ser liberadas
+    assert not registro.liberar_interrompido("com_fluxo", 10)
+
+
+class _Resposta:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = "erro"
+
+    def json(self):
+        return {"data": {"id": 1}}
+
+
+@pytest.mark.parametrize("resultado_post, esperado", [
+    (_Resposta(201), dict),
+    (_Resposta(400), False),
+    (_Resposta(503), motor_assinaturas.ENVIO_INCERTO),
+    (requests.exceptions.ConnectTimeout("sem conexão"), False),
+    (requests.exceptions.ReadTimeout("sem resposta"), motor_assinaturas.ENVIO_INCERTO),
+    (requests.exceptions.ConnectionError("conexão reiniciada"), motor_assinaturas.ENVIO_INCERTO),
+])
+def test_enviar_fluxo_distingue_falha_de_resultado_incerto(monkeypatch, resultado_post, esperado):
+    def _post(url, **kwargs):
+        kwargs["data"].read()
+        if isinstance(resultado_post, Exception):
+            raise resultado_post
+        return resultado_post
+
+    monkeypatch.setattr(cliente_http, "post", _post)
+    resultado = motor_assinaturas.enviar_fluxo_assinatura(
+        "token", None, DADOS_FUNC, 10, documento=io.BytesIO(b"%PDF-1.4 teste"), nome_arquivo="JOAO.pdf")
+    if esperado is dict:
+        assert resultado["id_fluxo"] == "1"
+    else:
+        assert resultado == esperado
+
+
+def _trabalho(registro, reservas, caminho):
+    registro.registrar("abc", 10, registro_envios.COMBINADO, caminho, "JOÃO DA SILVA")
+    registro.registrar("abc", 10, registro_envios.RESOLVIDO)
+    assert reservas.reservar("abc", caminho) == "RESERVADO"
+    return {"arquivo": os.path.basename(caminho), "caminho": caminho, "perfil": "contra_cheque", "hash": "abc",
+            "id_recibos": 10, "dados_func": DADOS_FUNC, "nome_completo": "JOÃO DA SILVA", "token": "token",
+            "etapa": registro_envios.ETAPA_ENVIAR, "registro": registro, "reservas": reservas, "copias": []}
+
+
+def test_envio_incerto_fica_enviando_e_nao_reenvia(tmp_path, monkeypatch, registro):
+    reservas = ReservasTrabalho(str(tmp_path / "reservas"))
+    trabalho = _trabalho(registro, reservas, str(tmp_path / "JOAO.pdf"))
+    monkeypatch.setattr(motor_assinaturas, "enviar_fluxo_assinatura", lambda *a: motor_assinaturas.ENVIO_INCERTO)
+
+    assert motor_assinaturas._enviar_documento(trabalho) is False
+    assert proxima_etapa(registro.consultar("abc", 10)) == registro_envios.ETAPA_INTERROMPIDO
+    # A reserva fica em ENVIANDO (sem renovação): vencida, as outras máquinas veem INTERROMPIDO
+    assert (tmp_path / "reservas" / "abc.reserva").exists()
+    assert "abc" not in reservas._minhas
+    reservas.encerrar()
+
+
+def test_falha_certa_volta_para_resolvido_e_libera_reserva(tmp_path, monkeypatch, registro):
+    reservas = ReservasTrabalho(str(tmp_path / "reservas"))
+    trabalho = _trabalho(registro, reservas, str(tmp_path / "JOAO.pdf"))
+    monkeypatch.setattr(motor_assinaturas, "enviar_fluxo_assinatura", lambda *a: False)
+
+    assert motor_assinaturas._enviar_documento(trabalho) is False
+    assert proxima_etapa(registro.consultar("abc", 10)) == registro_envios.ETAPA_ENVIAR
+    assert not (tmp_path / "reservas" / "abc.reserva").exists()
+    reservas.encerrar()
+
+
+@pytest.fixture
+def planejamento(tmp_path, monkeypatch, registro):
+    """ Contexto de planejamento sem API: JOAO e MARIA resolvidos direto para as suas pastas RECIBOS. """
+    funcionarios = {"JOAO SILVA": "JOÃO DA SILVA", "MARIA SOUZA": "MARIA SOUZA"}
+    pastas = {"JOÃO DA SILVA": 10, "MARIA SOUZA": 20}
+    monkeypatch.setattr(motor_assinaturas, "buscar_dados_por_nome_curto",
+                        lambda db, nome, arquivo=None: (DADOS_FUNC, funcionarios[nome]) if nome in funcionarios else (None, None))
+    # O "setor sugerido" do teste é a própria pasta RECIBOS (outra pasta do mesmo funcionário)
+    monkeypatch.setattr(motor_assinaturas, "buscar_id_final_recibos", lambda token, setor, nome: setor or pastas[nome])
+    contexto = {"token": "token", "db_funcionarios": {}, "registro": registro}
+
+    def planejar(plano, pasta, nome, conteudo, id_recibos=None):
+        caminho = str(tmp_path / pasta / nome)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, "wb") as f:
+            f.write(conteudo)
+        motor_assinaturas._planejar_arquivo(contexto, plano, "contra_cheque", caminho, id_recibos)
+        return caminho
+
+    return planejar
+
+
+def test_mesmo_conteudo_no_plano_vira_copia_ou_problema(planejamento):
+    plano = motor_assinaturas.novo_plano("contra_cheque")
+    original = planejamento(plano, "TELE FILIAL", "JOAO SILVA.pdf", b"%PDF joao")
+    copia = planejamento(plano, "TELE MATRIZ", "JOAO SILVA.pdf", b"%PDF joao")
+    outro = planejamento(plano, "TELE MATRIZ", "MARIA SOUZA.pdf", b"%PDF joao")
+
+    assert [acao["caminho"] for acao in plano["acoes"]] == [original]
+    assert [c["caminho"] for c in plano["acoes"][0]["copias"]] == [copia]
+    assert [(p["caminho"], p["motivo"]) for p in plano["problemas"]] == [(outro, motor_assinaturas.CONTEUDO_DUPLICADO)]
+
+
+def test_conteudo_ja_enviado_vincula_o_mesmo_funcionario(planejamento, registro):
+    plano = motor_assinaturas.novo_plano("contra_cheque")
+    anterior = planejamento(plano, "NOVEMBRO", "JOAO SILVA.pdf", b"%PDF joao")
+    hash_doc = plano["acoes"][0]["hash"]
+    registro.registrar(hash_doc, 10, registro_envios.MOVIDO, id_fluxo="77")
+
+    # Execução seguinte: o mesmo PDF em outra pasta RECIBOS do mesmo funcionário só é movido
+    plano = motor_assinaturas.novo_plano("contra_cheque")
+    planejamento(plano, "TELE MATRIZ", "JOAO SILVA.pdf", b"%PDF joao", id_recibos=30)
+    assert [(a["id_recibos"], a["etapa"]) for a in plano["acoes"]] == [(30, registro_envios.ETAPA_MOVER)]
+    linha = registro.consultar(hash_doc, 30)
+    assert (linha["estado"], linha["id_fluxo"]) == (registro_envios.ENVIADO, "77")
+
+    # Regerado pela folha para a mesma pasta RECIBOS: cópia que só vai para ENVIADOS
+    plano = motor_assinaturas.novo_plano("contra_cheque")
+    novo = planejamento(plano, "DEZEMBRO", "JOAO SILVA.pdf", b"%PDF joao")
+    assert plano["movimentos"] == [{"caminho": novo, "hash": hash_doc, "id_pasta": 10}]
+    assert registro.consultar(hash_doc, 10)["caminho"] == anterior
+
+    # Mesmo conteúdo com o nome de outro funcionário: não envia, vai para revisão
+    maria = planejamento(plano, "DEZEMBRO", "MARIA SOUZA.pdf", b"%PDF joao")
+    assert [(p["caminho"], p["motivo"]) for p in plano["problemas"]] == [(maria, motor_assinaturas.CONTEUDO_DUPLICADO)]
+    assert plano["acoes"] == []
+    assert registro.consultar(hash_doc, 20) is None
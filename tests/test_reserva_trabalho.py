@@ -0,0 +1,104 @@
+import json
+import os
+import time
+
+import pytest
+
+import reserva_trabalho
+from reserva_trabalho import ReservasTrabalho
+
+
+@pytest.fixture
+def diretorio(tmp_path):
+    return str(tmp_path / "reservas")
+
+
+def _vencer(diretorio, chave):
+    """ Simula uma máquina que caiu: a reserva deixa de ser renovada e vence. """
+    caminho = os.path.join(diretorio, f"{chave}.reserva")
+    with open(caminho, encoding="utf-8") as f:
+        dados = json.load(f)
+    dados["expira_em"] = time.time() - 1
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f)
+
+
+def test_reserva_valida_fica_com_o_primeiro(diretorio):
+    a, b = ReservasTrabalho(diretorio), ReservasTrabalho(diretorio)
+    assert a.reservar("x", "X.pdf") == reserva_trabalho.RESERVADO
+    assert a.reservar("x", "X.pdf") == reserva_trabalho.RESERVADO  # Já é deste processo
+    assert b.reservar("x", "X.pdf") == reserva_trabalho.OCUPADO
+    assert b.ocupados == 1
+    a.encerrar(); b.encerrar()
+
+
+def test_reserva_vencida_e_assumida(diretorio):
+    a, b = ReservasTrabalho(diretorio), ReservasTrabalho(diretorio)
+    a.reservar("x", "X.pdf")
+    _vencer(diretorio, "x")
+    assert b.reservar("x", "X.pdf") == reserva_trabalho.RESERVADO
+    # A antiga dona não apaga a reserva que agora é de outro processo
+    a.liberar("x")
+    assert os.path.exists(os.path.join(diretorio, "x.reserva"))
+    b.encerrar(); a.encerrar()
+
+
+def test_reserva_vencida_durante_o_envio_fica_interrompida(diretorio):
+    a, b = ReservasTrabalho(diretorio), ReservasTrabalho(diretorio)
+    a.reservar("x", "X.pdf")
+    assert a.marcar_envio("x")
+    a.abandonar("x")
+    _vencer(diretorio, "x")
+
+    assert b.reservar("x", "X.pdf") == reserva_trabalho.INTERROMPIDO
+    assert os.path.exists(os.path.join(diretorio, "x.reserva"))
+
+    # Depois de conferido o portal: o fluxo existe, ninguém reenvia
+    b.descartar("x", enviado=True)
+    assert b.reservar("x", "X.pdf") == reserva_trabalho.CONCLUIDO
+    a.encerrar(); b.encerrar()
+
+
+def test_encerrar_nao_apaga_reserva_em_envio(diretorio):
+    a = ReservasTrabalho(diretorio)
+    a.reservar("enviando", "A.pdf")
+    a.reservar("parado", "B.pdf")
+    a.marcar_envio("enviando")
+    a.encerrar()
+    assert sorted(os.listdir(diretorio)) == ["enviando.reserva"]
+
+
+def test_concluido_impede_nova_reserva(diretorio):
+    a, b = ReservasTrabalho(diretorio), ReservasTrabalho(diretorio)
+    a.reservar("y", "Y.pdf")
+    a.concluir("y")
+    assert b.concluido("y")
+    assert b.reservar("y", "Y.pdf") == reserva_trabalho.CONCLUIDO
+    assert sorted(os.listdir(diretorio)) == ["y.feito"]
+    a.encerrar(); b.encerrar()
+
+
+def test_marcar_envio_sem_gravar_nao_libera_o_post(diretorio, monkeypatch):
+    a = ReservasTrabalho(diretorio)
+    a.reservar("x", "X.pdf")
+
+    def _falha(*args):
+        raise OSError("compartilhamento indisponível")
+
+    monkeypatch.setattr(a, "_gravar", _falha)
+    assert not a.marcar_envio("x")
+    assert a._minhas["x"]["estado"] == reserva_trabalho.RESERVADO
+    a.encerrar()
+
+
+def test_renovacao_estende_a_validade(diretorio, monkeypatch):
+    monkeypatch.setattr(reserva_trabalho, "INTERVALO_RENOVACAO", 0.05)
+    a = ReservasTrabalho(diretorio)
+    a.reservar("z")
+    caminho = os.path.join(diretorio, "z.reserva")
+    with open(caminho, encoding="utf-8") as f:
+        expira_em = json.load(f)["expira_em"]
+    time.sleep(0.3)
+    with open(caminho, encoding="utf-8") as f:
+        assert json.load(f)["expira_em"] > expira_em
+    a.encerrar()
@@ -0,0 +1,68 @@
+import io
+import os
+import hashlib
+
+import pytest
+
+import cliente_http
+import motor_assinaturas
+import upload_multipart
+from upload_multipart import CorpoMultipart
+
+CONTEUDO = b"%PDF-1.4 " + os.urandom(5000)
+DADOS_FUNC = {"name": "JOÃO DA SILVA", "cpf": "12345678900", "phone": "51988887777", "email": "joao@exemplo.com"}
+
+
+@pytest.fixture(autouse=True)
+def buffer_pequeno(monkeypatch):
+    # Vários blocos por upload, mesmo com um PDF pequeno
+    monkeypatch.setattr(upload_multipart, "TAMANHO_BUFFER_UPLOAD", 512)
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    caminho = tmp_path / "JOAO.pdf"
+    caminho.write_bytes(CONTEUDO)
+    return str(caminho)
+
+
+def test_tamanho_e_hash_iguais_ao_que_foi_enviado(pdf):
+    with CorpoMultipart({"name": "JOAO.pdf", "folderId": 10}, pdf) as corpo:
+        enviado = b"".join(corpo)
+        assert len(corpo) == len(enviado)
+        assert corpo.sha256() == hashlib.sha256(CONTEUDO).hexdigest()
+        assert CONTEUDO in enviado
+        assert b'name="folderId"\r\n\r\n10\r\n' in enviado
+        assert b'filename="JOAO.pdf"' in enviado
+
+
+def test_nova_tentativa_recomeca_corpo_e_hash(pdf):
+    with CorpoMultipart({}, pdf) as corpo:
+        primeiro = corpo.read(700)
+        corpo.seek(0)
+        assert corpo.read(700) == primeiro
+        corpo.seek(0)
+        assert len(corpo.read()) == len(corpo)
+        assert corpo.sha256() == hashlib.sha256(CONTEUDO).hexdigest()
+
+
+def test_buffer_em_memoria_a_partir_da_posicao_atual():
+    buffer = io.BytesIO(b"lixo" + CONTEUDO)
+    buffer.seek(4)
+    corpo = CorpoMultipart({}, buffer, "PARTE.pdf")
+    enviado = corpo.read()
+    assert len(enviado) == len(corpo)
+    assert corpo.sha256() == hashlib.sha256(CONTEUDO).hexdigest()
+
+
+def test_arquivo_acima_do_limite_recusado_antes_de_enviar(tmp_path, monkeypatch):
+    grande = str(tmp_path / "GRANDE.pdf")
+    with open(grande, "wb") as f:
+        f.truncate(upload_multipart.TAMANHO_MAXIMO_UPLOAD + 1)  # Arquivo esparso: não ocupa o disco
+    with pytest.raises(ValueError, match="limite de upload"):
+        CorpoMultipart({}, grande)
+
+    posts = []
+    monkeypatch.setattr(cliente_http, "post", lambda *a, **k: posts.append(k))
+    assert motor_assinaturas.enviar_fluxo_assinatura("token", grande, DADOS_FUNC, 10) is False
+    assert posts == []
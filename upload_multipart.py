@@ -0,0 +1,110 @@
+import os
+import uuid
+import hashlib
+
+# --- CONFIGURAÇÕES DO UPLOAD ---
+TAMANHO_BUFFER_UPLOAD = 64 * 1024            # Bytes lidos do PDF por vez (memória fixa por upload)
+TAMANHO_MAXIMO_UPLOAD = 50 * 1024 * 1024     # Limite por arquivo enviado ao /subscriptionFlow
+# -------------------------------
+
+
+class CorpoMultipart:
+    """
+    Corpo multipart/form-data lido sob demanda: os campos do formulário ficam em
+    memória (são pequenos) e o PDF é lido do disco em blocos de TAMANHO_BUFFER_UPLOAD
+    à medida que o requests envia. O SHA-256 do PDF é calculado nessa mesma leitura.
+    Aceita um caminho ou um buffer em memória (objeto com read/seek).
+    Uso: data=corpo, headers={"Content-Type": corpo.content_type}.
+    """
+
+    def __init__(self, campos: dict, arquivo, nome_arquivo: str = None, campo_arquivo: str = "file",
+                 tamanho_maximo: int = TAMANHO_MAXIMO_UPLOAD):
+        if isinstance(arquivo, (str, os.PathLike)):
+            nome_arquivo = nome_arquivo or os.path.basename(arquivo)
+            self._arquivo = open(arquivo, "rb")
+        else:
+            nome_arquivo = nome_arquivo or os.path.basename(getattr(arquivo, "name", "") or "documento.pdf")
+            self._arquivo = arquivo
+        self._inicio_arquivo = self._arquivo.tell()
+        self._tamanho_arquivo = self._arquivo.seek(0, os.SEEK_END) - self._inicio_arquivo
+        self._arquivo.seek(self._inicio_arquivo)
+        if tamanho_maximo and self._tamanho_arquivo > tamanho_maximo:
+            self.close()
+            raise ValueError(
+                f"Arquivo '{nome_arquivo}' tem {self._tamanho_arquivo / 1024 / 1024:.1f} MB "
+                f"(limite de upload: {tamanho_maximo / 1024 / 1024:.1f} MB)"
+            )
+
+        fronteira = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={fronteira}"
+        partes = []
+        for nome, valor in campos.items():
+            partes.append(
+                f'--{fronteira}\r\nContent-Disposition: form-data; name="{nome}"\r\n\r\n{valor}\r\n'
+            )
+        nome_arquivo = nome_arquivo.replace('"', "'")
+        partes.append(
+            f'--{fronteira}\r\nContent-Disposition: form-data; name="{campo_arquivo}"; filename="{nome_arquivo}"\r\n'
+            f"Content-Type: application/pdf\r\n\r\n"
+        )
+        self._cabecalho = "".join(partes).encode("utf-8")
+        self._rodape = f"\r\n--{fronteira}--\r\n".encode("utf-8")
+        self.seek(0)
+
+    def __len__(self):
+        return len(self._cabecalho) + self._tamanho_arquivo + len(self._rodape)
+
+    def __iter__(self):
+        # O requests só trata o corpo como fluxo (sem montá-lo em memória) se ele for iterável
+        while True:
+            bloco = self.read(TAMANHO_BUFFER_UPLOAD)
+            if not bloco:
+                return
+            yield bloco
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def seek(self, posicao: int, origem: int = os.SEEK_SET) -> int:
+        """ Só volta ao início (nova tentativa de envio); o hash recomeça junto. """
+        if posicao != 0 or origem != os.SEEK_SET:
+            raise OSError("CorpoMultipart só pode ser rebobinado para o início")
+        self._posicao = 0
+        self._sha = hashlib.sha256()
+        self._arquivo.seek(self._inicio_arquivo)
+        return 0
+
+    def read(self, tamanho: int = -1) -> bytes:
+        if tamanho is None or tamanho < 0:
+            tamanho = len(self) - self._posicao
+        saida = bytearray()
+        while len(saida) < tamanho and self._posicao < len(self):
+            falta = tamanho - len(saida)
+            fim_cabecalho = len(self._cabecalho)
+            fim_arquivo = fim_cabecalho + self._tamanho_arquivo
+            if self._posicao < fim_cabecalho:
+                bloco = self._cabecalho[self._posicao:self._posicao + falta]
+            elif self._posicao < fim_arquivo:
+                bloco = self._arquivo.read(min(falta, TAMANHO_BUFFER_UPLOAD, fim_arquivo - self._posicao))
+                if not bloco:
+                    raise OSError("Arquivo encolheu durante o upload")
+                self._sha.update(bloco)
+            else:
+                inicio = self._posicao - fim_arquivo
+                bloco = self._rodape[inicio:inicio + falta]
+            saida += bloco
+            self._posicao += len(bloco)
+        return bytes(saida)
+
+    def sha256(self) -> str:
+        """ Hash do PDF efetivamente enviado (válido depois que o corpo foi lido até o fim). """
+        return self._sha.hexdigest()
+
+    def close(self):
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.close()